@@ -0,0 +1,105 @@
+from decimal import Decimal, ROUND_HALF_UP
+from functools import lru_cache
+
+_ONES = ["", "One", "Two", "Three", "Four", "Five", "Six", "Seven", "Eight", "Nine"]
+_TEENS = ["Ten", "Eleven", "Twelve", "Thirteen", "Fourteen", "Fifteen", "Sixteen", "Seventeen", "Eighteen",
+          "Nineteen"]
+_TENS = ["", "", "Twenty", "Thirty", "Forty", "Fifty", "Sixty", "Seventy", "Eighty", "Ninety"]
+
+
+def _below_hundred(n):
+    if n < 10:
+        return _ONES[n]
+    if n < 20:
+        return _TEENS[n - 10]
+    tens, ones = divmod(n, 10)
+    return f"{_TENS[tens]} {_ONES[ones]}" if ones else _TENS[tens]
+
+
+def _below_thousand(n):
+    hundreds, rest = divmod(n, 100)
+    if not hundreds:
+        return _below_hundred(rest)
+    if not rest:
+        return f"{_ONES[hundreds]} Hundred"
+    return f"{_ONES[hundreds]} Hundred {_below_hundred(rest)}"
+
+
+# Words for 0-999, built once; "" for zero so empty groups drop out
+BELOW_THOUSAND = tuple(_below_thousand(n) for n in range(1000))
+
+
+@lru_cache(maxsize=4096)
+def _crores(n):
+    return f"{indian_number_words(n)} Crore"
+
+
+def indian_number_words(n):
+    """Words for a positive integer in the Indian system (Thousand, Lakh, Crore).
+
+    Amounts of a thousand crore and more are written as "<n> Crore", with n
+    itself in Indian numbering, e.g. "One Lakh Crore".
+    """
+    crores, rest = divmod(n, 10_000_000)
+    lakhs, rest = divmod(rest, 100_000)
+    thousands, hundreds = divmod(rest, 1000)
+
+    parts = []
+    if crores:
+        parts.append(_crores(crores))
+    if lakhs:
+        parts.append(f"{BELOW_THOUSAND[lakhs]} Lakh")
+    if thousands:
+        parts.append(f"{BELOW_THOUSAND[thousands]} Thousand")
+    if hundreds:
+        parts.append(BELOW_THOUSAND[hundreds])
+    return " ".join(parts)
+
+
+def paise_to_words(paise):
+    """Amount in words from an exact integer number of paise."""
+    paise = int(paise)
+    if paise < 0:
+        return f"Minus {paise_to_words(-paise)}"
+    rupees, paise = divmod(paise, 100)
+    if not rupees and not paise:
+        return "Zero Rupees"
+
+    parts = []
+    if rupees:
+        parts.append(f"{indian_number_words(rupees)} Rupees")
+    if paise:
+        parts.append(f"{BELOW_THOUSAND[paise]} Paise")
+    return " and ".join(parts)
+
+
+def rupees_to_paise(amount):
+    """Rupee amount (int, float, Decimal or numeric string) to paise, rounded half-up.
+
+    Floats go through their shortest repr, so 0.29 is 29 paise rather than
+    the 28 that int(0.29 * 100) gives.
+    """
+    if isinstance(amount, float):
+        amount = repr(amount)
+    return int((Decimal(amount) * 100).quantize(Decimal(1), ROUND_HALF_UP))
+
+
+def amount_in_words(amount):
+    return paise_to_words(rupees_to_paise(amount))
+
+
+def paise_column_to_words(paise_column):
+    """Words for a whole column of paise totals (list or int array).
+
+    Repeated totals are converted once.
+    """
+    if hasattr(paise_column, "tolist"):
+        paise_column = paise_column.tolist()
+    cache = {}
+    words = []
+    for paise in paise_column:
+        text = cache.get(paise)
+        if text is None:
+            text = cache[paise] = paise_to_words(paise)
+        words.append(text)
+    return words
@@ -0,0 +1,104 @@
+import time
+from bisect import bisect_right
+
+# Separator between entries in the search haystack; never typed by a user
+_SEP = "\x00"
+
+
+class CatalogIndex:
+    """Incremental substring search over catalog descriptions.
+
+    All descriptions are lower-cased once into a single separator-joined
+    string, so a fresh query is a handful of C-level str.find calls rather
+    than a Python loop over every entry. When a query contains the previous
+    one (the usual case while typing) the previous result set is filtered
+    instead of rescanning.
+    """
+
+    def __init__(self, entries, limit=500):
+        # entries: iterable of (description, payload), e.g. (category, "18%")
+        self.texts = []
+        self.payloads = []
+        for text, payload in entries:
+            self.texts.append(text)
+            self.payloads.append(payload)
+        self.limit = limit
+
+        self._lowered = [text.lower() for text in self.texts]
+        self._haystack = _SEP.join(self._lowered) + _SEP
+        self._starts = []
+        offset = 0
+        for text in self._lowered:
+            self._starts.append(offset)
+            offset += len(text) + 1
+        self._payload_by_text = {}
+        for text, payload in zip(self.texts, self.payloads):
+            self._payload_by_text.setdefault(text, payload)
+
+        self._last_term = None
+        self._last_ids = []
+        self._last_complete = False
+
+    def __len__(self):
+        return len(self.texts)
+
+    def payload(self, text, default=None):
+        return self._payload_by_text.get(text, default)
+
+    def _scan(self, term):
+        haystack = self._haystack
+        starts = self._starts
+        ids = []
+        pos = haystack.find(term)
+        while pos != -1:
+            entry = bisect_right(starts, pos) - 1
+            ids.append(entry)
+            if len(ids) > self.limit:
+                return ids[:self.limit], False
+            # Skip to the next entry so each one is reported once
+            next_start = starts[entry + 1] if entry + 1 < len(starts) else len(haystack)
+            pos = haystack.find(term, next_start)
+        return ids, True
+
+    def search_ids(self, term):
+        term = term.strip().lower()
+        if not term or _SEP in term:
+            return []
+
+        if self._last_complete and self._last_term and self._last_term in term:
+            # Narrowing query: every match of `term` also matched the last term
+            lowered = self._lowered
+            ids = [i for i in self._last_ids if term in lowered[i]]
+            complete = True
+        else:
+            ids, complete = self._scan(term)
+
+        self._last_term = term
+        self._last_ids = ids
+        self._last_complete = complete
+        return ids
+
+    def search(self, term):
+        """Matching descriptions in catalog order, at most `limit` of them."""
+        return [self.texts[i] for i in self.search_ids(term)]
+
+
+def benchmark(entries=100_000):
+    words = ["steel", "copper", "cotton", "fabric", "refrigerator", "washing", "machine", "biscuits", "tea",
+             "coffee", "mobile", "phone", "parts", "accessories", "frozen", "vegetables", "printed", "books"]
+    texts = [f"{words[i % 18].title()} {words[(i * 7) % 18]} {words[(i * 13) % 18]} grade {i}" for i in range(entries)]
+    start = time.perf_counter()
+    index = CatalogIndex((text, "18%") for text in texts)
+    print(f"index of {entries:,} entries built in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    typed = "refrigerator parts"
+    timings = []
+    for end in range(1, len(typed) + 1):
+        start = time.perf_counter()
+        index.search(typed[:end])
+        timings.append((time.perf_counter() - start) * 1000)
+    print(f"per keystroke: max {max(timings):.2f} ms, mean {sum(timings) / len(timings):.2f} ms")
+
+
+if __name__ == "__main__":
+    benchmark()
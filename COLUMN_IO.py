@@ -0,0 +1,51 @@
+import csv
+import os
+
+import numpy as np
+
+from FIXED_POINT import format_paise
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet input is optional
+    pq = None
+
+
+def read_columns(path, delimiter=None):
+    """Columns of a CSV/TSV or Parquet file as a dict of arrays."""
+    if os.path.splitext(path)[1].lower() == ".parquet":
+        if pq is None:
+            raise ValueError("Reading Parquet files needs pyarrow installed")
+        table = pq.read_table(path)
+        return {name: table.column(name).to_numpy(zero_copy_only=False) for name in table.column_names}
+
+    if delimiter is None:
+        delimiter = "\t" if os.path.splitext(path)[1].lower() in (".tsv", ".tab") else ","
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        header = [name.strip() for name in next(reader)]
+        rows = []
+        for row in reader:
+            if len(row) != len(header):
+                if not row:  # blank line
+                    continue
+                # A short or long row would shift every column once transposed
+                raise ValueError(f"{path}: line {reader.line_num} has {len(row)} fields, expected {len(header)}")
+            rows.append(row)
+    columns = zip(*rows) if rows else ([] for _ in header)
+    return {name: np.array(column, dtype=str) for name, column in zip(header, columns)}
+
+
+def write_columns(path, columns, paise_columns=(), delimiter=","):
+    """Write equal-length columns to CSV, formatting `paise_columns` as exact rupee amounts."""
+    names = list(columns)
+    formatted = []
+    for name in names:
+        column = np.asarray(columns[name]).tolist()
+        if name in paise_columns:
+            column = [format_paise(paise) for paise in column]
+        formatted.append(column)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter=delimiter)
+        writer.writerow(names)
+        writer.writerows(zip(*formatted))
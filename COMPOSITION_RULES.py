@@ -0,0 +1,140 @@
+import json
+import os
+from datetime import date
+
+import numpy as np
+
+from PLACE_OF_SUPPLY import state_numbers
+
+# Where the rule versions live unless a path is given
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "composition_rules.json")
+
+# Keys every version must end up with, once carried-over keys are filled in
+RULE_KEYS = ("turnover_limits", "special_category_states", "eligible_business_types", "eligible_registrations",
+             "already_composition")
+STATE_CATEGORIES = ("normal", "special")
+
+# GST state codes run 01-38 (97 for other territory); the table covers all two-digit codes
+_STATE_CODES = 100
+
+
+def _as_dates(on_date, length):
+    """Effective dates as a datetime64[D] array (today when None)."""
+    if on_date is None:
+        return np.full(length, np.datetime64(date.today().isoformat(), "D"))
+    dates = np.atleast_1d(np.asarray(on_date))
+    if dates.dtype.kind in "USO":
+        dates = dates.astype(str)
+    return dates.astype("datetime64[D]")
+
+
+class CompiledRules:
+    """Rule versions compiled into lookup tables.
+
+    Evaluating a batch is a searchsorted of the record dates into the
+    version start dates, then plain array indexing: per-version turnover
+    limits by state category, per-version special-category flags by state
+    code, and per-version membership of each distinct business type or
+    registration label. Nothing is re-read or re-parsed per record.
+    """
+
+    def __init__(self, versions):
+        if not versions:
+            raise ValueError("Composition rules define no versions")
+        resolved = []
+        current = {}
+        for version in sorted(versions, key=lambda v: v["effective_from"]):
+            current = {**current, **version}
+            missing = [key for key in RULE_KEYS if key not in current]
+            if missing:
+                raise ValueError(f"Rule version {version['effective_from']} is missing {', '.join(missing)}")
+            resolved.append(current)
+        self.versions = resolved
+
+        self.effective_from = np.array([v["effective_from"] for v in resolved], dtype="datetime64[D]")
+        self.turnover_limits = np.array([[float(v["turnover_limits"][category]) for category in STATE_CATEGORIES]
+                                         for v in resolved])
+        # One spare column at the end, which state code -1 (unknown) indexes: never special
+        self.special_states = np.zeros((len(resolved), _STATE_CODES + 1), dtype=bool)
+        for index, version in enumerate(resolved):
+            self.special_states[index, [int(code) for code in version["special_category_states"]]] = True
+        self._label_sets = {key: [frozenset(v[key]) for v in resolved]
+                            for key in ("eligible_business_types", "eligible_registrations", "already_composition")}
+
+    def version_index(self, on_date=None, length=1):
+        """Index of the version in force on each date; -1 before the first version."""
+        dates = np.broadcast_to(_as_dates(on_date, length), (length,))
+        return np.searchsorted(self.effective_from, dates, side="right") - 1
+
+    def turnover_limit(self, version, state_codes=None):
+        """Per-record turnover limit for the given version indexes and state codes."""
+        version = np.atleast_1d(version)
+        states = np.full(len(version), -1) if state_codes is None else state_numbers(state_codes)
+        states = np.broadcast_to(states, version.shape)
+        special = self.special_states[np.maximum(version, 0), states]
+        return np.where(version >= 0, self.turnover_limits[np.maximum(version, 0), special.astype(np.int64)], np.nan)
+
+    def label_mask(self, key, version, labels):
+        """Per-record membership of `labels` in the version's `key` label set."""
+        version = np.atleast_1d(version)
+        labels = np.atleast_1d(np.asarray(labels))
+        if labels.dtype.kind not in "US":
+            labels = labels.astype(str)
+        distinct, inverse = np.unique(labels, return_inverse=True)
+        # (versions, distinct labels) table, looked up per record
+        table = np.array([[label in allowed for label in distinct.tolist()] for allowed in self._label_sets[key]],
+                         dtype=bool).reshape(len(self.versions), len(distinct))
+        inverse = np.broadcast_to(inverse.reshape(labels.shape), version.shape)
+        return np.where(version >= 0, table[np.maximum(version, 0), inverse], False)
+
+
+class RuleBook:
+    """Composition rules loaded from a JSON file, reloaded when the file changes.
+
+    current() stats the file and recompiles only when its modification time
+    or size moved, so a long-running process picks up a new rule version
+    without a restart. A file that fails to load or compile leaves the
+    previous rules in force and is reported in `last_error`.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.environ.get("GST_COMPOSITION_RULES") or DEFAULT_PATH
+        self.last_error = None
+        self._stamp = None
+        self._compiled = None
+        self.current()
+
+    def _load(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            return CompiledRules(json.load(f)["versions"])
+
+    def current(self):
+        """The compiled rules, reloading the file first if it has changed."""
+        try:
+            stat = os.stat(self.path)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except OSError as e:
+            stamp = None
+            if self._compiled is None:
+                raise ValueError(f"Cannot read composition rules: {e}") from e
+        if stamp is not None and stamp != self._stamp:
+            try:
+                self._compiled = self._load()
+                self.last_error = None
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                if self._compiled is None:
+                    raise ValueError(f"Invalid composition rules in {self.path}: {e}") from e
+                self.last_error = f"{type(e).__name__}: {e}"
+            self._stamp = stamp
+        return self._compiled
+
+
+_default_rulebook = None
+
+
+def default_rulebook():
+    """Process-wide RuleBook over the default rules file, loaded on first use."""
+    global _default_rulebook
+    if _default_rulebook is None:
+        _default_rulebook = RuleBook()
+    return _default_rulebook
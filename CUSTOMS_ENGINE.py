@@ -0,0 +1,175 @@
+import argparse
+import sys
+import time
+
+import numpy as np
+
+# Column file I/O lives in COLUMN_IO; read_columns and write_columns are re-exported for existing callers
+from COLUMN_IO import read_columns, write_columns
+from FIXED_POINT import (ROUND_HALF_UP, to_paise, to_basis_points, format_paise, calculate_customs_duty_paise,
+                         invoice_totals_paise)
+from HS_TARIFF import default_tariff
+
+# Input columns; shipping and insurance default to 0, and blank or missing
+# rates are taken from the tariff entry for hs_code
+BILL_COLUMN = "bill_no"
+HS_CODE_COLUMN = "hs_code"
+VALUE_COLUMN = "value"
+SHIPPING_COLUMN = "shipping"
+INSURANCE_COLUMN = "insurance"
+RATE_COLUMNS = {"bcd_rate": "bcd_rate", "igst_rate": "igst_rate", "cess_rate": "cess_rate"}
+
+# Column names returned by calculate_customs_batch, in display order (int64 paise)
+DUTY_COLUMNS = ("assessable_value", "bcd", "igst", "cess", "total_duty")
+
+
+def calculate_customs_batch(values, shipping=0.0, insurance=0.0, bcd_rates=0.0, igst_rates=0.0, cess_rates=0.0,
+                            rounding=ROUND_HALF_UP):
+    """Vectorized customs duty for arrays of line items.
+
+    Amounts are rupees and rates are percentages, as typed into the
+    calculator; every argument may be a scalar or an array. BCD is charged
+    on the value of goods, IGST and cess on value + BCD + shipping +
+    insurance. Each head is worked out in exact paise and rounded once.
+    Returns a dict of int64 paise arrays keyed by DUTY_COLUMNS.
+    """
+    value, shipping, insurance = np.atleast_1d(to_paise(values), to_paise(shipping), to_paise(insurance))
+    bcd_bp, igst_bp, cess_bp = np.atleast_1d(to_basis_points(bcd_rates), to_basis_points(igst_rates),
+                                            to_basis_points(cess_rates))
+    value, shipping, insurance, bcd_bp, igst_bp, cess_bp = np.broadcast_arrays(
+        value, shipping, insurance, bcd_bp, igst_bp, cess_bp)
+    duty = calculate_customs_duty_paise(value, shipping, insurance, bcd_bp, igst_bp, cess_bp, rounding)
+    return {"assessable_value": value + shipping + insurance, **duty}
+
+
+def bill_rollups(bill_numbers, duties, rounding=ROUND_HALF_UP):
+    """Per-bill totals of the line duty columns.
+
+    Returns a dict of arrays: bill_no, lines, one summed paise column per
+    duty head, and total_duty rounded to the rupee as rounded_total with the
+    difference in round_off.
+    """
+    # total_duty first, so it is the column invoice_totals_paise rounds
+    columns = {"total_duty": duties["total_duty"]}
+    columns.update((name, duties[name]) for name in DUTY_COLUMNS if name != "total_duty")
+    columns["lines"] = np.ones(len(duties["total_duty"]), dtype=np.int64)
+    totals = invoice_totals_paise(bill_numbers, columns, rounding)
+    order = ("invoice_id", "lines") + DUTY_COLUMNS + ("rounded_total", "round_off")
+    return {("bill_no" if name == "invoice_id" else name): totals[name] for name in order}
+
+
+def amount_column(column, length, required=None):
+    """Amounts as floats. Blanks are 0 for optional charges; for a `required` column (its name) they raise."""
+    if column is None:
+        return np.zeros(length)
+    if column.dtype.kind in "US":
+        column = np.char.strip(column.astype(str))
+        column = np.where(column == "", "nan", column)
+    amounts = column.astype(np.float64)
+    missing = np.isnan(amounts)
+    if required and missing.any():
+        rows = np.flatnonzero(missing)
+        raise ValueError(f"{len(rows):,} lines have no {required} (first at data row {rows[0] + 1})")
+    return np.where(missing, 0.0, amounts)
+
+
+def rate_column(column, resolved):
+    """Rate column as floats, with blanks (or a missing column) taken from the tariff."""
+    if column is None:
+        return resolved
+    if column.dtype.kind in "US":
+        column = np.char.strip(np.char.rstrip(column.astype(str), "%"))
+        blank = column == ""
+        rates = np.where(blank, "nan", column).astype(np.float64)
+    else:
+        rates = column.astype(np.float64)
+    return np.where(np.isnan(rates), resolved, rates)
+
+
+def line_rates(columns, length, tariff=None):
+    """Per-line BCD, IGST and cess percentages: the rate columns given, with blanks from the tariff.
+
+    Raises ValueError when a line has no rate given and no tariff rate
+    covering its HS code, so a missing rate is never taken as 0%.
+    """
+    resolved = {name: np.full(length, np.nan) for name in RATE_COLUMNS}
+    if HS_CODE_COLUMN in columns:
+        resolved = (tariff or default_tariff()).resolve_many(columns[HS_CODE_COLUMN])
+    rates = {name: rate_column(columns.get(column), resolved[name]) for name, column in RATE_COLUMNS.items()}
+
+    missing = np.flatnonzero(np.isnan(rates["bcd_rate"]) | np.isnan(rates["igst_rate"]) | np.isnan(rates["cess_rate"]))
+    if len(missing):
+        raise ValueError(f"{len(missing):,} lines have no rate given and no tariff rate for their HS code "
+                         f"(first at data row {missing[0] + 1})")
+    return rates
+
+
+def calculate_bill_of_entry(columns, tariff=None, rounding=ROUND_HALF_UP):
+    """Duty for a columnar batch of bill-of-entry lines.
+
+    `columns` maps input column names to arrays, as returned by
+    read_columns. Returns (duties, rollups): the per-line DUTY_COLUMNS and
+    the per-bill totals from bill_rollups. Raises ValueError when a line has
+    no rate given and no tariff entry covering its HS code.
+    """
+    if VALUE_COLUMN not in columns:
+        raise ValueError(f"Input has no '{VALUE_COLUMN}' column")
+    length = len(columns[VALUE_COLUMN])
+    values = amount_column(columns[VALUE_COLUMN], length, required=VALUE_COLUMN)
+    shipping = amount_column(columns.get(SHIPPING_COLUMN), length)
+    insurance = amount_column(columns.get(INSURANCE_COLUMN), length)
+
+    rates = line_rates(columns, length, tariff)
+    duties = calculate_customs_batch(values, shipping, insurance, rates["bcd_rate"], rates["igst_rate"],
+                                     rates["cess_rate"], rounding)
+    bills = columns.get(BILL_COLUMN, np.zeros(length, dtype=np.int64))
+    return duties, bill_rollups(bills, duties, rounding)
+
+
+# Paise columns in the per-bill totals, written as rupees
+ROLLUP_PAISE_COLUMNS = DUTY_COLUMNS + ("rounded_total", "round_off")
+
+
+def benchmark(bills=300, lines_per_bill=3000):
+    rng = np.random.default_rng(3)
+    rows = bills * lines_per_bill
+    columns = {
+        BILL_COLUMN: np.repeat(np.arange(bills), lines_per_bill),
+        HS_CODE_COLUMN: rng.choice(["84713010", "87032190", "30049099", "95030090", "71131910"], rows),
+        VALUE_COLUMN: np.round(rng.uniform(100, 500_000, rows), 2),
+        SHIPPING_COLUMN: np.round(rng.uniform(0, 5000, rows), 2),
+        INSURANCE_COLUMN: np.round(rng.uniform(0, 1000, rows), 2),
+    }
+    start = time.perf_counter()
+    duties, rollups = calculate_bill_of_entry(columns)
+    elapsed = time.perf_counter() - start
+    print(f"{rows:,} lines in {bills:,} bills: {elapsed:.2f}s ({rows / elapsed:,.0f} lines/s), "
+          f"total duty {format_paise(rollups['rounded_total'].sum())}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute customs duty for a file of bill-of-entry lines.")
+    parser.add_argument("input", help="CSV, TSV or Parquet with bill_no, hs_code, value and optional shipping, "
+                                      "insurance, bcd_rate, igst_rate, cess_rate columns")
+    parser.add_argument("bills_output", help="where to write the per-bill totals (CSV)")
+    parser.add_argument("--lines-output", help="also write the input lines with their duty columns (CSV)")
+    parser.add_argument("--delimiter", help="field delimiter (default: tab for .tsv, comma otherwise)")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    try:
+        columns = read_columns(args.input, args.delimiter)
+        duties, rollups = calculate_bill_of_entry(columns)
+        write_columns(args.bills_output, rollups, ROLLUP_PAISE_COLUMNS)
+        if args.lines_output:
+            write_columns(args.lines_output, {**columns, **duties}, DUTY_COLUMNS)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(f"{len(duties['total_duty']):,} lines in {len(rollups['bill_no']):,} bills, "
+          f"total duty {format_paise(rollups['rounded_total'].sum())}, {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,295 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+import zlib
+from datetime import datetime
+
+import numpy as np
+
+from FIXED_POINT import format_paise
+from MEMORY_USAGE import peak_rss_mb
+
+# A4 portrait in points
+PAGE_WIDTH = 595.28
+PAGE_HEIGHT = 841.89
+MARGIN = 40
+ROW_HEIGHT = 12
+FONT_SIZE = 8
+TITLE_SIZE = 14
+
+LINE_HEADERS = ("Bill No", "HS Code", "Assessable Value", "BCD", "IGST", "Cess", "Total Duty")
+LINE_WIDTHS = (80, 65, 80, 70, 70, 70, 80)
+BILL_HEADERS = ("Bill No", "Lines", "Assessable Value", "BCD", "IGST", "Cess", "Total Duty", "Rounded")
+BILL_WIDTHS = (60, 35, 75, 65, 65, 65, 75, 75)
+
+# Helvetica advance widths (1/1000 em) for the characters in amounts; others use the average
+_HELVETICA_WIDTHS = {**dict.fromkeys("0123456789", 556), ".": 278, ",": 278, "-": 333, " ": 278}
+_AVERAGE_WIDTH = 556
+
+
+def _escape(text):
+    text = str(text).replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return text.encode("latin-1", "replace")
+
+
+def _text_width(text, size):
+    return sum(_HELVETICA_WIDTHS.get(c, _AVERAGE_WIDTH) for c in str(text)) * size / 1000
+
+
+class StreamingPDF:
+    """Minimal PDF writer that puts each page on disk as soon as it is finished.
+
+    Libraries such as FPDF and the reportlab canvas keep every page in
+    memory until the document is saved. This writer sends each page's
+    compressed content stream straight to the output and remembers only
+    object offsets, so memory stays flat however many pages are written.
+    Text uses the standard Helvetica fonts, which need no embedding.
+    `output` is a path or a binary file object (left open); the document
+    starts at the file object's current position and its offsets are
+    counted from the start of the file.
+    """
+
+    def __init__(self, output, page_size=(PAGE_WIDTH, PAGE_HEIGHT)):
+        self._owns_file = isinstance(output, (str, os.PathLike))
+        self._file = open(output, "wb") if self._owns_file else output
+        self.page_size = page_size
+        self.bytes_written = 0
+        # Where the document starts in the file; xref offsets are absolute
+        self._start = 0 if self._owns_file else self._file.tell()
+        self._offsets = {}
+        self._page_ids = []
+        # 1: catalog, 2: page tree (written last), 3-4: fonts
+        self._next_id = 5
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        self._object(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+        self._object(4, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>")
+
+    @property
+    def pages(self):
+        return len(self._page_ids)
+
+    def _write(self, data):
+        self._file.write(data)
+        self.bytes_written += len(data)
+
+    def _object(self, obj_id, body):
+        self._offsets[obj_id] = self._start + self.bytes_written
+        self._write(b"%d 0 obj\n" % obj_id + body + b"\nendobj\n")
+
+    def add_page(self, content):
+        """Write one page from its content-stream operators (bytes)."""
+        data = zlib.compress(content, 6)
+        content_id, page_id = self._next_id, self._next_id + 1
+        self._next_id += 2
+        self._object(content_id, b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(data) + data + b"\nendstream")
+        self._object(page_id, b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f] "
+                              b"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>"
+                     % (*self.page_size, content_id))
+        self._page_ids.append(page_id)
+
+    def close(self):
+        kids = b" ".join(b"%d 0 R" % page_id for page_id in self._page_ids)
+        self._object(2, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self._page_ids)))
+        xref_offset = self._start + self.bytes_written
+        entries = [b"0000000000 65535 f\r\n"]
+        entries.extend(b"%010d 00000 n\r\n" % self._offsets[obj_id] for obj_id in range(1, self._next_id))
+        self._write(b"xref\n0 %d\n" % self._next_id + b"".join(entries))
+        self._write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (self._next_id, xref_offset))
+        if self._owns_file:
+            self._file.close()
+        else:
+            self._file.flush()
+
+
+class PageCanvas:
+    """Content-stream operators for one page."""
+
+    def __init__(self):
+        self.ops = []
+
+    def text(self, x, y, text, size=FONT_SIZE, bold=False, align="left", width=0):
+        if align == "right":
+            x += width - _text_width(text, size)
+        self.ops.append(b"BT /F%d %g Tf %.2f %.2f Td (%s) Tj ET" % (2 if bold else 1, size, x, y, _escape(text)))
+
+    def line(self, x1, y1, x2, y2, width=0.5):
+        self.ops.append(b"%g w %.2f %.2f m %.2f %.2f l S" % (width, x1, y1, x2, y2))
+
+    def content(self):
+        return b"\n".join(self.ops)
+
+
+class CustomsReport:
+    """Paginated customs duty report streamed to a StreamingPDF.
+
+    Sections are tables whose rows come from any iterable; rows are laid
+    out as they arrive and each page is written the moment it is full, with
+    the section's column headers repeated at the top of every page.
+    """
+
+    def __init__(self, output, title="Customs Duty Report"):
+        self.pdf = StreamingPDF(output)
+        self.title = title
+        self.generated = datetime.now().strftime("%d-%m-%Y %H:%M")
+        self.rows_written = 0
+        self._canvas = None
+        self._y = 0
+
+    def _new_page(self):
+        self._finish_page()
+        self._canvas = PageCanvas()
+        top = PAGE_HEIGHT - MARGIN
+        self._canvas.text(MARGIN, top - TITLE_SIZE, self.title, size=TITLE_SIZE, bold=True)
+        self._canvas.text(MARGIN, top - TITLE_SIZE, f"Generated {self.generated}", align="right",
+                          width=PAGE_WIDTH - 2 * MARGIN)
+        self._canvas.line(MARGIN, top - TITLE_SIZE - 6, PAGE_WIDTH - MARGIN, top - TITLE_SIZE - 6)
+        self._y = top - TITLE_SIZE - 6 - ROW_HEIGHT * 1.5
+
+    def _finish_page(self):
+        if self._canvas is None:
+            return
+        self._canvas.text(MARGIN, MARGIN / 2, f"Page {self.pdf.pages + 1}", align="right",
+                          width=PAGE_WIDTH - 2 * MARGIN)
+        self.pdf.add_page(self._canvas.content())
+        self._canvas = None
+
+    def _row(self, cells, widths, bold=False):
+        x = MARGIN
+        for index, (cell, width) in enumerate(zip(cells, widths)):
+            # First two columns are identifiers; the rest are amounts
+            align = "left" if index < 2 else "right"
+            self._canvas.text(x + 2, self._y, cell, bold=bold, align=align, width=width - 4)
+            x += width
+        self._y -= ROW_HEIGHT
+
+    def _headers(self, headers, widths):
+        self._row(headers, widths, bold=True)
+        self._canvas.line(MARGIN, self._y + ROW_HEIGHT - 3, MARGIN + sum(widths), self._y + ROW_HEIGHT - 3)
+
+    def table(self, heading, headers, widths, rows, totals=None):
+        """Stream a table; `rows` and `totals` are sequences of display strings."""
+        if self._canvas is None or self._y < MARGIN + ROW_HEIGHT * 5:
+            self._new_page()
+        self._canvas.text(MARGIN, self._y, heading, size=11, bold=True)
+        self._y -= ROW_HEIGHT * 1.5
+        self._headers(headers, widths)
+        for cells in rows:
+            if self._y < MARGIN + ROW_HEIGHT:
+                self._new_page()
+                self._canvas.text(MARGIN, self._y, f"{heading} (continued)", size=11, bold=True)
+                self._y -= ROW_HEIGHT * 1.5
+                self._headers(headers, widths)
+            self._row(cells, widths)
+            self.rows_written += 1
+        if totals is not None:
+            if self._y < MARGIN + ROW_HEIGHT:
+                self._new_page()
+            self._canvas.line(MARGIN, self._y + ROW_HEIGHT - 3, MARGIN + sum(widths), self._y + ROW_HEIGHT - 3)
+            self._row(totals, widths, bold=True)
+        self._y -= ROW_HEIGHT
+
+    def close(self):
+        if self._canvas is None:
+            self._new_page()
+        self._finish_page()
+        self.pdf.close()
+
+
+def line_rows(columns, duties, chunk=10_000):
+    """Display rows for bill-of-entry lines, formatted a chunk at a time."""
+    length = len(duties["total_duty"])
+    bills = columns.get("bill_no", np.zeros(length, dtype=np.int64))
+    codes = columns.get("hs_code", np.full(length, ""))
+    for start in range(0, length, chunk):
+        stop = start + chunk
+        amounts = [duties[name][start:stop].tolist() for name in ("assessable_value", "bcd", "igst", "cess", "total_duty")]
+        for bill, code, *paise in zip(bills[start:stop].tolist(), codes[start:stop].tolist(), *amounts):
+            yield (str(bill), str(code), *map(format_paise, paise))
+
+
+def bill_rows(rollups):
+    for bill, lines, *paise in zip(*(rollups[name].tolist() for name in
+                                     ("bill_no", "lines", "assessable_value", "bcd", "igst", "cess", "total_duty",
+                                      "rounded_total"))):
+        yield (str(bill), str(lines), *map(format_paise, paise))
+
+
+def write_customs_report(output, columns, duties, rollups=None, title="Customs Duty Report"):
+    """Stream a customs duty report for computed bill-of-entry lines to `output` (path or binary file).
+
+    `columns`, `duties` and `rollups` are as returned by
+    CUSTOMS_ENGINE.read_columns and calculate_bill_of_entry. Returns a dict
+    with the page, row and byte counts and the generation time. A path is
+    written beside itself and renamed into place when complete, so a
+    failure never leaves a truncated PDF there.
+    """
+    if isinstance(output, (str, os.PathLike)):
+        # Write-then-rename so a failure part way never leaves a truncated PDF behind
+        tmp_path = os.fspath(output) + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                stats = write_customs_report(f, columns, duties, rollups, title)
+            os.replace(tmp_path, output)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return stats
+
+    started = time.perf_counter()
+    report = CustomsReport(output, title)
+    heads = ("assessable_value", "bcd", "igst", "cess", "total_duty")
+    line_totals = ("Total", "", *(format_paise(int(np.sum(duties[name]))) for name in heads))
+    report.table("Line Items", LINE_HEADERS, LINE_WIDTHS, line_rows(columns, duties), line_totals)
+    if rollups is not None:
+        bill_totals = ("Total", str(int(np.sum(rollups["lines"]))),
+                       *(format_paise(int(np.sum(rollups[name]))) for name in heads + ("rounded_total",)))
+        report.table("Bill Summary", BILL_HEADERS, BILL_WIDTHS, bill_rows(rollups), bill_totals)
+    report.close()
+    return {"pages": report.pdf.pages, "rows": report.rows_written, "bytes": report.pdf.bytes_written,
+            "elapsed": time.perf_counter() - started}
+
+
+def benchmark(lines=100_000, filename=None):
+    from CUSTOMS_ENGINE import calculate_customs_batch, bill_rollups
+
+    rng = np.random.default_rng(11)
+    columns = {"bill_no": np.array([f"BE{i // 500:05d}" for i in range(lines)]),
+               "hs_code": rng.choice(["84713010", "87032190", "30049099", "95030090"], lines)}
+    duties = calculate_customs_batch(np.round(rng.uniform(100, 500_000, lines), 2), 250.0, 40.0,
+                                     rng.choice([0, 7.5, 10, 70], lines), rng.choice([12, 18, 28], lines), 3.0)
+    rollups = bill_rollups(columns["bill_no"], duties)
+    filename = filename or os.path.join(tempfile.gettempdir(), "customs_report_benchmark.pdf")
+    before = peak_rss_mb()
+    stats = write_customs_report(filename, columns, duties, rollups)
+    print(f"{stats['rows']:,} rows on {stats['pages']:,} pages ({stats['bytes'] / 1e6:.1f} MB) in "
+          f"{stats['elapsed']:.1f}s; peak RSS {before:.0f} MB before, {peak_rss_mb():.0f} MB after -> {filename}")
+
+
+def main(argv=None):
+    from CUSTOMS_ENGINE import read_columns, calculate_bill_of_entry
+
+    parser = argparse.ArgumentParser(description="Write a paginated PDF customs duty report for a file of "
+                                                 "bill-of-entry lines.")
+    parser.add_argument("input", help="CSV, TSV or Parquet of bill-of-entry lines (see CUSTOMS_ENGINE)")
+    parser.add_argument("output", help="where to write the PDF report")
+    parser.add_argument("--title", default="Customs Duty Report")
+    parser.add_argument("--delimiter", help="field delimiter (default: tab for .tsv, comma otherwise)")
+    args = parser.parse_args(argv)
+
+    try:
+        columns = read_columns(args.input, args.delimiter)
+        duties, rollups = calculate_bill_of_entry(columns)
+        stats = write_customs_report(args.output, columns, duties, rollups, args.title)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(f"Wrote {stats['rows']:,} rows on {stats['pages']:,} pages to {args.output} in {stats['elapsed']:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from CUSTOMS_ENGINE import (HS_CODE_COLUMN, VALUE_COLUMN, SHIPPING_COLUMN, INSURANCE_COLUMN, read_columns,
+                            write_columns, amount_column, line_rates)
+from FIXED_POINT import (BASIS_POINTS, ROUND_DOWN, ROUND_HALF_EVEN, ROUND_HALF_UP, to_paise, to_basis_points,
+                         format_paise)
+
+DEFAULT_MEMORY_MB = 256
+
+# Bytes per shipment x scenario cell of a chunk's working set, all preallocated: int64 duty,
+# subtotal, tax and remainder matrices plus two bool rounding masks; relative sweeps add an
+# int64 matrix for the per-shipment rates
+_CELL_BYTES = 4 * 8 + 2
+_RELATIVE_CELL_BYTES = _CELL_BYTES + 8
+# Bytes per shipment held for the whole sweep: value and assessable paise, plus room for the
+# shipping/insurance conversion; relative sweeps add the three base rates and their conversion
+_ROW_BYTES = 5 * 8
+_RELATIVE_ROW_BYTES = _ROW_BYTES + 5 * 8
+
+# Per-scenario summary columns; amounts are int64 paise
+SCENARIO_COLUMNS = ("scenario", "bcd_rate", "igst_rate", "cess_rate", "total_duty", "landed_cost", "mean_duty",
+                    "min_duty", "max_duty", "effective_rate", "change_vs_first")
+SCENARIO_PAISE_COLUMNS = ("total_duty", "landed_cost", "mean_duty", "min_duty", "max_duty", "change_vs_first")
+
+
+def scenario_grid(bcd_rates, igst_rates, cess_rates):
+    """Every combination of the candidate rates, as three flat arrays of percentages."""
+    bcd, igst, cess = np.meshgrid(np.atleast_1d(np.asarray(bcd_rates, dtype=np.float64)),
+                                  np.atleast_1d(np.asarray(igst_rates, dtype=np.float64)),
+                                  np.atleast_1d(np.asarray(cess_rates, dtype=np.float64)), indexing="ij")
+    return bcd.ravel(), igst.ravel(), cess.ravel()
+
+
+def chunk_rows(scenarios, memory_budget_mb=DEFAULT_MEMORY_MB, shipments=0, relative=False):
+    """Shipments per chunk so the per-shipment arrays and one chunk's matrices fit in the memory budget."""
+    cell_bytes = _RELATIVE_CELL_BYTES if relative else _CELL_BYTES
+    row_bytes = _RELATIVE_ROW_BYTES if relative else _ROW_BYTES
+    available = int(memory_budget_mb * 1024 * 1024) - shipments * row_bytes
+    per_row = max(scenarios, 1) * cell_bytes
+    if available < per_row:
+        raise ValueError(f"A {memory_budget_mb:g} MB budget is too small for {shipments:,} shipments x "
+                         f"{scenarios} scenarios")
+    return available // per_row
+
+
+def _apply_rate_into(amount, rate_bp, out, remainder, masks, rounding):
+    """FIXED_POINT.apply_rate written into preallocated buffers: out = amount * rate_bp / 10000, rounded."""
+    np.multiply(amount, rate_bp, out=out)
+    np.divmod(out, BASIS_POINTS, out=(out, remainder))
+    carry, other = masks
+    if rounding == ROUND_DOWN:
+        # divmod floors; step negative inexact results back towards zero
+        np.not_equal(remainder, 0, out=carry)
+        np.less(out, 0, out=other)
+        carry &= other
+    elif rounding == ROUND_HALF_UP:
+        remainder *= 2
+        np.equal(remainder, BASIS_POINTS, out=carry)
+        np.greater_equal(out, 0, out=other)
+        carry &= other
+        np.greater(remainder, BASIS_POINTS, out=other)
+        carry |= other
+    elif rounding == ROUND_HALF_EVEN:
+        remainder *= 2
+        np.equal(remainder, BASIS_POINTS, out=carry)
+        np.greater(remainder, BASIS_POINTS, out=other)
+        # Ties round up only from an odd quotient; the remainder is free to hold the low bit
+        np.bitwise_and(out, 1, out=remainder)
+        np.logical_and(carry, remainder, out=carry)
+        carry |= other
+    else:
+        raise ValueError(f"Unknown rounding rule: {rounding}")
+    out += carry
+    return out
+
+
+def sweep_scenarios(values, shipping, insurance, bcd_rates, igst_rates, cess_rates, base_rates=None,
+                    memory_budget_mb=DEFAULT_MEMORY_MB, rounding=ROUND_HALF_UP, on_chunk=None):
+    """Duty for every shipment under every rate scenario.
+
+    `values`, `shipping` and `insurance` are per-shipment rupee amounts;
+    `bcd_rates`, `igst_rates` and `cess_rates` are per-scenario percentages
+    (see scenario_grid). With `base_rates` = (bcd, igst, cess) per-shipment
+    percentages, the scenario rates are changes added to each shipment's
+    current rates rather than flat rates for the whole portfolio.
+
+    The shipment x scenario matrix is computed by broadcasting, a chunk of
+    shipments at a time, into matrices allocated once, so the sweep (the
+    per-shipment arrays plus one chunk's working set) stays within
+    `memory_budget_mb`; a budget too small for even one shipment per chunk
+    raises ValueError. Duty matches FIXED_POINT.calculate_customs_duty_paise.
+    `on_chunk(start, total_duty)` receives each chunk's int64 paise matrix
+    for callers that want the full matrix (e.g. written to a memmap); the
+    matrix is reused for the next chunk. Returns a dict of per-scenario
+    arrays keyed by SCENARIO_COLUMNS.
+    """
+    value, shipping, insurance = np.broadcast_arrays(*np.atleast_1d(to_paise(values), to_paise(shipping),
+                                                                    to_paise(insurance)))
+    assessable = value + shipping + insurance
+    del shipping, insurance
+    scenario_bp = np.stack(np.broadcast_arrays(*np.atleast_1d(to_basis_points(bcd_rates),
+                                                              to_basis_points(igst_rates),
+                                                              to_basis_points(cess_rates))))
+    shipments = len(value)
+    scenarios = scenario_bp.shape[1]
+    relative = base_rates is not None
+    if relative:
+        base_bp = np.empty((3, shipments), dtype=np.int64)
+        for row, rates in zip(base_bp, base_rates):
+            row[:] = to_basis_points(rates)
+
+    total = np.zeros(scenarios, dtype=np.int64)
+    low = np.full(scenarios, np.iinfo(np.int64).max)
+    high = np.full(scenarios, np.iinfo(np.int64).min)
+    assessable_total = int(assessable.sum())
+
+    step = min(chunk_rows(scenarios, memory_budget_mb, shipments, relative), max(shipments, 1))
+    duty_buffer, subtotal_buffer, tax_buffer, remainder_buffer = (np.empty((step, scenarios), dtype=np.int64)
+                                                                  for _ in range(4))
+    mask_buffers = (np.empty((step, scenarios), dtype=bool), np.empty((step, scenarios), dtype=bool))
+    rate_buffer = np.empty((step, scenarios), dtype=np.int64) if relative else None
+    for start in range(0, shipments, step):
+        rows = slice(start, start + step)
+        count = len(value[rows])
+        duty, subtotal, tax, remainder = (buffer[:count] for buffer in
+                                          (duty_buffer, subtotal_buffer, tax_buffer, remainder_buffer))
+        masks = tuple(mask[:count] for mask in mask_buffers)
+
+        def rates(head):
+            # Flat sweeps broadcast the scenario row; relative ones add it to each shipment's base rate
+            if not relative:
+                return scenario_bp[head]
+            rate = rate_buffer[:count]
+            np.add(base_bp[head, rows, None], scenario_bp[head], out=rate)
+            return np.maximum(rate, 0, out=rate)
+
+        _apply_rate_into(value[rows, None], rates(0), duty, remainder, masks, rounding)  # BCD
+        np.add(duty, assessable[rows, None], out=subtotal)
+        _apply_rate_into(subtotal, rates(1), tax, remainder, masks, rounding)  # IGST
+        duty += tax
+        _apply_rate_into(subtotal, rates(2), tax, remainder, masks, rounding)  # cess
+        duty += tax
+        total += duty.sum(axis=0)
+        np.minimum(low, duty.min(axis=0), out=low)
+        np.maximum(high, duty.max(axis=0), out=high)
+        if on_chunk:
+            on_chunk(start, duty)
+
+    return {
+        "scenario": np.arange(scenarios),
+        "bcd_rate": scenario_bp[0] / 100,
+        "igst_rate": scenario_bp[1] / 100,
+        "cess_rate": scenario_bp[2] / 100,
+        "total_duty": total,
+        "landed_cost": total + assessable_total,
+        "mean_duty": np.rint(total / max(shipments, 1)).astype(np.int64),
+        "min_duty": low if shipments else np.zeros(scenarios, dtype=np.int64),
+        "max_duty": high if shipments else np.zeros(scenarios, dtype=np.int64),
+        "effective_rate": total / assessable_total * 100 if assessable_total else np.zeros(scenarios),
+        "change_vs_first": total - total[0] if scenarios else total,
+    }
+
+
+def benchmark(shipments=200_000, memory_budget_mb=64):
+    rng = np.random.default_rng(5)
+    values = np.round(rng.uniform(1000, 2_000_000, shipments), 2)
+    shipping = np.round(values * 0.02, 2)
+    insurance = np.round(values * 0.005, 2)
+    grid = scenario_grid([0, 5, 7.5, 10, 15, 20], [5, 12, 18, 28], [0, 1, 3])
+    start = time.perf_counter()
+    stats = sweep_scenarios(values, shipping, insurance, *grid, memory_budget_mb=memory_budget_mb)
+    elapsed = time.perf_counter() - start
+    cells = shipments * len(stats["scenario"])
+    print(f"{shipments:,} shipments x {len(stats['scenario'])} scenarios ({cells:,} cells, "
+          f"{memory_budget_mb} MB budget): {elapsed:.2f}s, {cells / elapsed:,.0f} cells/s")
+
+
+def _rate_list(text):
+    return [float(rate.strip().rstrip("%")) for rate in text.split(",") if rate.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-estimate duty for an import portfolio under a grid of "
+                                                 "candidate BCD/IGST/cess rates.")
+    parser.add_argument("input", help="CSV, TSV or Parquet with value and optional shipping, insurance, hs_code columns")
+    parser.add_argument("output", help="where to write the per-scenario summary (CSV)")
+    parser.add_argument("--bcd", type=_rate_list, default=[0.0], help="comma-separated BCD rates (%%)")
+    parser.add_argument("--igst", type=_rate_list, default=[0.0], help="comma-separated IGST rates (%%)")
+    parser.add_argument("--cess", type=_rate_list, default=[0.0], help="comma-separated cess rates (%%)")
+    parser.add_argument("--relative", action="store_true",
+                        help="treat the rates as changes to each shipment's current tariff rates")
+    parser.add_argument("--memory-mb", type=float, default=DEFAULT_MEMORY_MB, help="memory budget for the duty matrix")
+    parser.add_argument("--delimiter", help="field delimiter (default: tab for .tsv, comma otherwise)")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    try:
+        columns = read_columns(args.input, args.delimiter)
+        if VALUE_COLUMN not in columns:
+            raise ValueError(f"Input has no '{VALUE_COLUMN}' column")
+        length = len(columns[VALUE_COLUMN])
+        base_rates = None
+        if args.relative:
+            if HS_CODE_COLUMN not in columns:
+                raise ValueError(f"--relative needs an '{HS_CODE_COLUMN}' column to look up current rates")
+            rates = line_rates(columns, length)
+            base_rates = [rates[name] for name in ("bcd_rate", "igst_rate", "cess_rate")]
+        stats = sweep_scenarios(amount_column(columns[VALUE_COLUMN], length, required=VALUE_COLUMN),
+                                amount_column(columns.get(SHIPPING_COLUMN), length),
+                                amount_column(columns.get(INSURANCE_COLUMN), length),
+                                *scenario_grid(args.bcd, args.igst, args.cess), base_rates=base_rates,
+                                memory_budget_mb=args.memory_mb)
+        write_columns(args.output, stats, SCENARIO_PAISE_COLUMNS)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    best = int(np.argmin(stats["total_duty"]))
+    print(f"{len(stats['scenario'])} scenarios over {length:,} shipments in {time.perf_counter() - started:.1f}s; "
+          f"lowest total duty {format_paise(stats['total_duty'][best])} (scenario {best})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,13 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-from fpdf import FPDF
+from tkinter import ttk, messagebox, filedialog
+
+import numpy as np
+
+from CUSTOMS_ENGINE import calculate_customs_batch
+from CUSTOMS_REPORT import write_customs_report
+from FIXED_POINT import from_paise
+from HS_TARIFF import default_tariff
+
 
 class CustomsDutyCalculator:
     def __init__(self, root):
@@ -9,14 +16,7 @@ class CustomsDutyCalculator:
         self.root.geometry("600x700")
         self.root.configure(bg="#f0f0f0")
 
-        self.valid_hs_codes = {
-            "Vehicles": "8703",
-            "Pharmaceutical Goods": "3006",
-            "Laptop, Mobile Phones, Desktop and Personal Computers": "8471",
-            "Printers, Keyboards, USB Devices": "8528",
-            "Precious Metals": "7113",
-            "Toy Items": "9503"
-        }
+        self.tariff = default_tariff()
 
         self.setup_ui()
 
@@ -32,6 +32,7 @@ class CustomsDutyCalculator:
         tk.Label(main_frame, text="Type of Goods (HS Code):", font=("Helvetica", 12), bg="#f0f0f0").pack(anchor="w", pady=5)
         self.hs_code_entry = tk.Entry(main_frame, font=("Helvetica", 12), width=30)
         self.hs_code_entry.pack(fill="x", pady=5)
+        self.hs_code_entry.bind("<FocusOut>", lambda e: self.apply_tariff_rates())
 
         # Value of Goods
         tk.Label(main_frame, text="Value of Goods (in local currency):", font=("Helvetica", 12), bg="#f0f0f0").pack(anchor="w", pady=5)
@@ -48,7 +49,7 @@ class CustomsDutyCalculator:
         self.insurance_entry = tk.Entry(main_frame, font=("Helvetica", 12), width=30)
         self.insurance_entry.pack(fill="x", pady=5)
 
-        # Basic Customs Duty Rate
+        # Basic Customs Duty Rate, filled in from the tariff when left blank
         tk.Label(main_frame, text="Basic Customs Duty Rate (%):", font=("Helvetica", 12), bg="#f0f0f0").pack(anchor="w", pady=5)
         self.bcd_rate_entry = tk.Entry(main_frame, font=("Helvetica", 12), width=30)
         self.bcd_rate_entry.pack(fill="x", pady=5)
@@ -92,27 +93,40 @@ class CustomsDutyCalculator:
                                font=("Helvetica", 12, "bold"))
         pdf_button.pack(pady=10)
 
+    def apply_tariff_rates(self):
+        """Fill the BCD and IGST rates from the tariff entry for the typed HS code."""
+        entry = self.tariff.resolve(self.hs_code_entry.get())
+        if entry is None:
+            return None
+        # A rate missing from the tariff is left blank for the user to enter, never assumed to be 0%
+        self.bcd_rate_entry.delete(0, tk.END)
+        if entry["bcd_rate"] is not None:
+            self.bcd_rate_entry.insert(0, f"{entry['bcd_rate']:g}")
+        if entry["igst_rate"] is not None and f"{entry['igst_rate']:g}%" in self.igst_rate_combo["values"]:
+            self.igst_rate.set(f"{entry['igst_rate']:g}%")
+        return entry
+
     def calculate(self):
         try:
-            hs_code = self.hs_code_entry.get()
-            if hs_code not in self.valid_hs_codes.values():
-                messagebox.showerror("Error", "Invalid HS Code. Please enter a valid HS Code.")
+            entry = self.tariff.resolve(self.hs_code_entry.get())
+            if entry is None:
+                messagebox.showerror("Error", "Invalid HS Code. No tariff entry covers this code.")
+                return
+            if not self.bcd_rate_entry.get().strip():
+                self.apply_tariff_rates()
+            if entry["cess_rate"] is None:
+                messagebox.showerror("Error", f"The tariff entry for {entry['code']} has no cess rate.")
                 return
 
             value_of_goods = float(self.value_entry.get())
             shipping_cost = float(self.shipping_entry.get())
             insurance_cost = float(self.insurance_entry.get())
-            bcd_rate = float(self.bcd_rate_entry.get()) / 100
-            igst_rate = float(self.igst_rate.get().strip('%')) / 100
+            bcd_rate = float(self.bcd_rate_entry.get())
+            igst_rate = float(self.igst_rate.get().strip('%'))
+            cess_rate = entry["cess_rate"]
 
-            # Example calculation logic (these rates would need to be customized for the specific country and regulations)
-            cess_rate = 0.03  # Cess rate
-
-            bcd = value_of_goods * bcd_rate
-            subtotal = value_of_goods + bcd + shipping_cost + insurance_cost
-            igst = subtotal * igst_rate
-            cess = subtotal * cess_rate
-            total_duty = bcd + igst + cess
+            duty = calculate_customs_batch(value_of_goods, shipping_cost, insurance_cost, bcd_rate, igst_rate, cess_rate)
+            bcd, igst, cess, total_duty = (float(from_paise(duty[name][0])) for name in ("bcd", "igst", "cess", "total_duty"))
 
             # Clear previous results
             for widget in self.scrollable_frame.winfo_children():
@@ -120,6 +134,8 @@ class CustomsDutyCalculator:
 
             # Display results
             tk.Label(self.scrollable_frame, text="Breakdown of Customs Duty", font=("Helvetica", 14, "bold"), bg="white").pack(pady=10)
+            tk.Label(self.scrollable_frame, text=f"Tariff entry: {entry['code']} - {entry['description']}",
+                     font=("Helvetica", 10), bg="white").pack()
             self.create_result_row("Basic Customs Duty (BCD):", bcd)
             self.create_result_row("Integrated GST (IGST):", igst)
             self.create_result_row("Cess:", cess)
@@ -132,6 +148,7 @@ class CustomsDutyCalculator:
                 "Cess": cess,
                 "Total Customs Duty": total_duty
             }
+            self.report_line = ({"hs_code": np.array([entry["code"]]), "bill_no": np.array(["-"])}, duty)
 
         except ValueError:
             messagebox.showerror("Error", "Please enter valid numeric values for the amounts and BCD rate.")
@@ -148,18 +165,16 @@ class CustomsDutyCalculator:
             messagebox.showerror("Error", "No results to convert. Please calculate customs duty first.")
             return
 
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.set_font("Arial", size=12)
-
-        pdf.cell(200, 10, txt="Breakdown of Customs Duty", ln=True, align='C')
-        pdf.ln(10)
-
-        for key, value in self.results.items():
-            pdf.cell(200, 10, txt=f"{key}: ₹ {value:.2f}", ln=True)
-
-        pdf.output("Customs_Duty_Breakdown.pdf")
-        messagebox.showinfo("Success", "PDF has been created successfully.")
+        file_path = filedialog.asksaveasfilename(defaultextension=".pdf", initialfile="Customs_Duty_Breakdown.pdf",
+                                                 filetypes=[("PDF files", "*.pdf")])
+        if file_path:
+            columns, duty = self.report_line
+            try:
+                write_customs_report(file_path, columns, duty, title="Breakdown of Customs Duty")
+            except (OSError, ValueError) as e:
+                messagebox.showerror("Error", f"Could not save the PDF: {e}")
+                return
+            messagebox.showinfo("Success", f"PDF saved successfully at {file_path}")
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -1,11 +1,14 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 
+from COMPOSITION_ENGINE import screen_eligibility, explain, REASON_INVALID_TURNOVER, REASON_MESSAGES
+from TURNOVER_AGGREGATOR import TurnoverAggregator
+
 class CompositionSchemeCalculator:
     def __init__(self, root):
         self.root = root
         self.root.title("Composition Scheme Eligibility Calculator")
-        self.root.geometry("500x350")
+        self.root.geometry("500x400")
 
         # Define colors
         self.bg_color = "#ffffff"  # White background
@@ -48,39 +51,46 @@ class CompositionSchemeCalculator:
                                                     values=["Registered Regular", "Registered Composition", "Not Registered"], font=("Helvetica", 12))
         self.gst_registered_combobox.grid(row=4, column=1, padx=10)
 
+        # Input 5: GSTIN, used for the state limit and to look up turnover when none is typed
+        tk.Label(main_frame, text="5. GSTIN (optional):", font=("Helvetica", 12), bg=self.bg_color).grid(row=5, column=0, sticky="w", pady=10, padx=10)
+        self.gstin_entry = tk.Entry(main_frame, font=("Helvetica", 12))
+        self.gstin_entry.grid(row=5, column=1, padx=10)
+
         # Button to check eligibility
         self.check_eligibility_button = tk.Button(main_frame, text="Check Eligibility", command=self.check_eligibility,
                                                   bg=self.primary_color, fg="white", font=("Helvetica", 12, "bold"))
-        self.check_eligibility_button.grid(row=5, columnspan=2, pady=20)
+        self.check_eligibility_button.grid(row=6, columnspan=2, pady=20)
+
+    def aggregate_turnover(self, gstin):
+        """Preceding financial year's aggregate turnover under the GSTIN's PAN, from the invoice history.
+
+        Read from the same state file the TURNOVER_AGGREGATOR command line
+        writes: $GST_TURNOVER_STATE, else turnover_state.json.
+        """
+        return float(TurnoverAggregator().preceding_year_turnover([gstin])[0])
 
     def check_eligibility(self):
         try:
             # Get inputs
+            gstin = self.gstin_entry.get().strip().upper()
+            if not self.turnover_entry.get().strip() and len(gstin) == 15:
+                self.turnover_entry.insert(0, f"{self.aggregate_turnover(gstin):.2f}")
             turnover = float(self.turnover_entry.get())
             business_type = self.business_type_var.get()
             interstate_sales = self.interstate_sales_var.get()
             gst_registration = self.gst_registered_var.get()
 
-            # Validate turnover input
-            if turnover <= 0:
-                messagebox.showerror("Error", "Annual Turnover must be greater than zero.")
+            eligible, reasons = screen_eligibility(turnover, business_type, interstate_sales, gst_registration,
+                                                   state_code=gstin or None)
+            if reasons[0] & REASON_INVALID_TURNOVER:
+                messagebox.showerror("Error", REASON_MESSAGES[REASON_INVALID_TURNOVER])
                 return
 
-            # Determine eligibility based on criteria
-            if turnover <= 15000000 and business_type in ["Goods", "Both"] and interstate_sales == "No" and gst_registration in ["Registered Regular", "Not Registered"]:
+            if eligible[0]:
                 messagebox.showinfo("Eligibility Result", "You are eligible for Composition Scheme.")
             else:
                 # Provide a suggestion based on why they are not eligible
-                suggestion = ""
-                if turnover > 15000000:
-                    suggestion += "Your turnover exceeds the maximum limit for Composition Scheme.\n"
-                if business_type not in ["Goods", "Both"]:
-                    suggestion += "Composition Scheme is applicable only for businesses dealing in goods or both goods and services.\n"
-                if interstate_sales == "Yes":
-                    suggestion += "Interstate sales are not allowed under the Composition Scheme.\n"
-                if gst_registration == "Registered Composition":
-                    suggestion += "You are already registered under the Composition Scheme.\n"
-
+                suggestion = "".join(f"{message}\n" for message in explain(reasons[0]))
                 messagebox.showinfo("Eligibility Result", f"You are not eligible for Composition Scheme.\n\nSuggestions:\n{suggestion}")
 
         except ValueError:
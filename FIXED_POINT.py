@@ -0,0 +1,194 @@
+import time
+from decimal import Decimal, ROUND_HALF_UP as DECIMAL_HALF_UP
+
+import numpy as np
+
+from GST_ENGINE import calculate_gst_batch
+
+# Rounding rules. Amounts are int64 paise and rates are int64 basis points
+# (18% == 1800), so every line is exact until one of these is applied.
+ROUND_HALF_UP = "half_up"      # ties away from zero, as on a printed invoice
+ROUND_HALF_EVEN = "half_even"  # banker's rounding
+ROUND_DOWN = "down"            # truncate towards zero
+
+BASIS_POINTS = 10000
+
+
+def to_paise(amounts):
+    """Rupee amounts (float or array) to int64 paise, rounded to the nearest paisa."""
+    return np.rint(np.asarray(amounts, dtype=np.float64) * 100).astype(np.int64)
+
+
+def to_basis_points(percentages):
+    """Percentage rates (18, 2.5, ...) to int64 basis points."""
+    return np.rint(np.asarray(percentages, dtype=np.float64) * 100).astype(np.int64)
+
+
+def from_paise(paise):
+    """int64 paise to float rupees, for display only."""
+    return np.asarray(paise, dtype=np.int64) / 100
+
+
+def format_paise(paise):
+    """Exact "1234.50" style string for a single paise amount."""
+    paise = int(paise)
+    sign = "-" if paise < 0 else ""
+    rupees, paise = divmod(abs(paise), 100)
+    return f"{sign}{rupees}.{paise:02d}"
+
+
+def divide_rounded(numerator, denominator, rounding=ROUND_HALF_UP):
+    """Integer division of int64 arrays with an explicit rounding rule."""
+    numerator = np.asarray(numerator, dtype=np.int64)
+    denominator = np.asarray(denominator, dtype=np.int64)
+    quotient, remainder = np.divmod(numerator, denominator)
+    if rounding == ROUND_DOWN:
+        # divmod floors; step negative inexact results back towards zero
+        return quotient + ((remainder != 0) & (quotient < 0))
+    twice = 2 * remainder
+    if rounding == ROUND_HALF_UP:
+        tie_up = (twice == denominator) & (quotient >= 0)
+    elif rounding == ROUND_HALF_EVEN:
+        tie_up = (twice == denominator) & (quotient % 2 == 1)
+    else:
+        raise ValueError(f"Unknown rounding rule: {rounding}")
+    return quotient + ((twice > denominator) | tie_up)
+
+
+def apply_rate(amount_paise, rate_bp, rounding=ROUND_HALF_UP):
+    """amount * rate for paise amounts and basis-point rates, rounded to a paisa."""
+    return divide_rounded(np.asarray(amount_paise, dtype=np.int64) * np.asarray(rate_bp, dtype=np.int64),
+                          BASIS_POINTS, rounding)
+
+
+def calculate_gst_paise(price_paise, rate_bp, profit_bp=0, inclusive=False, rounding=ROUND_HALF_UP):
+    """Fixed-point counterpart of GST_ENGINE.calculate_gst_batch.
+
+    Per-line rules: profit, GST (exclusive prices) and the pre-GST price
+    (inclusive prices) are each rounded to a paisa with `rounding`; inclusive
+    GST is the exact remainder post - taxable. CGST is half the GST rounded
+    the same way and SGST takes the remainder, so CGST + SGST == GST on every
+    line.
+    """
+    price = np.asarray(price_paise, dtype=np.int64)
+    rate = np.asarray(rate_bp, dtype=np.int64)
+    profit_bp = np.asarray(profit_bp, dtype=np.int64)
+    inclusive = np.asarray(inclusive, dtype=bool)
+    price, rate, profit_bp, inclusive = np.broadcast_arrays(*np.atleast_1d(price, rate, profit_bp, inclusive))
+
+    if inclusive.any():
+        pre_gst_price = np.where(inclusive, divide_rounded(price * BASIS_POINTS, BASIS_POINTS + rate, rounding),
+                                 price)
+    else:
+        pre_gst_price = price.copy()
+
+    profit_amount = apply_rate(pre_gst_price, profit_bp, rounding)
+    taxable_value = pre_gst_price + profit_amount
+    gst_amount = apply_rate(taxable_value, rate, rounding)
+    if inclusive.any():
+        np.subtract(price, taxable_value, out=gst_amount, where=inclusive)
+    post_gst_price = taxable_value + gst_amount
+
+    cgst_amount = divide_rounded(gst_amount, 2, rounding)
+
+    return {
+        "pre_gst_price": pre_gst_price,
+        "profit_amount": profit_amount,
+        "taxable_value": taxable_value,
+        "gst_amount": gst_amount,
+        "cgst_amount": cgst_amount,
+        "sgst_amount": gst_amount - cgst_amount,
+        "post_gst_price": post_gst_price,
+    }
+
+
+def calculate_customs_duty_paise(value_paise, shipping_paise, insurance_paise, bcd_bp, igst_bp, cess_bp,
+                                 rounding=ROUND_HALF_UP):
+    """Fixed-point counterpart of the customs duty formula, one rounded paisa per head."""
+    value = np.asarray(value_paise, dtype=np.int64)
+    bcd = apply_rate(value, bcd_bp, rounding)
+    subtotal = value + bcd + np.asarray(shipping_paise, dtype=np.int64) + np.asarray(insurance_paise, dtype=np.int64)
+    igst = apply_rate(subtotal, igst_bp, rounding)
+    cess = apply_rate(subtotal, cess_bp, rounding)
+    return {
+        "bcd": bcd,
+        "igst": igst,
+        "cess": cess,
+        "total_duty": bcd + igst + cess,
+    }
+
+
+def gst_offset_paise(input_paise, output_paise):
+    """Net GST payable (negative means credit left) from (n, 3) IGST/CGST/SGST paise arrays."""
+    return (np.asarray(output_paise, dtype=np.int64).sum(axis=-1)
+            - np.asarray(input_paise, dtype=np.int64).sum(axis=-1))
+
+
+def round_to_rupee(paise, rounding=ROUND_HALF_UP):
+    """Round paise amounts to whole rupees, still expressed in paise."""
+    return divide_rounded(paise, 100, rounding) * 100
+
+
+def invoice_totals_paise(invoice_ids, columns, rounding=ROUND_HALF_UP):
+    """Per-invoice rollup of per-line paise columns.
+
+    Lines are summed exactly in int64, then the invoice total
+    (post_gst_price, or the first column given) is rounded to the nearest
+    rupee; the difference is reported as round_off. Returns a dict holding
+    the distinct invoice ids and one summed array per column.
+    """
+    invoice_ids = np.asarray(invoice_ids)
+    order = np.argsort(invoice_ids, kind="stable")
+    sorted_ids = invoice_ids[order]
+    starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]])
+
+    totals = {"invoice_id": sorted_ids[starts]}
+    for name, column in columns.items():
+        totals[name] = np.add.reduceat(np.asarray(column, dtype=np.int64)[order], starts)
+
+    total_name = "post_gst_price" if "post_gst_price" in columns else next(iter(columns))
+    totals["rounded_total"] = round_to_rupee(totals[total_name], rounding)
+    totals["round_off"] = totals["rounded_total"] - totals[total_name]
+    return totals
+
+
+def _calculate_gst_decimal(prices, rates, ratios):
+    hundred = Decimal(100)
+    paisa = Decimal("0.01")
+    results = []
+    for price, rate, ratio in zip(prices, rates, ratios):
+        profit = (price * ratio / hundred).quantize(paisa, DECIMAL_HALF_UP)
+        taxable = price + profit
+        gst = (taxable * rate / hundred).quantize(paisa, DECIMAL_HALF_UP)
+        results.append(taxable + gst)
+    return results
+
+
+def benchmark(rows=5_000_000, decimal_rows=200_000):
+    rng = np.random.default_rng(0)
+    price_paise = rng.integers(100, 10_000_000, rows)
+    rate_bp = rng.choice([300, 500, 1200, 1800, 2800], rows)
+    profit_bp = rng.integers(0, 4000, rows)
+
+    start = time.perf_counter()
+    calculate_gst_batch(price_paise / 100, rate_bp / 100, profit_bp / 100)
+    float_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    calculate_gst_paise(price_paise, rate_bp, profit_bp)
+    paise_elapsed = time.perf_counter() - start
+
+    prices = [Decimal(int(p)) / 100 for p in price_paise[:decimal_rows]]
+    rates = [Decimal(int(r)) / 100 for r in rate_bp[:decimal_rows]]
+    ratios = [Decimal(int(r)) / 100 for r in profit_bp[:decimal_rows]]
+    start = time.perf_counter()
+    _calculate_gst_decimal(prices, rates, ratios)
+    decimal_elapsed = time.perf_counter() - start
+
+    for label, count, elapsed in (("float64", rows, float_elapsed), ("int64 paise", rows, paise_elapsed),
+                                  ("Decimal", decimal_rows, decimal_elapsed)):
+        print(f"{label:>12}: {count:,} rows in {elapsed:.3f}s ({count / elapsed / 1e6:.2f}M rows/s)")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,160 @@
+import re
+import time
+
+import numpy as np
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+# Weight of trigram coverage (query in entry or entry in query) against overall Dice similarity
+COVERAGE_WEIGHT = 0.7
+
+
+def normalize(text):
+    return " " + _NON_WORD.sub(" ", text.lower()).strip() + " "
+
+
+def _trigram_codes(data):
+    # data: uint8 array of one or more normalized strings joined by 0 bytes
+    codes = (data[:-2].astype(np.int32) << 16) | (data[1:-1].astype(np.int32) << 8) | data[2:]
+    valid = (data[:-2] != 0) & (data[1:-1] != 0) & (data[2:] != 0)
+    return codes, valid
+
+
+def query_trigrams(text):
+    data = np.frombuffer(normalize(text).encode("ascii", "ignore"), dtype=np.uint8)
+    if len(data) < 3:
+        return np.empty(0, dtype=np.int32)
+    codes, valid = _trigram_codes(data)
+    return np.unique(codes[valid])
+
+
+class FuzzyIndex:
+    """Typo-tolerant ranked lookup over catalog descriptions.
+
+    Each description is reduced to its set of character trigrams and the
+    index keeps, per trigram, the sorted array of entries containing it.
+    A query counts shared trigrams per entry with one bincount over the
+    postings of its own trigrams, so misspellings like "refridgerator"
+    still share most trigrams with "refrigerator".
+    """
+
+    def __init__(self, entries):
+        # entries: iterable of (description, payload)
+        self.texts = []
+        self.payloads = []
+        for text, payload in entries:
+            self.texts.append(text)
+            self.payloads.append(payload)
+
+        encoded = [normalize(text).encode("ascii", "ignore") for text in self.texts]
+        lengths = np.fromiter((len(e) + 1 for e in encoded), dtype=np.int64, count=len(encoded))
+        data = np.frombuffer(b"\0".join(encoded) + b"\0", dtype=np.uint8)
+        entry_of_byte = np.repeat(np.arange(len(encoded), dtype=np.int64), lengths)
+
+        if len(data) >= 3:
+            codes, valid = _trigram_codes(data)
+            entry_ids = entry_of_byte[:-2][valid]
+            # One (trigram, entry) pair per distinct trigram of each entry
+            pairs = np.sort((codes[valid].astype(np.int64) << 32) | entry_ids)
+            pairs = pairs[np.r_[True, pairs[1:] != pairs[:-1]]]
+        else:
+            pairs = np.empty(0, dtype=np.int64)
+
+        pair_codes = (pairs >> 32).astype(np.int32)
+        self._postings = (pairs & 0xFFFFFFFF).astype(np.int32)
+        # CSR layout: postings of self._codes[i] are _postings[_offsets[i]:_offsets[i + 1]]
+        starts = np.flatnonzero(np.r_[True, pair_codes[1:] != pair_codes[:-1]][:len(pair_codes)])
+        self._codes = pair_codes[starts]
+        self._offsets = np.append(starts, len(pair_codes))
+        self._gram_counts = np.bincount(self._postings, minlength=len(self.texts)).astype(np.float64)
+
+    def __len__(self):
+        return len(self.texts)
+
+    def scores(self, query):
+        """Similarity of `query` to every entry, in [0, 1]."""
+        grams = query_trigrams(query)
+        shared = np.zeros(len(self.texts), dtype=np.float64)
+        if not len(grams) or not len(self._codes):
+            return shared
+        slots = np.searchsorted(self._codes, grams)
+        found = slots < len(self._codes)
+        found[found] = self._codes[slots[found]] == grams[found]
+        slots = slots[found]
+        if len(slots):
+            postings = np.concatenate([self._postings[self._offsets[s]:self._offsets[s + 1]] for s in slots])
+            shared = np.bincount(postings, minlength=len(self.texts)).astype(np.float64)
+        # Coverage either way round, so a short category inside a long description also scores
+        coverage = np.maximum(shared / len(grams), shared / np.maximum(self._gram_counts, 1))
+        dice = 2 * shared / (len(grams) + self._gram_counts)
+        return COVERAGE_WEIGHT * coverage + (1 - COVERAGE_WEIGHT) * dice
+
+    def top_k(self, query, k=5, min_score=0.0):
+        """Best `k` matches as (description, payload, score), best first."""
+        scores = self.scores(query)
+        if not len(scores):
+            return []
+        k = min(k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [(self.texts[i], self.payloads[i], float(scores[i])) for i in best if scores[i] > min_score]
+
+    def best_matches(self, queries, min_score=0.35):
+        """Batch reconciliation: best match per free-text query, or None below `min_score`."""
+        results = []
+        for query in queries:
+            matches = self.top_k(query, 1, min_score)
+            results.append(matches[0] if matches else None)
+        return results
+
+
+def catalog_entries(rate_master=None):
+    """(description, payload) pairs from the GST rate catalog and the customs HS codes."""
+    from RATE_MASTER import default_rate_master, KIND_GST
+
+    rate_master = rate_master or default_rate_master()
+    entries = []
+    for record in rate_master.records():
+        if record["kind"] == KIND_GST:
+            entries.append((record["description"], {"source": "gst", "gst_rate": f"{record['gst_rate']:g}%"}))
+        else:
+            entries.append((record["description"], {"source": "customs", "hs_code": record["code"]}))
+    return entries
+
+
+def reconcile_descriptions(descriptions, index=None, min_score=0.35):
+    """Map free-text product descriptions to catalog entries and their rates.
+
+    Returns one dict per description with the matched catalog entry, its
+    payload fields and the score; unmatched descriptions get match None.
+    """
+    if index is None:
+        index = FuzzyIndex(catalog_entries())
+    results = []
+    for description, match in zip(descriptions, index.best_matches(descriptions, min_score)):
+        row = {"description": description, "match": None, "score": 0.0}
+        if match:
+            text, payload, score = match
+            row.update(payload, match=text, score=score)
+        results.append(row)
+    return results
+
+
+def benchmark(entries=100_000, queries=1000):
+    words = ["steel", "copper", "cotton", "fabric", "refrigerator", "washing", "machine", "biscuits", "tea",
+             "coffee", "mobile", "phone", "parts", "accessories", "frozen", "vegetables", "printed", "books"]
+    texts = [f"{words[i % 18]} {words[(i * 7) % 18]} {words[(i * 13) % 18]} grade {i}" for i in range(entries)]
+    start = time.perf_counter()
+    index = FuzzyIndex((text, None) for text in texts)
+    print(f"index of {entries:,} entries built in {time.perf_counter() - start:.2f}s")
+
+    typos = ["refridgerator parts", "biscuts", "moble phone acessories", "frozn vegtables"]
+    start = time.perf_counter()
+    for i in range(queries):
+        index.top_k(typos[i % len(typos)], 10)
+    elapsed = time.perf_counter() - start
+    print(f"top-10 query: {elapsed / queries * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    benchmark()
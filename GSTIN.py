@@ -0,0 +1,193 @@
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from COLUMN_IO import read_columns, write_columns
+from PLACE_OF_SUPPLY import STATE_CODES, VALID_STATE
+
+GSTIN_LENGTH = 15
+CHECK_BASE = 36
+ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+# Problems found in a GSTIN, one bit each in the error mask
+ERROR_LENGTH = 1
+ERROR_CHARACTERS = 2
+ERROR_STATE = 4
+ERROR_PAN = 8
+ERROR_ENTITY = 16
+ERROR_CHECK_DIGIT = 32
+
+ERROR_MESSAGES = {
+    ERROR_LENGTH: "GSTIN must be 15 characters.",
+    ERROR_CHARACTERS: "GSTIN may only contain letters and digits.",
+    ERROR_STATE: "GSTIN must start with a valid two-digit state code.",
+    ERROR_PAN: "Characters 3-12 of a GSTIN must be a PAN (5 letters, 4 digits, 1 letter).",
+    ERROR_ENTITY: "Character 13 of a GSTIN (registration number under the PAN) cannot be 0.",
+    ERROR_CHECK_DIGIT: "GSTIN check digit does not match.",
+}
+
+# Code point -> base-36 value, -1 for anything that can't appear in a GSTIN. Lowercase
+# letters map like capitals, so batches need no upper-casing pass; code points past the
+# table are clipped onto its last slot, DEL, which is invalid too.
+CHAR_VALUES = np.full(128, -1, dtype=np.int64)
+CHAR_VALUES[[ord(c) for c in ALPHABET]] = np.arange(CHECK_BASE)
+CHAR_VALUES[[ord(c) for c in ALPHABET[10:].lower()]] = np.arange(10, CHECK_BASE)
+_CODE_POINTS = np.array([ord(c) for c in ALPHABET], dtype=np.uint32)
+
+# (position, code point) -> checksum contribution. Weights alternate 1, 2 from the left and
+# each product adds its base-36 digits: product // 36 + product % 36.
+_WEIGHTS = np.where(np.arange(GSTIN_LENGTH - 1) % 2 == 0, 1, 2)
+_products = _WEIGHTS[:, None] * np.maximum(CHAR_VALUES, 0)[None, :]
+CHECKSUM_TABLE = _products // CHECK_BASE + _products % CHECK_BASE
+
+# Pattern of the PAN part (characters 3-12): True where a letter is expected, False for a digit
+_PAN_LETTERS = np.array([True] * 5 + [False] * 4 + [True])
+
+
+def check_digit(first_14):
+    """Check character for the first 14 characters of a GSTIN."""
+    total = sum(int(CHECKSUM_TABLE[i, ord(c)]) for i, c in enumerate(first_14.upper()))
+    return ALPHABET[(CHECK_BASE - total % CHECK_BASE) % CHECK_BASE]
+
+
+def gstin_errors(gstin):
+    """Error mask for one GSTIN (0 when valid); the interactive path, no array set-up."""
+    gstin = gstin.strip().upper()
+    if len(gstin) != GSTIN_LENGTH:
+        return ERROR_LENGTH
+    if any(c not in ALPHABET for c in gstin):
+        return ERROR_CHARACTERS
+    errors = 0
+    if not (gstin[:2].isdigit() and VALID_STATE[int(gstin[:2])]):
+        errors |= ERROR_STATE
+    pan = gstin[2:12]
+    if not (pan[:5].isalpha() and pan[5:9].isdigit() and pan[9].isalpha()):
+        errors |= ERROR_PAN
+    if gstin[12] == "0":
+        errors |= ERROR_ENTITY
+    if check_digit(gstin[:14]) != gstin[14]:
+        errors |= ERROR_CHECK_DIGIT
+    return errors
+
+
+def validate_gstins(gstins):
+    """Validate and decompose a column of GSTINs.
+
+    Each GSTIN is viewed as 15 code points, mapped to base-36 values and
+    checksum contributions through the precomputed tables, and summed per
+    row, so there is no per-character Python work. Returns (valid, errors,
+    state_codes, pans): a bool array, an int array of ERROR_* bits, the
+    state codes as ints (-1 when invalid) and the PANs ("" when invalid).
+    Lowercase input and surrounding blanks are accepted.
+    """
+    gstins = np.atleast_1d(np.asarray(gstins))
+    if gstins.dtype.kind != "U":
+        gstins = gstins.astype(str)
+    gstins = np.char.strip(gstins.ravel())
+    lengths = np.char.str_len(gstins)
+    gstins = gstins.astype("U15")
+    chars = np.minimum(gstins.view(np.uint32).reshape(len(gstins), GSTIN_LENGTH), 127).astype(np.intp)
+    values = CHAR_VALUES[chars]
+
+    errors = np.zeros(len(gstins), dtype=np.int64)
+    is_digit = (values >= 0) & (values < 10)
+    state_codes = np.where(is_digit[:, :2].all(axis=1), values[:, 0] * 10 + values[:, 1], -1)
+    state_codes = np.where(VALID_STATE[state_codes], state_codes, -1)
+    errors |= np.where(state_codes < 0, ERROR_STATE, 0)
+    pan_ok = np.where(_PAN_LETTERS, values[:, 2:12] >= 10, is_digit[:, 2:12]).all(axis=1)
+    errors |= np.where(pan_ok, 0, ERROR_PAN)
+    errors |= np.where(values[:, 12] == 0, ERROR_ENTITY, 0)
+
+    total = CHECKSUM_TABLE[np.arange(GSTIN_LENGTH - 1), chars[:, :-1]].sum(axis=1)
+    errors |= np.where((CHECK_BASE - total % CHECK_BASE) % CHECK_BASE != values[:, 14], ERROR_CHECK_DIGIT, 0)
+    # A wrong length or a stray character makes the positional checks meaningless, so report it alone
+    errors = np.where((values < 0).any(axis=1), ERROR_CHARACTERS, errors)
+    errors = np.where(lengths != GSTIN_LENGTH, ERROR_LENGTH, errors)
+
+    valid = errors == 0
+    pans = np.where(valid, np.ascontiguousarray(_CODE_POINTS[np.maximum(values[:, 2:12], 0)]).view("U10").ravel(), "")
+    return valid, errors, np.where(valid, state_codes, -1), pans
+
+
+def explain(errors):
+    """Messages for the bits set in one error mask."""
+    return [message for bit, message in ERROR_MESSAGES.items() if int(errors) & bit]
+
+
+def describe(gstin):
+    """One-line status for a GSTIN being typed: progress, the first problem, or its state and PAN."""
+    text = gstin.strip().upper()
+    if not text:
+        return ""
+    if len(text) < GSTIN_LENGTH and all(c in ALPHABET for c in text):
+        return f"{len(text)}/{GSTIN_LENGTH} characters"
+    errors = gstin_errors(text)
+    if errors == ERROR_CHECK_DIGIT:
+        return f"Check digit should be {check_digit(text[:14])}"
+    if errors:
+        return explain(errors)[0]
+    return f"Valid - {STATE_CODES[int(text[:2])]}, PAN {text[2:12]}"
+
+
+def random_gstins(count, invalid=0.0, seed=4):
+    """`count` well-formed GSTINs with correct check digits, a fraction `invalid` of them corrupted."""
+    rng = np.random.default_rng(seed)
+    states = rng.choice(np.array([code for code in STATE_CODES if code < 90]), count)
+    letters = rng.integers(10, 36, (count, 6))
+    digits = rng.integers(0, 10, (count, 4))
+    values = np.column_stack([states // 10, states % 10, letters[:, :5], digits, letters[:, 5],
+                              rng.integers(1, 10, count), np.full(count, 35)])
+    total = CHECKSUM_TABLE[np.arange(GSTIN_LENGTH - 1), _CODE_POINTS[values]].sum(axis=1)
+    check = (CHECK_BASE - total % CHECK_BASE) % CHECK_BASE
+    values = np.column_stack([values, check])
+    corrupt = rng.random(count) < invalid
+    values[corrupt, 14] = (values[corrupt, 14] + 1) % CHECK_BASE
+    return np.ascontiguousarray(_CODE_POINTS[values]).view("U15").ravel()
+
+
+def benchmark(rows=2_000_000):
+    gstins = random_gstins(rows, invalid=0.1)
+    start = time.perf_counter()
+    valid, errors, states, pans = validate_gstins(gstins)
+    elapsed = time.perf_counter() - start
+    print(f"{rows:,} GSTINs validated in {elapsed:.2f}s ({rows / elapsed:,.0f}/s), {np.count_nonzero(valid):,} valid")
+    start = time.perf_counter()
+    for gstin in gstins[:10_000].tolist():
+        gstin_errors(gstin)
+    print(f"Single GSTIN check: {(time.perf_counter() - start) / 10_000 * 1e6:.1f} us")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate a column of GSTINs and split out state codes and PANs.")
+    parser.add_argument("input", help="CSV/TSV or Parquet file")
+    parser.add_argument("output", nargs="?", help="CSV to write gstin, valid, state_code, pan and errors to")
+    parser.add_argument("--column", default="gstin", help="name of the GSTIN column (default: gstin)")
+    parser.add_argument("--delimiter", help="field delimiter (default: tab for .tsv, comma otherwise)")
+    args = parser.parse_args(argv)
+
+    try:
+        columns = read_columns(args.input, args.delimiter)
+        if args.column not in columns:
+            raise ValueError(f"Input has no '{args.column}' column, got {list(columns)}")
+        gstins = columns[args.column]
+        started = time.perf_counter()
+        valid, errors, states, pans = validate_gstins(gstins)
+        elapsed = time.perf_counter() - started
+        if args.output:
+            write_columns(args.output, {"gstin": gstins, "valid": valid, "state_code": states, "pan": pans,
+                                        "errors": [" ".join(explain(e)) for e in errors.tolist()]})
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(f"{len(valid):,} GSTINs checked in {elapsed:.2f}s, {len(valid) - np.count_nonzero(valid):,} invalid")
+    for bit, message in ERROR_MESSAGES.items():
+        count = int(np.count_nonzero(errors & bit))
+        if count:
+            print(f"  {count:,}: {message}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
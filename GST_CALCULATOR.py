@@ -1,137 +1,25 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog, scrolledtext
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch, cm
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-import win32print
-import win32api
+from tkinter import ttk, messagebox, filedialog, scrolledtext, simpledialog
+import sqlite3
 import tempfile
 import os
+import sys
 from datetime import datetime
 
+from AMOUNT_IN_WORDS import amount_in_words
+from GST_ENGINE import calculate_gst
+from GSTIN import describe, gstin_errors
+from INVOICE_LINES import InvoiceLines
+from INVOICE_PDF import DetailedGSTInvoice
+from INVOICE_STORE import default_invoice_store
+from PLACE_OF_SUPPLY import STATE_CODES, apply_place_of_supply, invoice_place_of_supply
 
-class DetailedGSTInvoice:
-    def __init__(self, company_details, customer_details, transportation_details, items, totals):
-        self.company_details = company_details
-        self.customer_details = customer_details
-        self.transportation_details = transportation_details
-        self.items = items
-        self.totals = totals
-
-    def generate_pdf(self, filename):
-        doc = SimpleDocTemplate(filename, pagesize=A4, leftMargin=0.5 * inch, rightMargin=0.5 * inch,
-                                topMargin=0.5 * inch, bottomMargin=0.5 * inch)
-        elements = []
-
-        styles = getSampleStyleSheet()
-        styles.add(ParagraphStyle(name='CenterAlign', alignment=1, fontSize=16, fontName="Helvetica-Bold"))
-        styles.add(ParagraphStyle(name='LeftAlign', alignment=0, fontSize=10, fontName="Helvetica"))
-        styles.add(ParagraphStyle(name='RightAlign', alignment=2, fontSize=10, fontName="Helvetica"))
-
-        # Title
-        elements.append(Paragraph("GST INVOICE RECEIPT", styles['CenterAlign']))
-        elements.append(Spacer(1, 0.2 * inch))
-
-        # Company and Transportation details
-        data = [
-            [Paragraph(f"<b>{self.company_details['name']}</b>", styles['LeftAlign']),
-             Paragraph("<b>Transportation Mode:</b> Apply for Supply of Goods", styles['LeftAlign'])],
-            [f"GSTIN: {self.company_details['gstin']}", f"Vehicle No.: {self.transportation_details['vehicle_no']}"],
-            [f"Address: {self.company_details['address']}",
-             f"Date and Time of Supply: {self.transportation_details['supply_date']}"],
-            [f"Serial No. of Invoice: {self.company_details['invoice_no']}",
-             f"Place of Supply: {self.transportation_details['supply_place']}"],
-            [f"Date of Invoice: {self.company_details['invoice_date']}", ""]
-        ]
-        t = Table(data, colWidths=[doc.width / 2 - 6, doc.width / 2 - 6])
-        t.setStyle(TableStyle([
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ]))
-        elements.append(t)
-        elements.append(Spacer(1, 0.2 * inch))
-
-        # Customer details
-        data = [
-            ["Details of Receiver (Billed to)", "Details of Consignee (Shipped to)"],
-            [f"Name: {self.customer_details['name']}", f"Name: {self.customer_details['ship_name']}"],
-            [f"Address: {self.customer_details['address']}", f"Address: {self.customer_details['ship_address']}"],
-            [f"State: {self.customer_details['state']}", f"State: {self.customer_details['ship_state']}"],
-            [f"State Code: {self.customer_details['state_code']}",
-             f"State Code: {self.customer_details['ship_state_code']}"],
-            [f"GSTIN/Unique ID: {self.customer_details['gstin']}",
-             f"GSTIN/Unique ID: {self.customer_details['ship_gstin']}"]
-        ]
-        t = Table(data, colWidths=[doc.width / 2 - 6, doc.width / 2 - 6])
-        t.setStyle(TableStyle([
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('BACKGROUND', (0, 0), (1, 0), colors.lightgrey),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ]))
-        elements.append(t)
-        elements.append(Spacer(1, 0.2 * inch))
-
-        # Items
-        data = [
-            ["Sr. No.", "Description", "HSN", "Qty.", "Unit", "Rate", "Total", "Discount", "Taxable", "CGST", "SGST",
-             "IGST"]]
-        for idx, item in enumerate(self.items, start=1):
-            data.append([
-                idx,
-                item['description'],
-                item['hsn'],
-                item['qty'],
-                item['unit'],
-                f"₹{item['rate']:.2f}",
-                f"₹{item['total']:.2f}",
-                f"₹{item['discount']:.2f}",
-                f"₹{item['taxable_value']:.2f}",
-                f"{item['cgst_rate']}%\n₹{item['cgst_amount']:.2f}",
-                f"{item['sgst_rate']}%\n₹{item['sgst_amount']:.2f}",
-                f"{item['igst_rate']}%\n₹{item['igst_amount']:.2f}"
-            ])
-
-        # Adjust these widths to fit your page and content
-        col_widths = [0.5 * cm, 3 * cm, 1 * cm, 0.8 * cm, 0.8 * cm, 1.5 * cm, 1.5 * cm, 1.5 * cm, 1.5 * cm, 1.5 * cm,
-                      1.5 * cm, 1.5 * cm]
-        t = Table(data, colWidths=col_widths)
-        t.setStyle(TableStyle([
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 8),  # Reduce font size if needed
-            ('TOPPADDING', (0, 0), (-1, -1), 1),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 1),
-        ]))
-        elements.append(t)
-        elements.append(Spacer(1, 0.2 * inch))
-
-        # Totals
-        elements.append(
-            Paragraph(f"Total Invoice Value (In figure): ₹{self.totals['total_value']:.2f}", styles['RightAlign']))
-        elements.append(
-            Paragraph(f"Total Invoice Value (In Words): {self.totals['total_in_words']}", styles['RightAlign']))
-        elements.append(Paragraph(f"Amount of Tax subject to Reverse Charges: ₹{self.totals['reverse_charge']:.2f}",
-                                  styles['RightAlign']))
-        elements.append(Spacer(1, 0.2 * inch))
-
-        # Declaration and Signature
-        elements.append(Paragraph("Declaration:", styles['LeftAlign']))
-        elements.append(Paragraph(
-            "We declare that this invoice shows the actual price of the goods described and that all particulars are true and correct.",
-            styles['LeftAlign']))
-        elements.append(Spacer(1, 0.5 * inch))
-        elements.append(Paragraph("Signature:", styles['RightAlign']))
-        elements.append(Paragraph("Name of the Signatory:", styles['RightAlign']))
-        elements.append(Paragraph("Designation / Status:", styles['RightAlign']))
-
-        doc.build(elements)
+# Printing is Windows-only; the rest of the module (and the CLI) works without pywin32
+try:
+    import win32print
+    import win32api
+except ImportError:
+    win32print = win32api = None
 
 
 class GSTCalculator:
@@ -149,6 +37,7 @@ class GSTCalculator:
         self.total_selling_price = tk.StringVar(value="0.00")
         self.total_profit = tk.StringVar(value="₹ 0.00")
         self.total_gst = tk.StringVar(value="₹ 0.00")
+        self.invoice_items = InvoiceLines()
 
         self.setup_ui()
 
@@ -249,27 +138,20 @@ class GSTCalculator:
         try:
             gst_percent = float(self.gst_percent_combobox.get().replace("%", ""))
             input_price = float(self.amount.get())
-            profit_ratio = float(self.profit_ratio.get()) / 100
-
-            if self.gst_type.get() == "exclusive":
-                pre_gst_price = input_price
-                profit_amount = pre_gst_price * profit_ratio
-                taxable_value = pre_gst_price + profit_amount
-                gst_amount = (taxable_value * gst_percent) / 100
-                post_gst_price = taxable_value + gst_amount
-            else:  # inclusive
-                post_gst_price = input_price
-                pre_gst_price = (post_gst_price * 100) / (100 + gst_percent)
-                profit_amount = pre_gst_price * profit_ratio
-                taxable_value = pre_gst_price + profit_amount
-                gst_amount = post_gst_price - taxable_value
+            profit_ratio = float(self.profit_ratio.get())
+
+            result = calculate_gst(input_price, gst_percent, profit_ratio, self.gst_type.get())
+            pre_gst_price = result["pre_gst_price"]
+            profit_amount = result["profit_amount"]
+            gst_amount = result["gst_amount"]
+            post_gst_price = result["post_gst_price"]
 
             self.update_result_field(self.pre_gst_value, pre_gst_price)
             self.update_result_field(self.profit_value, profit_amount)
             self.update_result_field(self.post_gst_value, post_gst_price)
             self.update_result_field(self.gst_value, gst_amount)
-            self.update_result_field(self.cgst_value, gst_amount / 2)
-            self.update_result_field(self.sgst_value, gst_amount / 2)
+            self.update_result_field(self.cgst_value, result["cgst_amount"])
+            self.update_result_field(self.sgst_value, result["sgst_amount"])
 
             self.total_selling_price.set(f"{post_gst_price:.2f}")
             self.total_gst.set(f"₹ {gst_amount:.2f}")
@@ -320,7 +202,7 @@ class GSTCalculator:
     def open_invoice_details_window(self):
         details_window = tk.Toplevel(self.root)
         details_window.title("Invoice Details")
-        details_window.geometry("600x700")
+        details_window.geometry("820x700")
         details_window.configure(bg="#ffffff")
 
         # Create a main frame
@@ -365,6 +247,7 @@ class GSTCalculator:
             setattr(self, var_name, tk.StringVar())
             tk.Entry(inner_frame, textvariable=getattr(self, var_name), width=40).grid(row=i + 2, column=1, pady=5,
                                                                                        padx=5, sticky="w")
+        self.watch_gstin(inner_frame, "company_gstin", 3)
 
         # Customer Details
         tk.Label(inner_frame, text="Customer Details", font=("Helvetica", 14, "bold"), bg="#ffffff", fg="#28a745").grid(
@@ -385,6 +268,7 @@ class GSTCalculator:
             tk.Entry(inner_frame, textvariable=getattr(self, var_name), width=40).grid(row=i + len(company_fields) + 3,
                                                                                        column=1, pady=5, padx=5,
                                                                                        sticky="w")
+        self.watch_gstin(inner_frame, "customer_gstin", len(company_fields) + 3 + 4)
 
         # Shipping Details
         tk.Label(inner_frame, text="Shipping Details", font=("Helvetica", 14, "bold"), bg="#ffffff", fg="#28a745").grid(
@@ -404,6 +288,7 @@ class GSTCalculator:
             setattr(self, var_name, tk.StringVar())
             tk.Entry(inner_frame, textvariable=getattr(self, var_name), width=40).grid(
                 row=i + len(company_fields) + len(customer_fields) + 4, column=1, pady=5, padx=5, sticky="w")
+        self.watch_gstin(inner_frame, "shipping_gstin", len(company_fields) + len(customer_fields) + 4 + 4)
 
         # Transportation Details
         tk.Label(inner_frame, text="Transportation Details", font=("Helvetica", 14, "bold"), bg="#ffffff",
@@ -425,16 +310,74 @@ class GSTCalculator:
                 row=i + len(company_fields) + len(customer_fields) + len(shipping_fields) + 5, column=1, pady=5, padx=5,
                 sticky="w")
 
+        # Line Items
+        items_row = len(company_fields) + len(customer_fields) + len(shipping_fields) + len(transportation_fields) + 5
+        tk.Label(inner_frame, text="Line Items", font=("Helvetica", 14, "bold"), bg="#ffffff",
+                 fg="#28a745").grid(row=items_row, column=0, columnspan=2, pady=(20, 10), sticky="w")
+
+        item_fields = [
+            ("Item Description:", "item_description"),
+            ("HSN/SAC Code:", "item_hsn"),
+            ("Quantity:", "item_qty"),
+        ]
+
+        for i, (label, var_name) in enumerate(item_fields):
+            tk.Label(inner_frame, text=label, bg="#ffffff").grid(row=i + items_row + 1, column=0, pady=5, padx=5,
+                                                                 sticky="w")
+            setattr(self, var_name, tk.StringVar())
+            tk.Entry(inner_frame, textvariable=getattr(self, var_name), width=40).grid(row=i + items_row + 1,
+                                                                                       column=1, pady=5, padx=5,
+                                                                                       sticky="w")
+        self.item_qty.set("1")
+
+        items_frame = tk.Frame(inner_frame, bg="#ffffff")
+        items_frame.grid(row=items_row + len(item_fields) + 1, column=0, columnspan=2, pady=5, sticky="w")
+        self.items_count_label = tk.Label(items_frame, text=f"{len(self.invoice_items)} line(s) added", bg="#ffffff")
+        tk.Button(items_frame, text="Add Current Calculation", command=lambda: self.add_invoice_item(details_window),
+                  bg="#ffc107", fg="black", font=("Helvetica", 10, "bold")).pack(side=tk.LEFT, padx=5)
+        tk.Button(items_frame, text="Clear Lines", command=self.clear_invoice_items, bg="#6c757d", fg="white",
+                  font=("Helvetica", 10, "bold")).pack(side=tk.LEFT, padx=5)
+        self.items_count_label.pack(side=tk.LEFT, padx=5)
+
         # Buttons
         button_frame = tk.Frame(inner_frame, bg="#ffffff")
-        button_frame.grid(
-            row=len(company_fields) + len(customer_fields) + len(shipping_fields) + len(transportation_fields) + 5,
-            column=0, columnspan=2, pady=20)
+        button_frame.grid(row=items_row + len(item_fields) + 2, column=0, columnspan=2, pady=20)
 
         tk.Button(button_frame, text="Save as PDF", command=lambda: self.save_as_pdf(details_window), bg="#28a745",
                   fg="white", font=("Helvetica", 10, "bold")).pack(side=tk.LEFT, padx=5)
         tk.Button(button_frame, text="Print PDF", command=lambda: self.print_invoice(details_window), bg="#007bff",
                   fg="white", font=("Helvetica", 10, "bold")).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Reprint Saved Invoice", command=lambda: self.reprint_invoice(details_window),
+                  bg="#6c757d", fg="white", font=("Helvetica", 10, "bold")).pack(side=tk.LEFT, padx=5)
+
+    def watch_gstin(self, parent, var_name, row):
+        # Status next to a GSTIN entry, refreshed on every keystroke; the check is a few microseconds
+        status = tk.Label(parent, text="", bg="#ffffff", font=("Helvetica", 9))
+        status.grid(row=row, column=2, padx=5, sticky="w")
+        variable = getattr(self, var_name)
+        variable.trace_add("write", lambda *args: self.update_gstin_status(variable.get(), status))
+
+    def update_gstin_status(self, gstin, status):
+        text = describe(gstin)
+        if not gstin_errors(gstin):
+            colour = "#28a745"
+        elif text.endswith("characters"):
+            # Still being typed
+            colour = "#6c757d"
+        else:
+            colour = "#dc3545"
+        status.config(text=text, fg=colour)
+
+    def confirm_gstins(self, parent_window):
+        """False if a filled-in GSTIN is invalid and the user chose not to continue."""
+        fields = [("Company", self.company_gstin), ("Customer", self.customer_gstin),
+                  ("Shipping", self.shipping_gstin)]
+        problems = [f"{label} GSTIN: {describe(variable.get())}" for label, variable in fields
+                    if variable.get().strip() and gstin_errors(variable.get())]
+        if not problems:
+            return True
+        return messagebox.askyesno("Invalid GSTIN", "\n".join(problems) + "\n\nCreate the invoice anyway?",
+                                   parent=parent_window)
 
     def get_user_input(self):
         company_details = {
@@ -466,48 +409,111 @@ class GSTCalculator:
 
         return company_details, customer_details, transportation_details
 
-    def generate_detailed_invoice(self):
+    def current_line_item(self, description="Product A", hsn="1234", qty=1):
+        gst_percent = float(self.gst_percent_combobox.get().replace("%", ""))
+        return {
+            "description": description,
+            "hsn": hsn,
+            "qty": qty,
+            "unit": "Nos",
+            "rate": float(self.pre_gst_value.get()),
+            "total": float(self.post_gst_value.get()) * qty,
+            "discount": 0,
+            "taxable_value": (float(self.pre_gst_value.get()) + float(self.profit_value.get())) * qty,
+            "cgst_rate": gst_percent / 2,
+            "cgst_amount": float(self.cgst_value.get()) * qty,
+            "sgst_rate": gst_percent / 2,
+            "sgst_amount": float(self.sgst_value.get()) * qty,
+            "igst_rate": 0,
+            "igst_amount": 0
+        }
+
+    def add_invoice_item(self, parent_window):
+        try:
+            qty = float(self.item_qty.get())
+            item = self.current_line_item(self.item_description.get() or f"Item {len(self.invoice_items) + 1}",
+                                          self.item_hsn.get(), int(qty) if qty.is_integer() else qty)
+        except ValueError:
+            messagebox.showerror("Error", "Calculate a price and enter a numeric quantity first.",
+                                 parent=parent_window)
+            return
+        self.invoice_items.append(item)
+        self.items_count_label.config(text=f"{len(self.invoice_items)} line(s) added")
+        self.item_description.set("")
+        self.item_hsn.set("")
+        self.item_qty.set("1")
+
+    def clear_invoice_items(self):
+        self.invoice_items = InvoiceLines()
+        self.items_count_label.config(text="0 line(s) added")
+
+    def generate_detailed_invoice(self, items=None):
         company_details, customer_details, transportation_details = self.get_user_input()
 
-        items = [
-            {
-                "description": "Product A",
-                "hsn": "1234",
-                "qty": 1,
-                "unit": "Nos",
-                "rate": float(self.pre_gst_value.get()),
-                "total": float(self.post_gst_value.get()),
-                "discount": 0,
-                "taxable_value": float(self.pre_gst_value.get()) + float(self.profit_value.get()),
-                "cgst_rate": float(self.gst_percent_combobox.get().replace("%", "")) / 2,
-                "cgst_amount": float(self.cgst_value.get()),
-                "sgst_rate": float(self.gst_percent_combobox.get().replace("%", "")) / 2,
-                "sgst_amount": float(self.sgst_value.get()),
-                "igst_rate": 0,
-                "igst_amount": 0
-            }
-        ]
+        # Lines added in the details window, or the current calculation as a single line
+        if items is None:
+            items = self.invoice_items if len(self.invoice_items) else [self.current_line_item()]
+
+        # Place of supply: the bill-to state, else the ship-to state, else what was typed as place of supply
+        place = invoice_place_of_supply(customer_details, transportation_details)
+        if place >= 0 and not transportation_details["supply_place"].strip():
+            transportation_details["supply_place"] = f"{STATE_CODES[place]} ({place:02d})"
+        # IGST when the supplier's GSTIN state differs from the place of supply, CGST + SGST otherwise
+        items = apply_place_of_supply(items, company_details["gstin"], place)
 
+        total_value = float(items.column("total").sum())
         totals = {
-            "total_value": float(self.total_selling_price.get()),
-            "total_in_words": self.number_to_words(float(self.total_selling_price.get())),
+            "total_value": total_value,
+            "total_in_words": self.number_to_words(total_value),
             "reverse_charge": 0
         }
 
         return DetailedGSTInvoice(company_details, customer_details, transportation_details, items, totals)
 
     def save_as_pdf(self, parent_window):
+        if not self.confirm_gstins(parent_window):
+            return
         file_path = filedialog.asksaveasfilename(parent=parent_window, defaultextension=".pdf",
                                                  filetypes=[("PDF files", "*.pdf")])
         if file_path:
             invoice = self.generate_detailed_invoice()
+            invoice.generate_pdf(file_path)
+            self.store_invoice(invoice, parent_window)
+            messagebox.showinfo("Success", f"PDF saved successfully at {file_path}", parent=parent_window)
+
+    def store_invoice(self, invoice, parent_window):
+        # Keep every issued invoice for reprints and returns; a store problem must not lose the PDF
+        try:
+            default_invoice_store().save(invoice)
+        except (sqlite3.Error, OSError) as e:
+            messagebox.showwarning("Warning", f"Invoice was not stored for reprinting: {e}", parent=parent_window)
+
+    def reprint_invoice(self, parent_window):
+        invoice_no = simpledialog.askstring("Reprint Invoice", "Invoice number:", parent=parent_window)
+        if not invoice_no:
+            return
+        invoice = default_invoice_store().load(invoice_no.strip())
+        if invoice is None:
+            messagebox.showerror("Error", f"No saved invoice numbered {invoice_no}.", parent=parent_window)
+            return
+        file_path = filedialog.asksaveasfilename(parent=parent_window, defaultextension=".pdf",
+                                                 initialfile=f"{invoice_no.strip()}.pdf",
+                                                 filetypes=[("PDF files", "*.pdf")])
+        if file_path:
             invoice.generate_pdf(file_path)
             messagebox.showinfo("Success", f"PDF saved successfully at {file_path}", parent=parent_window)
 
     def print_invoice(self, parent_window):
+        if win32print is None:
+            messagebox.showerror("Error", "Printing requires pywin32 on Windows.", parent=parent_window)
+            return
+        if not self.confirm_gstins(parent_window):
+            return
+
         temp_file = tempfile.mktemp(".pdf")
         invoice = self.generate_detailed_invoice()
         invoice.generate_pdf(temp_file)
+        self.store_invoice(invoice, parent_window)
 
         printer_name = win32print.GetDefaultPrinter()
         if not printer_name:
@@ -525,87 +531,15 @@ class GSTCalculator:
                 pass
 
     def number_to_words(self, number):
-        def convert_group(n):
-            ones = ["", "One", "Two", "Three", "Four", "Five", "Six", "Seven", "Eight", "Nine"]
-            tens = ["", "", "Twenty", "Thirty", "Forty", "Fifty", "Sixty", "Seventy", "Eighty", "Ninety"]
-            teens = ["Ten", "Eleven", "Twelve", "Thirteen", "Fourteen", "Fifteen", "Sixteen", "Seventeen", "Eighteen",
-                     "Nineteen"]
-
-            if len(n) == 1:
-                return ones[int(n)]
-            elif len(n) == 2:
-                if n[0] == '1':
-                    return teens[int(n[1])]
-                elif n[1] == '0':
-                    return tens[int(n[0])]
-                else:
-                    return tens[int(n[0])] + ' ' + ones[int(n[1])]
-            elif len(n) == 3:
-                if n == '000':
-                    return ''
-                elif n[1:] == '00':
-                    return ones[int(n[0])] + ' Hundred'
-                else:
-                    return ones[int(n[0])] + ' Hundred ' + convert_group(n[1:])
-
-        if number == 0:
-            return "Zero Rupees"
-
-        rupees = int(number)
-        paise = int((number - rupees) * 100)
-
-        result = []
-        if rupees:
-            crores = convert_group(f"{rupees:012d}"[:3])
-            lakhs = convert_group(f"{rupees:012d}"[3:5])
-            thousands = convert_group(f"{rupees:012d}"[5:7])
-            hundreds = convert_group(f"{rupees:012d}"[7:])
-
-            if crores:
-                result.append(f"{crores} Crore")
-            if lakhs:
-                result.append(f"{lakhs} Lakh")
-            if thousands:
-                result.append(f"{thousands} Thousand")
-            if hundreds:
-                result.append(hundreds)
-
-            result = " ".join(result) + " Rupees"
-
-        if paise:
-            result += f" and {convert_group(f'{paise:02d}')} Paise"
-
-        return result.strip()
-
-        def print_invoice(self):
-            temp_file = tempfile.mktemp(".pdf")
-            invoice = self.generate_detailed_invoice()
-            invoice.generate_pdf(temp_file)
-
-            printer_name = win32print.GetDefaultPrinter()
-            if not printer_name:
-                messagebox.showerror("Error", "No default printer found.")
-                return
-
-            try:
-                win32api.ShellExecute(0, "print", temp_file, f'/d:"{printer_name}"', ".", 0)
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to print: {str(e)}")
-            finally:
-                try:
-                    os.remove(temp_file)
-                except:
-                    pass
-
-        def save_as_pdf(self):
-            file_path = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF files", "*.pdf")])
-            if file_path:
-                invoice = self.generate_detailed_invoice()
-                invoice.generate_pdf(file_path)
-                messagebox.showinfo("Success", f"PDF saved successfully at {file_path}")
+        return amount_in_words(number)
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # Headless batch mode: python GST_CALCULATOR.py input.csv output.csv [--resume ...]
+        from GST_PIPELINE import main
+        sys.exit(main(sys.argv[1:]))
+
     root = tk.Tk()
     app = GSTCalculator(root)
     root.mainloop()
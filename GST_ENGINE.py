@@ -0,0 +1,79 @@
+import time
+
+import numpy as np
+
+# Column names returned by calculate_gst_batch, in display order
+GST_COLUMNS = ("pre_gst_price", "profit_amount", "taxable_value", "gst_amount",
+               "cgst_amount", "sgst_amount", "post_gst_price")
+
+
+def calculate_gst_batch(prices, gst_rates, profit_ratios=0.0, inclusive=False):
+    """Vectorized GST breakup for arrays of prices.
+
+    Rates and profit ratios are percentages, as typed into the calculator.
+    `inclusive` marks prices that already include GST. Every argument may be a
+    scalar or an array; they are broadcast against each other (scalars come
+    back as length-1 arrays). Returns a dict of float64 arrays keyed by
+    GST_COLUMNS.
+    """
+    price = np.asarray(prices, dtype=np.float64)
+    rate = np.asarray(gst_rates, dtype=np.float64)
+    ratio = np.asarray(profit_ratios, dtype=np.float64) / 100
+    inclusive = np.asarray(inclusive, dtype=bool)
+    price, rate, ratio, inclusive = np.broadcast_arrays(*np.atleast_1d(price, rate, ratio, inclusive))
+
+    # Same operation order as the calculator so both paths agree to the last bit
+    if not inclusive.any():
+        pre_gst_price = price.copy()
+    else:
+        pre_gst_price = np.where(inclusive, (price * 100) / (100 + rate), price)
+
+    profit_amount = pre_gst_price * ratio
+    taxable_value = pre_gst_price + profit_amount
+
+    gst_amount = taxable_value * rate
+    gst_amount /= 100
+    if inclusive.any():
+        np.subtract(price, taxable_value, out=gst_amount, where=inclusive)
+
+    post_gst_price = taxable_value + gst_amount
+    if inclusive.any():
+        np.copyto(post_gst_price, price, where=inclusive)
+
+    cgst_amount = gst_amount / 2
+
+    return {
+        "pre_gst_price": pre_gst_price,
+        "profit_amount": profit_amount,
+        "taxable_value": taxable_value,
+        "gst_amount": gst_amount,
+        "cgst_amount": cgst_amount,
+        "sgst_amount": cgst_amount.copy(),
+        "post_gst_price": post_gst_price,
+    }
+
+
+def calculate_gst(price, gst_rate, profit_ratio=0.0, gst_type="exclusive"):
+    """Single-line GST breakup as plain floats, computed by the batch engine."""
+    result = calculate_gst_batch(price, gst_rate, profit_ratio, gst_type == "inclusive")
+    return {name: float(column[0]) for name, column in result.items()}
+
+
+def benchmark(rows=10_000_000, repeat=3):
+    rng = np.random.default_rng(0)
+    prices = rng.uniform(1, 100000, rows).round(2)
+    rates = rng.choice([3.0, 5.0, 12.0, 18.0, 28.0], rows)
+    ratios = rng.uniform(0, 40, rows)
+    inclusive = rng.random(rows) < 0.5
+
+    for label, flags in (("exclusive", False), ("mixed", inclusive)):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            calculate_gst_batch(prices, rates, ratios, flags)
+            best = min(best, time.perf_counter() - start)
+        print(f"{label:>9}: {rows:,} rows in {best:.3f}s ({rows / best / 1e6:.1f}M rows/s)")
+
+
+if __name__ == "__main__":
+    benchmark()
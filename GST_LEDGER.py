@@ -0,0 +1,192 @@
+import json
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+
+from GST_SETOFF import HEADS, set_off
+
+# Where the ledger lives unless a path is given
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gst_ledger.jsonl")
+
+# Transaction kinds: input tax credit, output tax liability, and cash paid
+# into the electronic cash ledger
+KIND_CREDIT = "credit"
+KIND_LIABILITY = "liability"
+KIND_CASH = "cash"
+KINDS = (KIND_CREDIT, KIND_LIABILITY, KIND_CASH)
+
+# Write a snapshot after this many postings, so a restart replays at most this many
+SNAPSHOT_EVERY = 10_000
+
+
+def snapshot_path(path):
+    return path + ".snapshot"
+
+
+class GSTLedger:
+    """Append-only electronic credit, liability and cash ledger per GSTIN.
+
+    Every posting is appended as one JSON line to the ledger file and
+    applied to an in-memory running balance (credit, liability and cash per
+    head per GSTIN), so a posting costs O(1) however long the history is.
+    The balances are snapshotted every `snapshot_every` postings together
+    with the log offset they cover; opening the ledger loads the snapshot
+    and replays only the lines written after it. The references posted
+    for each GSTIN are kept alongside, so a period can be checked for an
+    earlier posting without reading the log.
+    """
+
+    def __init__(self, path=None, snapshot_every=SNAPSHOT_EVERY, sync=False):
+        """Open (or create) the ledger at `path`. Raises ValueError if a complete log line is corrupt."""
+        self.path = path or DEFAULT_PATH
+        self.snapshot_every = snapshot_every
+        self.sync = sync
+        # gstin -> [credit x3, liability x3, cash x3] in paise, head order as HEADS
+        self.balances = {}
+        # gstin -> set of references posted for it
+        self.references = {}
+        self.seq = 0
+        self._since_snapshot = 0
+        self._load()
+        self._file = open(self.path, "ab")
+
+    def _load(self):
+        offset = 0
+        if os.path.exists(snapshot_path(self.path)):
+            with open(snapshot_path(self.path), "r") as f:
+                state = json.load(f)
+            # Snapshots from before references were tracked are ignored; the log is replayed in full
+            if "references" in state:
+                self.balances = state["balances"]
+                self.references = {gstin: set(refs) for gstin, refs in state["references"].items()}
+                self.seq = state["seq"]
+                offset = state["log_offset"]
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            good = offset
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    self._apply(json.loads(line))
+                except (ValueError, KeyError, TypeError) as e:
+                    # A complete line that does not parse is damage, not an interrupted write; never drop it
+                    raise ValueError(f"{self.path}: ledger entry at byte offset {good} is corrupt "
+                                     f"({type(e).__name__}: {e})") from e
+                good += len(line)
+                self._since_snapshot += 1
+        if good < os.path.getsize(self.path):
+            # A crash mid-write left a partial last line; drop it
+            with open(self.path, "r+b") as f:
+                f.truncate(good)
+
+    def _apply(self, entry):
+        slot = KINDS.index(entry["kind"]) * len(HEADS) + HEADS.index(entry["head"])
+        balances = self.balances.get(entry["gstin"])
+        if balances is None:
+            balances = self.balances[entry["gstin"]] = [0] * (len(KINDS) * len(HEADS))
+        balances[slot] += entry["amount"]
+        if entry.get("ref"):
+            self.references.setdefault(entry["gstin"], set()).add(entry["ref"])
+        self.seq = entry["seq"]
+
+    def post(self, gstin, kind, head, amount_paise, reference=""):
+        """Append one transaction and update the running balance.
+
+        `amount_paise` may be negative to reverse an earlier posting.
+        Returns the posting's sequence number.
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Unknown transaction kind: {kind}")
+        head = head.upper()
+        if head not in HEADS:
+            raise ValueError(f"Unknown GST head: {head}")
+        entry = {"seq": self.seq + 1, "gstin": gstin, "kind": kind, "head": head, "amount": int(amount_paise),
+                 "ref": reference, "at": datetime.now().isoformat(timespec="seconds")}
+        self._file.write(json.dumps(entry, separators=(",", ":")).encode("utf-8") + b"\n")
+        self._file.flush()
+        if self.sync:
+            os.fsync(self._file.fileno())
+        self._apply(entry)
+
+        self._since_snapshot += 1
+        if self._since_snapshot >= self.snapshot_every:
+            self.snapshot()
+        return self.seq
+
+    def snapshot(self):
+        """Persist the current balances so a restart need not replay the log."""
+        self._file.flush()
+        state = {"seq": self.seq, "log_offset": self._file.tell(), "balances": self.balances,
+                 "references": {gstin: sorted(refs) for gstin, refs in self.references.items()}}
+        # Write-then-rename so a crash never leaves a half-written snapshot behind
+        path = snapshot_path(self.path)
+        with open(path + ".tmp", "w") as f:
+            json.dump(state, f)
+        os.replace(path + ".tmp", path)
+        self._since_snapshot = 0
+
+    def close(self):
+        self.snapshot()
+        self._file.close()
+
+    def has_reference(self, gstin, reference):
+        """Whether anything was already posted for `gstin` under `reference`."""
+        return reference in self.references.get(gstin, ())
+
+    def balance(self, gstin):
+        """{"credit": [igst, cgst, sgst], "liability": [...], "cash": [...]} in paise."""
+        balances = self.balances.get(gstin, [0] * (len(KINDS) * len(HEADS)))
+        return {kind: balances[i * len(HEADS):(i + 1) * len(HEADS)] for i, kind in enumerate(KINDS)}
+
+    def positions(self, gstins=None):
+        """Current set-off position for the given GSTINs (default: all), in one batch.
+
+        Returns (gstins, result) where result is GST_SETOFF.set_off of the
+        running credit against the running liability, plus "cash_balance"
+        and "cash_due" (cash payable not yet covered by cash deposits), all
+        with one row per GSTIN.
+        """
+        gstins = list(self.balances) if gstins is None else list(gstins)
+        empty = [0] * (len(KINDS) * len(HEADS))
+        matrix = np.array([self.balances.get(gstin, empty) for gstin in gstins], dtype=np.int64)
+        matrix = matrix.reshape(len(gstins), len(KINDS), len(HEADS))
+        # Reversals larger than the postings they reverse leave nothing to set off
+        result = set_off(np.maximum(matrix[:, 0], 0), np.maximum(matrix[:, 1], 0))
+        result["cash_balance"] = matrix[:, 2]
+        result["cash_due"] = np.maximum(result["cash_payable"] - matrix[:, 2], 0)
+        return gstins, result
+
+    def position(self, gstin):
+        return self.positions([gstin])[1]
+
+
+def benchmark(postings=200_000, gstins=3000, path=None):
+    import tempfile
+
+    path = path or os.path.join(tempfile.mkdtemp(), "ledger.jsonl")
+    rng = np.random.default_rng(4)
+    ids = [f"27AAAAA{i:04d}A1Z5" for i in range(gstins)]
+    ledger = GSTLedger(path)
+    start = time.perf_counter()
+    for g, k, h, a in zip(rng.integers(0, gstins, postings).tolist(), rng.integers(0, 2, postings).tolist(),
+                          rng.integers(0, 3, postings).tolist(), rng.integers(1, 10_000_000, postings).tolist()):
+        ledger.post(ids[g], KINDS[k], HEADS[h], a)
+    elapsed = time.perf_counter() - start
+    ledger.close()
+    print(f"{postings:,} postings: {postings / elapsed:,.0f}/s")
+
+    start = time.perf_counter()
+    reopened = GSTLedger(path)
+    reopened.positions()
+    print(f"reopen from snapshot and set off {gstins:,} GSTINs: {(time.perf_counter() - start) * 1000:.0f} ms")
+    reopened.close()
+
+
+if __name__ == "__main__":
+    benchmark()
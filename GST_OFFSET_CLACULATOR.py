@@ -1,11 +1,17 @@
+import calendar
 import tkinter as tk
-from tkinter import messagebox
+from tkinter import messagebox, simpledialog
+
+from FIXED_POINT import to_paise
+from GST_LEDGER import GSTLedger, KIND_CREDIT, KIND_LIABILITY
+from GST_RETURNS import ReturnAggregator
+from GST_SETOFF import HEADS, set_off_rupees, describe_set_off
 
 class GSTOffsetCalculator:
     def __init__(self, root):
         self.root = root
         self.root.title("GST Offset Calculator")
-        self.root.geometry("700x400")
+        self.root.geometry("700x600")
         self.root.configure(bg="#003366")
 
         # Title
@@ -34,11 +40,28 @@ class GSTOffsetCalculator:
             output_entry.grid(row=row, column=2, padx=5, pady=5)
             self.output_entries.append(output_entry)
 
-        # Calculate Button
-        tk.Button(self.root, text="Calculate", command=self.calculate_gst_offset, bg="#007bff", fg="white", font=("Helvetica", 14)).pack(pady=20)
+        # GSTIN whose running ledger the entered amounts are posted to
+        ledger_frame = tk.Frame(self.root, bg="#003366")
+        ledger_frame.pack()
+        tk.Label(ledger_frame, text="GSTIN:", font=("Helvetica", 14), bg="#003366", fg="white").pack(side="left", padx=5)
+        self.gstin_entry = tk.Entry(ledger_frame, font=("Helvetica", 14), width=20)
+        self.gstin_entry.pack(side="left", padx=5)
+
+        # Buttons
+        button_frame = tk.Frame(self.root, bg="#003366")
+        button_frame.pack(pady=20)
+        tk.Button(button_frame, text="Load GSTR-3B", command=self.load_gstr3b, bg="#007bff", fg="white", font=("Helvetica", 14)).pack(side="left", padx=5)
+        tk.Button(button_frame, text="Calculate", command=self.calculate_gst_offset, bg="#007bff", fg="white", font=("Helvetica", 14)).pack(side="left", padx=5)
+        tk.Button(button_frame, text="Post to Ledger", command=self.post_to_ledger, bg="#007bff", fg="white", font=("Helvetica", 14)).pack(side="left", padx=5)
+        tk.Button(button_frame, text="Ledger Position", command=self.show_ledger_position, bg="#007bff", fg="white", font=("Helvetica", 14)).pack(side="left", padx=5)
+
+        # Opened on first use, and closed with the window so its balances are snapshotted
+        self.ledger = None
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
         # Result Label
-        self.result_label = tk.Label(self.root, font=("Helvetica", 16, "bold"), bg="#003366", fg="white")
+        self.result_label = tk.Label(self.root, font=("Helvetica", 11, "bold"), bg="#003366", fg="white",
+                                     justify="left", wraplength=660)
         self.result_label.pack(pady=10)
 
     def calculate_gst_offset(self):
@@ -46,21 +69,94 @@ class GSTOffsetCalculator:
             input_gst = [float(entry.get()) for entry in self.input_entries]
             output_gst = [float(entry.get()) for entry in self.output_entries]
 
-            total_input_gst = sum(input_gst)
-            total_output_gst = sum(output_gst)
+            # Heads are set off in the statutory order, not netted against each other
+            result = set_off_rupees(input_gst, output_gst)
+            cash = result["cash_payable"].sum()
+            if cash > 0:
+                summary = f"GST to be Paid: ₹ {cash / 100:.2f}"
+            elif result["closing_credit"].sum() > 0:
+                summary = f"No GST to be Paid. Input Tax Credit left: ₹ {result['closing_credit'].sum() / 100:.2f}"
+            else:
+                summary = "No GST to be Paid"
 
-            gst_payable = total_output_gst - total_input_gst
+            self.result_label.config(text=f"{summary}\n\n{describe_set_off(result)}")
+        except ValueError:
+            messagebox.showerror("Invalid input", "Please enter valid, non-negative numbers")
 
-            if gst_payable > 0:
-                result = f"GST to be Paid: ${gst_payable}"
-            elif gst_payable < 0:
-                result = f"Input Tax Credit left: ${abs(gst_payable)}"
-            else:
-                result = "No GST to be Paid"
+    def load_gstr3b(self):
+        """Fill the output GST entries with the GSTIN's 3B liability for a month of stored invoices."""
+        gstin = self.gstin_entry.get().strip().upper()
+        if not gstin:
+            messagebox.showerror("Invalid input", "Please enter the GSTIN to load the return for")
+            return
+        period = simpledialog.askstring("GSTR-3B", "Return period (YYYY-MM):", parent=self.root)
+        if not period:
+            return
+        try:
+            year, month = (int(part) for part in period.strip().split("-"))
+            last_day = calendar.monthrange(year, month)[1]
+        except ValueError:
+            messagebox.showerror("Invalid input", "Please enter the period as YYYY-MM")
+            return
+
+        # The store pulls in the PDF renderer, so it is only imported when needed
+        from INVOICE_STORE import default_invoice_store
+        aggregator = ReturnAggregator()
+        lines = aggregator.update_from_store(default_invoice_store(), f"{year:04d}-{month:02d}-01",
+                                             f"{year:04d}-{month:02d}-{last_day:02d}", gstin)
+        liability = aggregator.gstr3b(gstin)["liability"]
+        for entry, paise in zip(self.output_entries, liability.tolist()):
+            entry.delete(0, tk.END)
+            entry.insert(0, f"{paise / 100:.2f}")
+        self.result_label.config(text=f"Loaded GSTR-3B output tax for {gstin}, {period.strip()}: "
+                                      f"{lines:,} invoice lines")
+
+    def get_ledger(self):
+        """The open ledger, or None after telling the user why it could not be opened."""
+        if self.ledger is None:
+            try:
+                self.ledger = GSTLedger()
+            except (OSError, ValueError) as e:
+                messagebox.showerror("Ledger unavailable", f"Could not open the GST ledger:\n{e}")
+        return self.ledger
+
+    def on_close(self):
+        if self.ledger is not None:
+            self.ledger.close()
+        self.root.destroy()
 
-            self.result_label.config(text=result)
+    def post_to_ledger(self):
+        """Post the entered input GST as credit and output GST as liability for the GSTIN."""
+        gstin = self.gstin_entry.get().strip().upper()
+        if not gstin:
+            messagebox.showerror("Invalid input", "Please enter the GSTIN to post to")
+            return
+        try:
+            amounts = [(KIND_CREDIT, [float(entry.get() or 0) for entry in self.input_entries]),
+                       (KIND_LIABILITY, [float(entry.get() or 0) for entry in self.output_entries])]
         except ValueError:
             messagebox.showerror("Invalid input", "Please enter valid numbers")
+            return
+
+        ledger = self.get_ledger()
+        if ledger is None:
+            return
+        for kind, values in amounts:
+            for head, paise in zip(HEADS, to_paise(values).tolist()):
+                if paise:
+                    ledger.post(gstin, kind, head, paise, reference="GST Offset Calculator")
+        self.show_ledger_position()
+
+    def show_ledger_position(self):
+        gstin = self.gstin_entry.get().strip().upper()
+        if not gstin:
+            messagebox.showerror("Invalid input", "Please enter the GSTIN to show")
+            return
+        ledger = self.get_ledger()
+        if ledger is None:
+            return
+        result = ledger.position(gstin)
+        self.result_label.config(text=f"Running position for {gstin}\n\n{describe_set_off(result)}")
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,226 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from GST_ENGINE import GST_COLUMNS, calculate_gst_batch
+
+# Input columns; profit_ratio and gst_type are optional and default to 0 / exclusive
+PRICE_COLUMN = "price"
+RATE_COLUMN = "gst_rate"
+PROFIT_COLUMN = "profit_ratio"
+TYPE_COLUMN = "gst_type"
+
+DEFAULT_CHUNK_BYTES = 2 * 1024 * 1024
+REPORT_INTERVAL = 5.0
+
+
+def detect_delimiter(path):
+    return "\t" if os.path.splitext(path)[1].lower() in (".tsv", ".tab") else ","
+
+
+def checkpoint_path(output_path):
+    return output_path + ".checkpoint"
+
+
+def _read_checkpoint(output_path):
+    with open(checkpoint_path(output_path), "r") as f:
+        return json.load(f)
+
+
+def _write_checkpoint(output_path, state):
+    # Write-then-rename so a crash never leaves a half-written checkpoint behind
+    path = checkpoint_path(output_path)
+    with open(path + ".tmp", "w") as f:
+        json.dump(state, f)
+    os.replace(path + ".tmp", path)
+
+
+def _is_inclusive(values):
+    return np.array([value.strip().lower().startswith(("incl", "1", "true", "y")) for value in values], dtype=bool)
+
+
+def _price_rows(rows, indexes):
+    price_idx, rate_idx, profit_idx, type_idx = indexes
+    prices = np.array([row[price_idx] for row in rows], dtype=np.float64)
+    rates = np.array([row[rate_idx].rstrip("% ") for row in rows], dtype=np.float64)
+    profits = 0.0 if profit_idx is None else np.array([row[profit_idx] or 0 for row in rows], dtype=np.float64)
+    inclusive = False if type_idx is None else _is_inclusive([row[type_idx] for row in rows])
+    result = calculate_gst_batch(prices, rates, profits, inclusive)
+    return np.column_stack([result[name] for name in GST_COLUMNS]).tolist()
+
+
+def _row_is_valid(row, indexes):
+    price_idx, rate_idx, profit_idx, type_idx = indexes
+    try:
+        float(row[price_idx])
+        float(row[rate_idx].rstrip("% "))
+        if profit_idx is not None:
+            float(row[profit_idx] or 0)
+        if type_idx is not None:
+            row[type_idx]
+    except (ValueError, IndexError):
+        return False
+    return True
+
+
+def _records(lines):
+    """Decoded records from raw lines; a quoted field spanning lines keeps its lines in one record."""
+    if b'"' not in b"".join(lines):
+        return [line.decode("utf-8").rstrip("\r\n") for line in lines]
+    records = []
+    pending = []
+    quotes = 0
+    for line in lines:
+        pending.append(line)
+        # Escaped quotes come in pairs, so an odd count means a quoted field is still open
+        quotes += line.count(b'"')
+        if quotes % 2 == 0:
+            records.append(b"".join(pending).decode("utf-8").rstrip("\r\n"))
+            pending = []
+            quotes = 0
+    if pending:
+        records.append(b"".join(pending).decode("utf-8").rstrip("\r\n"))
+    return records
+
+
+def _process_chunk(lines, delimiter, indexes, suffix_format, empty_suffix):
+    text = _records(lines)
+    keep = [i for i, line in enumerate(text) if line.strip()]
+    rows = list(csv.reader((text[i] for i in keep), delimiter=delimiter))
+
+    try:
+        priced = _price_rows(rows, indexes)
+    except (ValueError, IndexError):
+        # A bad row poisons the whole vectorized chunk; set it aside and price the rest
+        good = [i for i, row in enumerate(rows) if _row_is_valid(row, indexes)]
+        priced = [None] * len(rows)
+        for i, values in zip(good, _price_rows([rows[i] for i in good], indexes) if good else []):
+            priced[i] = values
+    rejected = priced.count(None)
+
+    out = []
+    for i, values in zip(keep, priced):
+        suffix = empty_suffix if values is None else suffix_format % tuple(values)
+        out.append(text[i] + suffix + "\n")
+    return "".join(out).encode("utf-8"), len(rows), rejected
+
+
+def stream_gst_file(input_path, output_path, delimiter=None, chunk_bytes=DEFAULT_CHUNK_BYTES, resume=False,
+                    start_offset=None, log=sys.stderr):
+    """Price a CSV/TSV of line items chunk by chunk and write the enriched rows.
+
+    Only one chunk of roughly `chunk_bytes` is held in memory at a time.
+    After every chunk the input/output byte offsets are saved to
+    `<output>.checkpoint`; `resume=True` picks up from there after a crash.
+    `start_offset` starts at an explicit input byte offset (which must be the
+    start of a record) and appends to the output. Quoted fields may span
+    lines: a chunk is only ever cut between records. Returns a stats dict.
+    """
+    delimiter = delimiter or detect_delimiter(input_path)
+
+    with open(input_path, "rb") as src:
+        header_line = src.readline()
+        header = next(csv.reader([header_line.decode("utf-8-sig").rstrip("\r\n")], delimiter=delimiter))
+        names = [name.strip().lower() for name in header]
+        try:
+            indexes = (names.index(PRICE_COLUMN), names.index(RATE_COLUMN),
+                       names.index(PROFIT_COLUMN) if PROFIT_COLUMN in names else None,
+                       names.index(TYPE_COLUMN) if TYPE_COLUMN in names else None)
+        except ValueError:
+            raise ValueError(f"Input must have '{PRICE_COLUMN}' and '{RATE_COLUMN}' columns, got {header}")
+
+        rows_done = 0
+        rejected_total = 0
+        if resume and os.path.exists(checkpoint_path(output_path)):
+            state = _read_checkpoint(output_path)
+            input_offset = state["input_offset"]
+            rows_done = state["rows"]
+            rejected_total = state["rejected"]
+            dst = open(output_path, "r+b")
+            dst.truncate(state["output_offset"])
+            dst.seek(state["output_offset"])
+        elif start_offset is not None:
+            input_offset = max(start_offset, src.tell())
+            dst = open(output_path, "ab")
+            if dst.tell() == 0:
+                dst.write(header_line.rstrip(b"\r\n") + delimiter.join([""] + list(GST_COLUMNS)).encode() + b"\n")
+        else:
+            input_offset = src.tell()
+            dst = open(output_path, "wb")
+            dst.write(header_line.rstrip(b"\r\n") + delimiter.join([""] + list(GST_COLUMNS)).encode() + b"\n")
+
+        src.seek(input_offset)
+        suffix_format = delimiter.join([""] + ["%.2f"] * len(GST_COLUMNS))
+        empty_suffix = delimiter * len(GST_COLUMNS)
+
+        started = time.perf_counter()
+        last_report = started
+        rows_this_run = 0
+        with dst:
+            while True:
+                lines = src.readlines(chunk_bytes)
+                if not lines:
+                    break
+                # Never cut inside a quoted field that spans lines: read on until the quotes balance
+                quotes = sum(line.count(b'"') for line in lines)
+                while quotes % 2:
+                    line = src.readline()
+                    if not line:
+                        break
+                    lines.append(line)
+                    quotes += line.count(b'"')
+                chunk, count, rejected = _process_chunk(lines, delimiter, indexes, suffix_format, empty_suffix)
+                dst.write(chunk)
+                dst.flush()
+
+                input_offset += sum(len(line) for line in lines)
+                rows_done += count
+                rows_this_run += count
+                rejected_total += rejected
+                _write_checkpoint(output_path, {"input_offset": input_offset, "output_offset": dst.tell(),
+                                                "rows": rows_done, "rejected": rejected_total})
+
+                now = time.perf_counter()
+                if log and now - last_report >= REPORT_INTERVAL:
+                    rate = rows_this_run / (now - started)
+                    log.write(f"{rows_done:,} rows, {rate:,.0f} rows/sec, input offset {input_offset:,}\n")
+                    last_report = now
+
+    elapsed = time.perf_counter() - started
+    if os.path.exists(checkpoint_path(output_path)):
+        os.remove(checkpoint_path(output_path))
+    stats = {"rows": rows_done, "rejected": rejected_total, "elapsed": elapsed,
+             "rows_per_sec": rows_this_run / elapsed if elapsed else 0.0, "input_offset": input_offset}
+    if log:
+        log.write(f"Done: {rows_done:,} rows ({rejected_total:,} rejected), "
+                  f"{stats['rows_per_sec']:,.0f} rows/sec\n")
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream a CSV/TSV of line items through the GST calculator.")
+    parser.add_argument("input", help="CSV or TSV with price, gst_rate and optional profit_ratio, gst_type columns")
+    parser.add_argument("output", help="where to write the priced rows")
+    parser.add_argument("--delimiter", help="field delimiter (default: tab for .tsv, comma otherwise)")
+    parser.add_argument("--chunk-mb", type=float, default=DEFAULT_CHUNK_BYTES / (1024 * 1024),
+                        help="approximate chunk size in MB")
+    parser.add_argument("--resume", action="store_true", help="continue from the last checkpoint after a crash")
+    parser.add_argument("--start-offset", type=int, help="start at this input byte offset, appending to the output")
+    args = parser.parse_args(argv)
+
+    try:
+        stream_gst_file(args.input, args.output, delimiter=args.delimiter, chunk_bytes=int(args.chunk_mb * 1024 * 1024),
+                        resume=args.resume, start_offset=args.start_offset)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,451 @@
+import argparse
+import csv
+import io
+import sqlite3
+import sys
+import time
+
+import numpy as np
+
+from COLUMN_IO import write_columns
+from FIXED_POINT import to_paise, to_basis_points, format_paise
+from GST_LEDGER import GSTLedger, KIND_LIABILITY
+from GST_SETOFF import HEADS, set_off, describe_set_off
+from PLACE_OF_SUPPLY import FOREIGN_COUNTRY, state_numbers, is_interstate
+
+# Invoice-line columns; place_of_supply, unit, qty and cess_amount are optional. A blank
+# customer GSTIN makes the line a B2C supply.
+SUPPLIER_COLUMN = "supplier_gstin"
+CUSTOMER_COLUMN = "customer_gstin"
+PLACE_COLUMN = "place_of_supply"
+HSN_COLUMN = "hsn"
+UNIT_COLUMN = "unit"
+QTY_COLUMN = "qty"
+RATE_COLUMN = "gst_rate"
+AMOUNT_COLUMNS = ("taxable_value", "igst_amount", "cgst_amount", "sgst_amount", "cess_amount")
+REQUIRED_COLUMNS = (SUPPLIER_COLUMN, CUSTOMER_COLUMN, HSN_COLUMN, RATE_COLUMN) + AMOUNT_COLUMNS[:4]
+
+# Summed per group, in this order: line count, quantity in thousandths, then the amounts in paise
+SUM_COLUMNS = ("lines", "qty_milli") + AMOUNT_COLUMNS
+SUMMARY_PAISE_COLUMNS = ("taxable_value", "igst", "cgst", "sgst", "cess", "total_value")
+
+DEFAULT_CHUNK_BYTES = 8 * 1024 * 1024
+
+
+def _factorize(values):
+    """(distinct values, code per row). Text is hashed through a dict, which beats sorting strings."""
+    if isinstance(values, np.ndarray) and values.dtype.kind != "U":
+        distinct, codes = np.unique(values, return_inverse=True)
+        return distinct, codes.ravel()
+    values = values.tolist() if isinstance(values, np.ndarray) else values
+    index = {value: code for code, value in enumerate(dict.fromkeys(values))}
+    codes = np.fromiter(map(index.__getitem__, values), np.int64, len(values))
+    return np.array(list(index), dtype=str), codes
+
+
+def _labels(column, length, default="", upper=False):
+    """(distinct labels, code per row) for a text column (array or list), cleaning only the distinct values."""
+    if column is None:
+        return np.array([default]), np.zeros(length, dtype=np.int64)
+    if isinstance(column, np.ndarray) and column.dtype.kind != "U":
+        column = column.astype(str)
+    distinct, codes = _factorize(column)
+    cleaned = np.char.strip(distinct)
+    if upper:
+        cleaned = np.char.upper(cleaned)
+    # Labels that only differed in case or blanks collapse into one
+    cleaned, remap = _factorize(cleaned)
+    return cleaned, remap[codes]
+
+
+def _number(column, length):
+    if column is None:
+        return np.zeros(length)
+    if isinstance(column, list):
+        try:
+            return np.array(column, dtype=np.float64)
+        except ValueError:
+            # Blanks or padding; take the slower path that cleans them
+            pass
+    column = np.asarray(column)
+    if column.dtype.kind in "US":
+        column = np.char.strip(column.astype(str))
+        column = np.where(column == "", "0", column)
+    return column.astype(np.float64)
+
+
+def _field_counts(data, delimiter):
+    """(fields per line, blank-line flags) for a chunk of unquoted CSV bytes, counted without a parse per line."""
+    chars = np.frombuffer(data, dtype=np.uint8)
+    starts = np.r_[0, np.flatnonzero(chars == 10) + 1]
+    if starts[-1] < len(chars):  # a last line with no newline
+        starts = np.r_[starts, len(chars)]
+    counts = np.diff(np.searchsorted(np.flatnonzero(chars == ord(delimiter)), starts)) + 1
+    blank = np.zeros(len(counts), dtype=bool)
+    # Only a line without delimiters can be blank; there are few enough to look at one by one
+    for line in np.flatnonzero(counts == 1).tolist():
+        blank[line] = not data[starts[line]:starts[line + 1]].strip()
+    return counts, blank
+
+
+class ReturnAggregator:
+    """GSTR-1 / GSTR-3B figures folded from invoice lines a chunk at a time.
+
+    Each chunk is reduced to one row of sums per (supplier GSTIN, HSN,
+    unit, rate, place of supply, B2B/B2C) group: the string keys are
+    factorized, packed into one integer key, sorted and summed with
+    reduceat. Only those group rows are merged into the running hash table,
+    so memory depends on the number of distinct groups, never on the
+    number of lines. The HSN summary, the rate/place-of-supply rollup and
+    the 3B tables are all projections of that one table.
+    """
+
+    def __init__(self):
+        # (supplier, hsn, unit, rate_bp, place, b2b) -> int64 sums in SUM_COLUMNS order
+        self.groups = {}
+        self.lines = 0
+
+    def add(self, columns, in_paise=False):
+        """Fold a chunk of invoice lines, a dict of columns, into the running groups."""
+        length = len(columns[SUPPLIER_COLUMN])
+        if not length:
+            return
+        suppliers = _labels(columns[SUPPLIER_COLUMN], length, upper=True)
+        customers, customer_codes = _labels(columns[CUSTOMER_COLUMN], length)
+        b2b = (np.char.str_len(customers) == 15)[customer_codes]
+        # Place of supply as given, else the customer's GSTIN state, else the supplier's own state
+        places = np.full(length, -1)
+        if columns.get(PLACE_COLUMN) is not None:
+            given, given_codes = _labels(columns[PLACE_COLUMN], length)
+            places = state_numbers(given)[given_codes]
+        places = np.where(places >= 0, places, np.where(b2b, state_numbers(customers)[customer_codes], -1))
+        places = np.where(places >= 0, places, state_numbers(suppliers[0])[suppliers[1]])
+
+        rates = to_basis_points(_number(columns[RATE_COLUMN], length))
+        sums = np.empty((length, len(SUM_COLUMNS)), dtype=np.int64)
+        sums[:, 0] = 1
+        sums[:, 1] = np.rint(_number(columns.get(QTY_COLUMN), length) * 1000)
+        for index, name in enumerate(AMOUNT_COLUMNS, start=2):
+            amounts = _number(columns.get(name), length)
+            sums[:, index] = np.rint(amounts) if in_paise else to_paise(amounts)
+
+        key_columns = [suppliers, _labels(columns[HSN_COLUMN], length),
+                       _labels(columns.get(UNIT_COLUMN), length, "NOS", upper=True), _factorize(rates),
+                       (None, places + 1), (None, b2b.astype(np.int64))]
+        sizes = [len(distinct) for distinct, _ in key_columns[:4]] + [101, 2]
+        keys = np.zeros(length, dtype=np.int64)
+        for (_, codes), size in zip(key_columns, sizes):
+            keys = keys * size + codes
+
+        order = np.argsort(keys)
+        keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        totals = np.add.reduceat(sums[order], starts, axis=0)
+
+        # Unpack each group's key back into its labels
+        group_keys = keys[starts]
+        labels = []
+        for (distinct, _), size in zip(reversed(key_columns), reversed(sizes)):
+            codes = group_keys % size
+            group_keys = group_keys // size
+            labels.append(distinct[codes].tolist() if distinct is not None else codes.tolist())
+        supplier, hsn, unit, rate, place, is_b2b = reversed(labels)
+        groups = self.groups
+        for key, row in zip(zip(supplier, hsn, unit, rate, [p - 1 for p in place], is_b2b), totals):
+            current = groups.get(key)
+            if current is None:
+                groups[key] = row
+            else:
+                current += row
+        self.lines += length
+
+    def update_from_file(self, path, delimiter=None, chunk_bytes=DEFAULT_CHUNK_BYTES):
+        """Stream a CSV/TSV of invoice lines into the groups. Returns the number of lines read.
+
+        Blank lines are skipped; a row with more or fewer fields than the
+        header raises ValueError naming its line.
+        """
+        delimiter = delimiter or ("\t" if path.lower().endswith((".tsv", ".tab")) else ",")
+        before = self.lines
+        line_no = 1  # physical lines consumed so far, the header included
+        with open(path, "rb") as src:
+            header = next(csv.reader([src.readline().decode("utf-8-sig").rstrip("\r\n")], delimiter=delimiter))
+            names = [name.strip().lower() for name in header]
+            missing = [name for name in REQUIRED_COLUMNS if name not in names]
+            if missing:
+                raise ValueError(f"Input is missing columns {', '.join(missing)}, got {names}")
+            while True:
+                lines = src.readlines(chunk_bytes)
+                if not lines:
+                    break
+                # Never cut inside a quoted field that spans lines: read on until the quotes balance
+                quotes = sum(line.count(b'"') for line in lines)
+                while quotes % 2:
+                    line = src.readline()
+                    if not line:
+                        break
+                    lines.append(line)
+                    quotes += line.count(b'"')
+                data = b"".join(lines)
+                text = data.decode("utf-8")
+                if '"' in text:
+                    reader = csv.reader(io.StringIO(text), delimiter=delimiter)
+                    fields = []
+                    for row in reader:
+                        if len(row) != len(names):
+                            if not row or (len(row) == 1 and not row[0].strip()):  # blank line
+                                continue
+                            raise ValueError(f"{path}: line {line_no + reader.line_num} has {len(row)} fields, "
+                                             f"expected {len(names)}")
+                        fields += row
+                else:
+                    # No quoting: one split over the whole chunk instead of a parse per row. Each row's
+                    # field count is checked first, or one long and one short row would shift every
+                    # row between them by a column.
+                    counts, blank = _field_counts(data, delimiter)
+                    bad = np.flatnonzero((counts != len(names)) & ~blank)
+                    if len(bad):
+                        raise ValueError(f"{path}: line {line_no + bad[0] + 1} has {counts[bad[0]]} fields, "
+                                         f"expected {len(names)}")
+                    if blank.any():
+                        text = "\n".join(row for row in text.splitlines() if row.strip())
+                    text = text.replace("\r\n", "\n").strip("\n").replace("\n", delimiter)
+                    fields = text.split(delimiter) if text else []
+                line_no += len(lines)
+                # Column i is every len(names)-th field starting at i
+                self.add({name: fields[index::len(names)] for index, name in enumerate(names)})
+        return self.lines - before
+
+    def update_from_store(self, store, start=None, end=None, supplier_gstin=None):
+        """Fold the lines of invoices dated start..end (inclusive) from an InvoiceStore."""
+        before = self.lines
+        for chunk in store.iter_line_chunks(start, end, supplier_gstin):
+            self.add(chunk, in_paise=True)
+        return self.lines - before
+
+    @staticmethod
+    def _gstin(gstin):
+        # Supplier labels are stored stripped and upper-cased; filters must match them
+        return gstin.strip().upper() if gstin else gstin
+
+    def _rows(self):
+        keys = list(self.groups)
+        sums = np.array([self.groups[key] for key in keys], dtype=np.int64).reshape(len(keys), len(SUM_COLUMNS))
+        return keys, sums
+
+    def _rollup(self, key_of):
+        """Sum the groups again under a coarser key; returns (sorted keys, sums)."""
+        rolled = {}
+        keys, sums = self._rows()
+        for key, row in zip(keys, sums):
+            coarse = key_of(key)
+            if coarse is not None:
+                rolled[coarse] = rolled[coarse] + row if coarse in rolled else row.copy()
+        ordered = sorted(rolled)
+        return ordered, np.array([rolled[key] for key in ordered], dtype=np.int64).reshape(len(ordered),
+                                                                                        len(SUM_COLUMNS))
+
+    @staticmethod
+    def _amounts(sums):
+        taxes = sums[:, 3:7]
+        return {"taxable_value": sums[:, 2], "igst": taxes[:, 0], "cgst": taxes[:, 1], "sgst": taxes[:, 2],
+                "cess": taxes[:, 3], "total_value": sums[:, 2] + taxes.sum(axis=1)}
+
+    def hsn_summary(self, gstin=None):
+        """GSTR-1 HSN-wise summary (table 12): columns per supplier, B2B/B2C, HSN, unit and rate."""
+        gstin = self._gstin(gstin)
+        keys, sums = self._rollup(lambda k: (k[0], "B2B" if k[5] else "B2C", k[1], k[2], k[3])
+                                  if gstin is None or k[0] == gstin else None)
+        return {"supplier_gstin": [k[0] for k in keys], "supply_type": [k[1] for k in keys],
+                "hsn": [k[2] for k in keys], "unit": [k[3] for k in keys],
+                "gst_rate": [k[4] / 100 for k in keys], "qty": sums[:, 1] / 1000, "lines": sums[:, 0],
+                **self._amounts(sums)}
+
+    def rate_summary(self, gstin=None):
+        """Supplies rolled up by supplier, B2B/B2C, place of supply and rate slab."""
+        gstin = self._gstin(gstin)
+        keys, sums = self._rollup(lambda k: (k[0], "B2B" if k[5] else "B2C", k[4], k[3])
+                                  if gstin is None or k[0] == gstin else None)
+        return {"supplier_gstin": [k[0] for k in keys], "supply_type": [k[1] for k in keys],
+                "place_of_supply": [f"{k[2]:02d}" if k[2] >= 0 else "" for k in keys],
+                "gst_rate": [k[3] / 100 for k in keys], "lines": sums[:, 0], **self._amounts(sums)}
+
+    def suppliers(self):
+        return sorted({key[0] for key in self.groups})
+
+    def gstr3b(self, gstin):
+        """GSTR-3B outward supply tables for one supplier, amounts in paise.
+
+        "3.1(a)": taxable outward supplies (rate above zero) within India with
+        their tax; "3.1(b)": zero-rated supplies, i.e. exports (place of
+        supply FOREIGN_COUNTRY), with the IGST and cess paid on them;
+        "3.1(c)": nil-rated and exempt supplies within India; "3.2":
+        inter-state supplies within India to unregistered persons by place
+        of supply; "liability": the month's output tax as an IGST/CGST/SGST
+        array, ready for set_off.
+        """
+        gstin = self._gstin(gstin)
+        keys, sums = self._rows()
+        mine = np.array([key[0] == gstin for key in keys], dtype=bool)
+        keys = [key for key, keep in zip(keys, mine) if keep]
+        sums = sums[mine]
+        rated = np.array([key[3] > 0 for key in keys], dtype=bool)
+        places = np.array([key[4] for key in keys], dtype=np.int64)
+        export = places == FOREIGN_COUNTRY
+        taxable = sums[rated & ~export].sum(axis=0)
+        table_3_1a = {"taxable_value": int(taxable[2]), **{head.lower(): int(taxable[3 + i])
+                                                           for i, head in enumerate(HEADS)},
+                      "cess": int(taxable[6])}
+        exported = sums[export].sum(axis=0)
+        table_3_1b = {"taxable_value": int(exported[2]), "igst": int(exported[3]), "cess": int(exported[6])}
+        table_3_1c = {"taxable_value": int(sums[~rated & ~export, 2].sum())}
+
+        b2c_interstate = np.array([not key[5] for key in keys], dtype=bool) & is_interstate(gstin, places) & ~export \
+            if keys else np.zeros(0, dtype=bool)
+        table_3_2 = []
+        for place in sorted(set(places[b2c_interstate].tolist())):
+            rows = sums[b2c_interstate & (places == place)]
+            table_3_2.append({"place_of_supply": f"{place:02d}", "taxable_value": int(rows[:, 2].sum()),
+                              "igst": int(rows[:, 3].sum())})
+        liability = sums[:, 3:6].sum(axis=0) if len(sums) else np.zeros(len(HEADS), dtype=np.int64)
+        return {"3.1(a)": table_3_1a, "3.1(b)": table_3_1b, "3.1(c)": table_3_1c, "3.2": table_3_2,
+                "liability": liability}
+
+    def liabilities(self, gstins=None):
+        """(gstins, (n, 3) IGST/CGST/SGST output tax in paise) for every or the given suppliers."""
+        gstins = [self._gstin(gstin) for gstin in gstins] if gstins is not None else self.suppliers()
+        index = {gstin: row for row, gstin in enumerate(gstins)}
+        liability = np.zeros((len(gstins), len(HEADS)), dtype=np.int64)
+        for key, row in self.groups.items():
+            if key[0] in index:
+                liability[index[key[0]]] += row[3:6]
+        return gstins, liability
+
+    def set_off(self, credit_paise, gstins=None):
+        """GST_SETOFF.set_off of available credit against each supplier's 3B liability."""
+        gstins, liability = self.liabilities(gstins)
+        return gstins, set_off(credit_paise, liability)
+
+    def post_to_ledger(self, ledger, reference="GSTR-3B", gstins=None):
+        """Post each supplier's 3B output tax to a GSTLedger as liability.
+
+        `reference` should name the return period. A supplier that already
+        has postings under it is skipped, so re-running a period does not
+        double its liability. Returns the skipped GSTINs.
+        """
+        gstins, liability = self.liabilities(gstins)
+        skipped = []
+        for gstin, row in zip(gstins, liability.tolist()):
+            if ledger.has_reference(gstin, reference):
+                skipped.append(gstin)
+                continue
+            for head, paise in zip(HEADS, row):
+                if paise:
+                    ledger.post(gstin, KIND_LIABILITY, head, paise, reference)
+        return skipped
+
+
+def describe_3b(table):
+    lines = [f"3.1(a) taxable ₹ {format_paise(table['3.1(a)']['taxable_value'])}: "
+             + ", ".join(f"{head} ₹ {format_paise(table['3.1(a)'][head.lower()])}" for head in HEADS)
+             + f", cess ₹ {format_paise(table['3.1(a)']['cess'])}",
+             f"3.1(b) zero rated ₹ {format_paise(table['3.1(b)']['taxable_value'])}: "
+             f"IGST ₹ {format_paise(table['3.1(b)']['igst'])}, cess ₹ {format_paise(table['3.1(b)']['cess'])}",
+             f"3.1(c) nil rated/exempt ₹ {format_paise(table['3.1(c)']['taxable_value'])}"]
+    for row in table["3.2"]:
+        lines.append(f"3.2 unregistered, place of supply {row['place_of_supply']}: "
+                     f"taxable ₹ {format_paise(row['taxable_value'])}, IGST ₹ {format_paise(row['igst'])}")
+    return "\n".join(lines)
+
+
+def benchmark(rows=2_000_000, chunk=500_000):
+    from GSTIN import random_gstins
+
+    rng = np.random.default_rng(11)
+    suppliers = random_gstins(50)
+    customers = np.r_[random_gstins(2000, seed=5), np.full(2000, "")]
+    hsn_codes = np.array(["8471", "8703", "3004", "6109", "9503", "0401", "2201", "8517"])
+    chunks = []
+    for offset in range(0, rows, chunk):
+        n = min(chunk, rows - offset)
+        taxable = np.round(rng.uniform(100, 100_000, n), 2)
+        rates = rng.choice([0.0, 5.0, 12.0, 18.0, 28.0], n)
+        supplier, customer = rng.choice(suppliers, n), rng.choice(customers, n)
+        interstate = is_interstate(supplier, np.where(customer == "", supplier, customer))
+        tax = np.round(taxable * rates / 100, 2)
+        chunks.append({SUPPLIER_COLUMN: supplier, CUSTOMER_COLUMN: customer, HSN_COLUMN: rng.choice(hsn_codes, n),
+                       RATE_COLUMN: rates, QTY_COLUMN: rng.integers(1, 10, n), "taxable_value": taxable,
+                       "igst_amount": np.where(interstate, tax, 0), "cgst_amount": np.where(interstate, 0, tax / 2),
+                       "sgst_amount": np.where(interstate, 0, tax / 2)})
+    aggregator = ReturnAggregator()
+    start = time.perf_counter()
+    for columns in chunks:
+        aggregator.add(columns)
+    elapsed = time.perf_counter() - start
+    print(f"{rows:,} lines aggregated in {elapsed:.2f}s ({rows / elapsed:,.0f} lines/s) "
+          f"into {len(aggregator.groups):,} groups")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Roll invoice lines up into the GSTR-1 HSN summary and the "
+                                                 "GSTR-3B outward supply tables.")
+    parser.add_argument("inputs", nargs="*", help="CSV/TSV files of invoice lines")
+    parser.add_argument("--store", nargs="?", const="", help="also read lines from the invoice store "
+                                                             "(default file unless a path is given)")
+    parser.add_argument("--from", dest="start", help="first invoice date read from the store, YYYY-MM-DD")
+    parser.add_argument("--to", dest="end", help="last invoice date read from the store, YYYY-MM-DD")
+    parser.add_argument("--gstin", help="only this supplier")
+    parser.add_argument("--delimiter", help="field delimiter (default: tab for .tsv, comma otherwise)")
+    parser.add_argument("--hsn-out", help="CSV to write the GSTR-1 HSN summary to")
+    parser.add_argument("--rates-out", help="CSV to write the rate / place-of-supply rollup to")
+    parser.add_argument("--ledger", nargs="?", const="", help="post the 3B liability for the --from/--to period "
+                                                              "to the GST ledger (default file unless a path is "
+                                                              "given, once per period) and show the resulting "
+                                                              "set-off")
+    args = parser.parse_args(argv)
+    if not args.inputs and args.store is None:
+        parser.error("give input files, --store, or both")
+    if args.ledger is not None and not (args.start and args.end):
+        parser.error("--ledger needs --from and --to, which name the period posted")
+    args.gstin = ReturnAggregator._gstin(args.gstin)
+
+    aggregator = ReturnAggregator()
+    try:
+        started = time.perf_counter()
+        for path in args.inputs:
+            aggregator.update_from_file(path, args.delimiter)
+        if args.store is not None:
+            # The store pulls in the PDF renderer, so it is only imported when needed
+            from INVOICE_STORE import InvoiceStore
+            aggregator.update_from_store(InvoiceStore(args.store or None), args.start, args.end, args.gstin)
+        elapsed = time.perf_counter() - started
+        if args.hsn_out:
+            write_columns(args.hsn_out, aggregator.hsn_summary(args.gstin), SUMMARY_PAISE_COLUMNS)
+        if args.rates_out:
+            write_columns(args.rates_out, aggregator.rate_summary(args.gstin), SUMMARY_PAISE_COLUMNS)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(f"{aggregator.lines:,} lines in {elapsed:.1f}s, {len(aggregator.groups):,} groups")
+
+    gstins = [args.gstin] if args.gstin else aggregator.suppliers()
+    for gstin in gstins:
+        print(f"\n{gstin}\n{describe_3b(aggregator.gstr3b(gstin))}")
+    if args.ledger is not None:
+        try:
+            ledger = GSTLedger(args.ledger or None)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        skipped = aggregator.post_to_ledger(ledger, f"GSTR-3B {args.start}..{args.end}", gstins)
+        for gstin in skipped:
+            print(f"{gstin}: GSTR-3B {args.start}..{args.end} is already in the ledger, not posted again")
+        _, positions = ledger.positions(gstins)
+        for row, gstin in enumerate(gstins):
+            print(f"\nLedger position for {gstin}\n{describe_set_off(positions, row)}")
+        ledger.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+import time
+
+import numpy as np
+
+from RATE_MASTER import default_rate_master, KIND_CUSTOMS
+
+# Tariff codes are resolved at chapter, heading, subheading and tariff-item level
+MIN_CODE_DIGITS = 2
+MAX_CODE_DIGITS = 8
+
+TARIFF_COLUMNS = ("code", "description", "bcd_rate", "igst_rate", "cess_rate")
+
+
+def normalize_code(code):
+    """Digits of an HS code, so "8471.30.10" and "8471 30 10" both give "84713010"."""
+    return "".join(c for c in str(code) if c.isdigit())
+
+
+def _rate(value):
+    return np.nan if value is None else float(value)
+
+
+class HSTariffTrie:
+    """Longest-prefix resolution of HS codes to their tariff entry.
+
+    Each tariff entry (chapter "84", heading "8471", tariff item "84713010",
+    ...) is stored on the trie node for its digits. Resolving a code walks
+    at most eight nodes and keeps the deepest one that carries an entry, so
+    an 8-digit tariff item falls back to its subheading, heading or chapter
+    when it has no rate of its own.
+    """
+
+    def __init__(self, entries):
+        # entries: iterable of dicts keyed by TARIFF_COLUMNS
+        self.entries = []
+        self._root = {}
+        for entry in entries:
+            code = normalize_code(entry["code"])
+            if not MIN_CODE_DIGITS <= len(code) <= MAX_CODE_DIGITS:
+                continue
+            node = self._root
+            for digit in code:
+                node = node.setdefault(digit, {})
+            if None not in node:
+                # The node's entry is kept under the None key; first entry for a code wins
+                node[None] = len(self.entries)
+                self.entries.append(dict(entry, code=code))
+
+        # A rate the tariff leaves empty is NaN like an unresolved code, so callers reject it rather than use 0%
+        self._bcd = np.array([_rate(e["bcd_rate"]) for e in self.entries] + [np.nan])
+        self._igst = np.array([_rate(e["igst_rate"]) for e in self.entries] + [np.nan])
+        self._cess = np.array([_rate(e["cess_rate"]) for e in self.entries] + [np.nan])
+
+    @classmethod
+    def from_rate_master(cls, rate_master=None, on_date=None):
+        rate_master = rate_master or default_rate_master()
+        return cls({"code": r["code"], "description": r["description"], "bcd_rate": r["bcd_rate"],
+                    "igst_rate": r["gst_rate"], "cess_rate": r["cess_rate"]}
+                   for r in rate_master.records(KIND_CUSTOMS, on_date))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def resolve_index(self, code):
+        """Position in `entries` of the most specific entry for `code`, or -1."""
+        code = normalize_code(code)
+        if len(code) < MIN_CODE_DIGITS:
+            return -1
+        node = self._root
+        found = -1
+        for digit in code[:MAX_CODE_DIGITS]:
+            node = node.get(digit)
+            if node is None:
+                break
+            found = node.get(None, found)
+        return found
+
+    def resolve(self, code):
+        """The most specific tariff entry for `code`, or None."""
+        index = self.resolve_index(code)
+        return self.entries[index] if index >= 0 else None
+
+    def resolve_many(self, codes):
+        """Resolve a whole column of codes.
+
+        Returns a dict of arrays: "entry" (position in `entries`, -1 when
+        unresolved) and "bcd_rate", "igst_rate", "cess_rate" as percentages
+        (NaN when unresolved, or when the entry has no such rate). Each distinct code is walked once.
+        """
+        codes = np.asarray(codes, dtype=str)
+        unique, inverse = np.unique(codes, return_inverse=True)
+        entry = np.fromiter((self.resolve_index(code) for code in unique.tolist()),
+                            dtype=np.int64, count=len(unique))[inverse.reshape(-1)]
+        return {"entry": entry, "bcd_rate": self._bcd[entry], "igst_rate": self._igst[entry],
+                "cess_rate": self._cess[entry]}
+
+
+_default_trie = None
+
+
+def default_tariff():
+    """Process-wide HSTariffTrie over the default rate master, built on first use."""
+    global _default_trie
+    if _default_trie is None:
+        _default_trie = HSTariffTrie.from_rate_master()
+    return _default_trie
+
+
+def benchmark(rows=1_000_000, distinct=20_000):
+    rng = np.random.default_rng(7)
+    chapters = [f"{c:02d}" for c in range(1, 98)]
+    entries = [{"code": ch, "description": f"Chapter {ch}", "bcd_rate": 10.0, "igst_rate": 18.0, "cess_rate": 0.0}
+               for ch in chapters]
+    for code in rng.integers(1_000_000, 97_999_999, 10_000):
+        code = f"{code:08d}"
+        entries.append({"code": code[:rng.choice([4, 6, 8])], "description": code, "bcd_rate": 7.5,
+                        "igst_rate": 12.0, "cess_rate": 1.0})
+    trie = HSTariffTrie(entries)
+
+    pool = np.array([f"{c:08d}" for c in rng.integers(1_000_000, 97_999_999, distinct)])
+    column = pool[rng.integers(0, distinct, rows)]
+    start = time.perf_counter()
+    resolved = trie.resolve_many(column)
+    elapsed = time.perf_counter() - start
+    print(f"{rows:,} codes ({distinct:,} distinct) against {len(trie):,} tariff entries: "
+          f"{elapsed:.2f}s, {rows / elapsed:,.0f} codes/s, {np.mean(resolved['entry'] >= 0):.1%} resolved")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,167 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+
+from INVOICE_PDF import DetailedGSTInvoice, InvoiceTemplate
+
+INVOICE_FIELDS = ("company_details", "customer_details", "transportation_details", "items", "totals")
+
+# Per-process state, set up once by _init_worker
+_worker_template = None
+
+
+def _init_worker(font_paths):
+    global _worker_template
+    if font_paths:
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.pdfbase.ttfonts import TTFont
+        for name, path in font_paths.items():
+            pdfmetrics.registerFont(TTFont(name, path))
+    _worker_template = InvoiceTemplate()
+
+
+def _render_chunk(chunk):
+    results = []
+    for key, filename, record, error in chunk:
+        if error is not None:
+            results.append((key, filename, error))
+            continue
+        try:
+            invoice = DetailedGSTInvoice(*(record[field] for field in INVOICE_FIELDS))
+            # Bulk invoices are nearly all unique, so they would only churn the shared render cache
+            invoice.generate_pdf(filename, template=_worker_template, cache=False)
+            results.append((key, filename, None))
+        except Exception as e:
+            results.append((key, filename, f"{type(e).__name__}: {e}"))
+    return results
+
+
+def _invoice_filename(record, output_dir, position):
+    invoice_no = str(record.get("company_details", {}).get("invoice_no") or f"invoice_{position}")
+    safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in invoice_no)
+    return os.path.join(output_dir, f"{safe}.pdf")
+
+
+def _parse_record(record):
+    """(record, error): a JSON line is parsed here so one bad line fails alone, not the batch."""
+    if isinstance(record, (str, bytes)):
+        try:
+            record = json.loads(record)
+        except ValueError as e:
+            return None, f"Invalid JSON: {e}"
+    if not isinstance(record, dict):
+        return None, f"Record must be a JSON object, got {type(record).__name__}"
+    if not isinstance(record.get("company_details", {}), dict):
+        return None, "company_details must be a JSON object"
+    return record, None
+
+
+def _unique_filename(filename, used):
+    # Two invoices with the same number would otherwise overwrite each other's PDF
+    stem, extension = os.path.splitext(filename)
+    suffix = 1
+    while os.path.normcase(os.path.abspath(filename)) in used:
+        suffix += 1
+        filename = f"{stem}_{suffix}{extension}"
+    used.add(os.path.normcase(os.path.abspath(filename)))
+    return filename
+
+
+def _chunks(records, output_dir, chunksize):
+    position = 0
+    used = set()
+    records = iter(records)
+    while True:
+        chunk = []
+        for record in islice(records, chunksize):
+            record, error = _parse_record(record)
+            if error is not None:
+                chunk.append((f"record {position + 1}", None, None, error))
+                position += 1
+                continue
+            key = record.get("company_details", {}).get("invoice_no", position)
+            filename = record.get("filename")
+            if not filename:
+                filename = _unique_filename(_invoice_filename(record, output_dir, position), used)
+            elif os.path.normcase(os.path.abspath(filename)) in used:
+                error = f"{filename} is already the output of another record in this batch"
+            else:
+                used.add(os.path.normcase(os.path.abspath(filename)))
+            chunk.append((key, filename, record, error))
+            position += 1
+        if not chunk:
+            return
+        yield chunk
+
+
+def render_invoices(records, output_dir, workers=None, chunksize=25, font_paths=None, on_result=None):
+    """Render an iterable of invoice records to PDFs on a process pool.
+
+    Each record is a dict, or a JSON line holding one, with the
+    DetailedGSTInvoice fields (items as line dicts, an InvoiceLines or
+    {field: column}) and an optional "filename"; without one the PDF is
+    named after the invoice number inside `output_dir`, with a _2, _3, ...
+    suffix when the number repeats. A record that does not parse, or names
+    a filename already used in the batch, is reported as a failure like
+    one that fails to render. Records are read lazily and only a few chunks per worker
+    are in flight, so the input can be a generator over any number of
+    invoices. Workers register `font_paths` ({font name: .ttf path}) and
+    compile one InvoiceTemplate each. A failing invoice is reported and the batch
+    carries on; `on_result(key, filename, error)` is called as each one
+    finishes. Returns a summary dict.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    rendered = 0
+    failures = []
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(font_paths,)) as pool:
+        chunks = _chunks(records, output_dir, chunksize)
+        pending = set()
+        while True:
+            # Keep the pool busy without reading the whole input up front
+            for chunk in islice(chunks, workers * 2 - len(pending)):
+                pending.add(pool.submit(_render_chunk, chunk))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                for key, filename, error in future.result():
+                    if error is None:
+                        rendered += 1
+                    else:
+                        failures.append((key, filename, error))
+                    if on_result:
+                        on_result(key, filename, error)
+
+    elapsed = time.perf_counter() - started
+    return {"rendered": rendered, "failed": failures, "elapsed": elapsed,
+            "per_sec": (rendered + len(failures)) / elapsed if elapsed else 0.0}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render invoice PDFs in bulk from a JSON-lines file of records.")
+    parser.add_argument("records", help="JSON-lines file, one invoice record per line")
+    parser.add_argument("output_dir", help="directory for the rendered PDFs")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunksize", type=int, default=25, help="invoices handed to a worker at a time")
+    args = parser.parse_args(argv)
+
+    with open(args.records, "r", encoding="utf-8") as f:
+        records = (line for line in f if line.strip())
+        summary = render_invoices(records, args.output_dir, workers=args.workers, chunksize=args.chunksize)
+
+    print(f"Rendered {summary['rendered']:,} invoices in {summary['elapsed']:.1f}s "
+          f"({summary['per_sec']:,.1f}/s), {len(summary['failed']):,} failed")
+    for key, filename, error in summary["failed"]:
+        print(f"  {key} ({filename}): {error}" if filename else f"  {key}: {error}", file=sys.stderr)
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from INVOICE_LINES import NUMBER_FIELDS, TEXT_FIELDS
+
+# Where rendered PDFs are kept unless GST_RENDER_CACHE points elsewhere, and how much of them
+DEFAULT_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "render_cache")
+DEFAULT_MAX_MB = 256
+# Eviction trims to this fraction of the limit, so a full cache is not rescanned on every store
+LOW_WATER = 0.9
+
+
+def render_key(invoice, fingerprint=""):
+    """Stable content hash of an invoice: its detail dicts, line columns and totals, plus the layout fingerprint.
+
+    Detail dicts are hashed as canonical JSON and numeric line columns as
+    raw little-endian float64, so the key is the same in every process and
+    run for the same data.
+    """
+    digest = hashlib.sha256(fingerprint.encode())
+    details = {"company": invoice.company_details, "customer": invoice.customer_details,
+               "transportation": invoice.transportation_details, "totals": invoice.totals}
+    digest.update(json.dumps(details, sort_keys=True, separators=(",", ":"), default=str).encode())
+    lines = invoice.items
+    digest.update(json.dumps([[str(value) for value in lines.column(field)] for field in TEXT_FIELDS]).encode())
+    for field in NUMBER_FIELDS:
+        digest.update(np.ascontiguousarray(lines.column(field), dtype="<f8").tobytes())
+    return digest.hexdigest()
+
+
+class RenderCache:
+    """Rendered invoice PDFs on local disk, keyed by render_key and evicted least recently used first.
+
+    Each entry is one <key>.pdf file and its mtime is the last use, so
+    recency survives restarts and is shared by every process using the
+    directory (the bulk renderer's workers, the GUI). Entries are written
+    to a temporary file and renamed into place. The size index is built
+    from a directory scan on first store and rescanned before evicting, so
+    other processes' writes count too. A cache that cannot be read or
+    written is a miss, never an error.
+    """
+
+    def __init__(self, directory=None, max_bytes=None):
+        self.directory = directory or os.environ.get("GST_RENDER_CACHE") or DEFAULT_DIRECTORY
+        if max_bytes is None:
+            max_bytes = int(float(os.environ.get("GST_RENDER_CACHE_MB", DEFAULT_MAX_MB)) * 1_000_000)
+        self.max_bytes = max_bytes
+        self._entries = None  # key -> size, least recently used first
+        self._size = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".pdf")
+
+    def _scan(self):
+        entries = []
+        try:
+            with os.scandir(self.directory) as scan:
+                for entry in scan:
+                    if entry.name.endswith(".pdf"):
+                        try:
+                            stat = entry.stat()
+                        except FileNotFoundError:
+                            continue
+                        entries.append((stat.st_mtime_ns, entry.name[:-4], stat.st_size))
+        except FileNotFoundError:
+            pass
+        entries.sort()
+        self._entries = OrderedDict((key, size) for _, key, size in entries)
+        self._size = sum(self._entries.values())
+
+    def _note(self, key, size):
+        self._size += size - self._entries.pop(key, 0)
+        self._entries[key] = size
+
+    def get(self, key):
+        """The cached PDF bytes for `key`, or None. A hit is marked as the most recent use."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        if self._entries is not None:
+            self._note(key, len(data))
+        return data
+
+    def put(self, key, data):
+        """Store PDF bytes under `key`, evicting old entries past the size limit. Returns whether it was kept."""
+        if len(data) > self.max_bytes:
+            return False
+        if self._entries is None:
+            self._scan()
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return False
+        self._note(key, len(data))
+        if self._size > self.max_bytes:
+            self._evict()
+        return True
+
+    def _evict(self):
+        self._scan()
+        target = self.max_bytes * LOW_WATER
+        while self._size > target and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._size -= size
+            try:
+                os.remove(self._path(key))
+            except OSError:  # already gone, or open elsewhere on Windows
+                pass
+
+    def stats(self):
+        """(entries, bytes) currently in the directory."""
+        self._scan()
+        return len(self._entries), self._size
+
+    def clear(self):
+        """Remove every cached PDF, and temporary files left by interrupted stores."""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            names = []
+        for name in names:
+            if name.endswith((".pdf", ".tmp")):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+        self._entries = OrderedDict()
+        self._size = 0
+
+
+_default_cache = None
+
+
+def default_render_cache():
+    """Process-wide RenderCache, created on first use."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = RenderCache()
+    return _default_cache
+
+
+def benchmark(lines=500, renders=20):
+    # The renderer imports this module, so it is only imported when needed
+    from INVOICE_PDF import sample_invoice
+
+    cache = RenderCache(tempfile.mkdtemp(), max_bytes=50_000_000)
+    invoice = sample_invoice(lines)
+    target = os.path.join(tempfile.gettempdir(), "benchmark_cached_invoice.pdf")
+    start = time.perf_counter()
+    invoice.generate_pdf(target, cache=cache)
+    cold = time.perf_counter() - start
+    with open(target, "rb") as f:
+        first = f.read()
+    start = time.perf_counter()
+    for _ in range(renders):
+        invoice.generate_pdf(target, cache=cache)
+    warm = (time.perf_counter() - start) / renders
+    start = time.perf_counter()
+    invoice.generate_pdf(target, cache=False)
+    uncached = time.perf_counter() - start
+    with open(target, "rb") as f:
+        identical = f.read() == first
+    start = time.perf_counter()
+    for _ in range(renders):
+        render_key(invoice)
+    key_time = (time.perf_counter() - start) / renders
+    print(f"{lines:,}-line invoice: rendered in {cold * 1000:.0f} ms, cache hit {warm * 1000:.1f} ms "
+          f"(key {key_time * 1000:.2f} ms); re-render without cache {uncached * 1000:.0f} ms, "
+          f"{'identical' if identical else 'DIFFERENT'} bytes")
+    cache.clear()
+    os.remove(target)
+    os.rmdir(cache.directory)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or empty the rendered invoice PDF cache.")
+    parser.add_argument("--dir", help=f"cache directory (default: $GST_RENDER_CACHE or {DEFAULT_DIRECTORY})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats", help="show how many PDFs are cached and their size")
+    commands.add_parser("clear", help="remove every cached PDF")
+    args = parser.parse_args(argv)
+
+    cache = RenderCache(args.dir)
+    if args.command == "clear":
+        count, size = cache.stats()
+        cache.clear()
+        print(f"Removed {count:,} cached PDFs ({size / 1e6:.1f} MB) from {cache.directory}")
+        return 0
+    count, size = cache.stats()
+    print(f"{count:,} cached PDFs, {size / 1e6:.1f} of {cache.max_bytes / 1e6:.0f} MB, in {cache.directory}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,342 @@
+import os
+import tempfile
+import time
+from copy import copy
+from io import BytesIO
+
+from reportlab import Version as REPORTLAB_VERSION
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Flowable
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch, cm
+
+from INVOICE_CACHE import default_render_cache, render_key
+from INVOICE_LINES import as_invoice_lines, sample_lines
+from MEMORY_USAGE import peak_rss_mb
+
+# Part of every render cache key; bump it when the drawing code changes what a PDF looks like
+LAYOUT_VERSION = 1
+
+ITEM_HEADERS = ["Sr. No.", "Description", "HSN", "Qty.", "Unit", "Rate", "Total", "Discount", "Taxable", "CGST",
+                "SGST", "IGST"]
+
+# Adjust these widths to fit your page and content
+ITEM_COL_WIDTHS = [0.5 * cm, 3 * cm, 1 * cm, 0.8 * cm, 0.8 * cm, 1.5 * cm, 1.5 * cm, 1.5 * cm, 1.5 * cm, 1.5 * cm,
+                   1.5 * cm, 1.5 * cm]
+
+# Amount columns carried forward from page to page, in item-table column order
+SUBTOTAL_KEYS = ["total", "discount", "taxable_value", "cgst_amount", "sgst_amount", "igst_amount"]
+SUBTOTAL_FIRST_COL = 6
+
+ITEM_TABLE_STYLE = [
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 8),  # Reduce font size if needed
+    ('TOPPADDING', (0, 0), (-1, -1), 1),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 1),
+]
+
+
+def format_quantity(qty):
+    return int(qty) if float(qty).is_integer() else qty
+
+
+def format_item_row(idx, item):
+    return [
+        idx,
+        item['description'],
+        item['hsn'],
+        format_quantity(item['qty']),
+        item['unit'],
+        f"₹{item['rate']:.2f}",
+        f"₹{item['total']:.2f}",
+        f"₹{item['discount']:.2f}",
+        f"₹{item['taxable_value']:.2f}",
+        f"{item['cgst_rate']}%\n₹{item['cgst_amount']:.2f}",
+        f"{item['sgst_rate']}%\n₹{item['sgst_amount']:.2f}",
+        f"{item['igst_rate']}%\n₹{item['igst_amount']:.2f}"
+    ]
+
+
+class PaginatedItemsTable(Flowable):
+    """Items table that is laid out one page at a time.
+
+    Rows are only formatted for the page being drawn, so the cost of a long
+    invoice is one page of cells rather than every cell up front. Each page
+    repeats the header, opens with a "Brought forward" row and closes with a
+    "Carried forward" row holding the running amount subtotals.
+    """
+
+    def __init__(self, items, start=0, brought_forward=None, col_widths=ITEM_COL_WIDTHS,
+                 table_style=ITEM_TABLE_STYLE):
+        Flowable.__init__(self)
+        self.items = as_invoice_lines(items)
+        self.start = start
+        self.brought_forward = brought_forward
+        self.col_widths = col_widths
+        self.table_style = table_style
+        self._table = None
+
+    def _subtotal_row(self, label, subtotals):
+        row = [label] + [""] * (SUBTOTAL_FIRST_COL - 1)
+        row += [f"₹{value:.2f}" for value in subtotals]
+        return row
+
+    def _build_table(self, stop, carry_forward):
+        data = [ITEM_HEADERS]
+        style = list(self.table_style)
+        if self.brought_forward is not None:
+            data.append(self._subtotal_row("Brought forward", self.brought_forward))
+        for idx, item in enumerate(self.items.page(self.start, stop), start=self.start + 1):
+            data.append(format_item_row(idx, item))
+        if carry_forward is not None:
+            data.append(self._subtotal_row("Carried forward", carry_forward))
+
+        for row, flag in ((1, self.brought_forward is not None), (-1, carry_forward is not None)):
+            if flag:
+                style += [('SPAN', (0, row), (SUBTOTAL_FIRST_COL - 1, row)),
+                          ('FONTNAME', (0, row), (-1, row), 'Helvetica-Bold')]
+        return Table(data, colWidths=self.col_widths, style=TableStyle(style))
+
+    def _running_totals(self, stop):
+        totals = list(self.brought_forward or [0.0] * len(SUBTOTAL_KEYS))
+        for col, key in enumerate(SUBTOTAL_KEYS):
+            totals[col] += float(self.items.column(key)[self.start:stop].sum())
+        return totals
+
+    def wrap(self, availWidth, availHeight):
+        remaining = len(self.items) - self.start
+        row_height = self._row_height(availWidth)
+        if (remaining + 2) * row_height > availHeight:
+            # Too long for this frame; report the estimate so the doc calls split()
+            self._table = None
+            self.width = sum(self.col_widths)
+            self.height = (remaining + 2) * row_height
+            return self.width, self.height
+        self._table = self._build_table(len(self.items), None)
+        self.width, self.height = self._table.wrap(availWidth, availHeight)
+        return self.width, self.height
+
+    def _row_height(self, availWidth):
+        if not hasattr(self, "_measured_row_height"):
+            stop = min(self.start + 1, len(self.items))
+            sample = Table([ITEM_HEADERS] + [format_item_row(self.start + 1, item)
+                                             for item in self.items.page(self.start, stop)],
+                           colWidths=self.col_widths, style=TableStyle(self.table_style))
+            sample.wrap(availWidth, 1e9)
+            self._measured_row_height = max(sample._rowHeights)
+        return self._measured_row_height
+
+    def split(self, availWidth, availHeight):
+        row_height = self._row_height(availWidth)
+        # header + optional brought forward + carried forward rows
+        overhead = (3 if self.brought_forward is not None else 2) * row_height
+        count = min(int((availHeight - overhead) // row_height), len(self.items) - self.start)
+        while count > 0:
+            stop = self.start + count
+            carry_forward = self._running_totals(stop) if stop < len(self.items) else None
+            table = self._build_table(stop, carry_forward)
+            if table.wrap(availWidth, availHeight)[1] <= availHeight:
+                if carry_forward is None:
+                    return [table]
+                rest = PaginatedItemsTable(self.items, stop, carry_forward, self.col_widths, self.table_style)
+                rest._measured_row_height = row_height
+                return [table, rest]
+            count -= 1
+        return []
+
+    def draw(self):
+        self._table.drawOn(self.canv, 0, 0)
+
+
+def build_invoice_styles():
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(name='CenterAlign', alignment=1, fontSize=16, fontName="Helvetica-Bold"))
+    styles.add(ParagraphStyle(name='LeftAlign', alignment=0, fontSize=10, fontName="Helvetica"))
+    styles.add(ParagraphStyle(name='RightAlign', alignment=2, fontSize=10, fontName="Helvetica"))
+    return styles
+
+
+class InvoiceTemplate:
+    """Everything about the invoice layout that does not depend on the invoice.
+
+    Compiled once and shared by every render in the process: page geometry,
+    the stylesheet, table styles and column widths, and the static
+    title/declaration flowables. Layout state is written onto flowables
+    while a document builds, so each render takes shallow copies of the
+    parsed static ones via fresh().
+    """
+
+    def __init__(self, pagesize=A4, margin=0.5 * inch):
+        self.pagesize = pagesize
+        self.margin = margin
+        self.width = pagesize[0] - 2 * margin
+        self.styles = build_invoice_styles()
+
+        self.half_widths = [self.width / 2 - 6, self.width / 2 - 6]
+        self.company_style = TableStyle([
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ])
+        self.customer_style = TableStyle([
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('BACKGROUND', (0, 0), (1, 0), colors.lightgrey),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ])
+        self.item_col_widths = ITEM_COL_WIDTHS
+        self.item_table_style = ITEM_TABLE_STYLE
+
+        self.transport_mode = Paragraph("<b>Transportation Mode:</b> Apply for Supply of Goods",
+                                        self.styles['LeftAlign'])
+        self.header = [Paragraph("GST INVOICE RECEIPT", self.styles['CenterAlign']), Spacer(1, 0.2 * inch)]
+        self.spacer = Spacer(1, 0.2 * inch)
+        self.footer = [
+            Spacer(1, 0.2 * inch),
+            Paragraph("Declaration:", self.styles['LeftAlign']),
+            Paragraph(
+                "We declare that this invoice shows the actual price of the goods described and that all particulars are true and correct.",
+                self.styles['LeftAlign']),
+            Spacer(1, 0.5 * inch),
+            Paragraph("Signature:", self.styles['RightAlign']),
+            Paragraph("Name of the Signatory:", self.styles['RightAlign']),
+            Paragraph("Designation / Status:", self.styles['RightAlign']),
+        ]
+
+    @staticmethod
+    def fresh(flowables):
+        return [copy(flowable) for flowable in flowables]
+
+    def fingerprint(self):
+        """Everything about the layout that changes the rendered bytes, for the render cache key."""
+        return repr((LAYOUT_VERSION, REPORTLAB_VERSION, self.pagesize, self.margin, self.item_col_widths,
+                     self.item_table_style))
+
+    def doc(self, filename):
+        # invariant fixes the creation date and document ID, so the same invoice always gives the same bytes
+        return SimpleDocTemplate(filename, pagesize=self.pagesize, leftMargin=self.margin, rightMargin=self.margin,
+                                 topMargin=self.margin, bottomMargin=self.margin, pageCompression=1, invariant=1)
+
+
+_default_template = None
+
+
+def default_template():
+    global _default_template
+    if _default_template is None:
+        _default_template = InvoiceTemplate()
+    return _default_template
+
+
+class DetailedGSTInvoice:
+    def __init__(self, company_details, customer_details, transportation_details, items, totals):
+        self.company_details = company_details
+        self.customer_details = customer_details
+        self.transportation_details = transportation_details
+        # Line dicts or {field: column} are accepted and stored column by column
+        self.items = as_invoice_lines(items)
+        self.totals = totals
+
+    def generate_pdf(self, filename, template=None, cache=None):
+        """Write the invoice PDF to `filename` (a path or binary file).
+
+        Renders are kept in the render cache (default_render_cache() unless
+        `cache` is given; False to bypass it), so an invoice rendered before,
+        e.g. saved and then printed, or reprinted, is copied from disk
+        without building it again.
+        """
+        template = template or default_template()
+        cache = default_render_cache() if cache is None else cache or None
+        key = render_key(self, template.fingerprint()) if cache is not None else None
+        data = cache.get(key) if cache is not None else None
+        if data is None:
+            buffer = BytesIO()
+            self.build(buffer, template)
+            data = buffer.getvalue()
+            if cache is not None:
+                cache.put(key, data)
+        if hasattr(filename, "write"):
+            filename.write(data)
+        else:
+            with open(filename, "wb") as f:
+                f.write(data)
+
+    def build(self, filename, template):
+        """Render the invoice with reportlab, always; generate_pdf goes through the cache first."""
+        styles = template.styles
+        doc = template.doc(filename)
+        elements = template.fresh(template.header)
+
+        # Company and Transportation details
+        data = [
+            [Paragraph(f"<b>{self.company_details['name']}</b>", styles['LeftAlign']), copy(template.transport_mode)],
+            [f"GSTIN: {self.company_details['gstin']}", f"Vehicle No.: {self.transportation_details['vehicle_no']}"],
+            [f"Address: {self.company_details['address']}",
+             f"Date and Time of Supply: {self.transportation_details['supply_date']}"],
+            [f"Serial No. of Invoice: {self.company_details['invoice_no']}",
+             f"Place of Supply: {self.transportation_details['supply_place']}"],
+            [f"Date of Invoice: {self.company_details['invoice_date']}", ""]
+        ]
+        elements.append(Table(data, colWidths=template.half_widths, style=template.company_style))
+        elements.append(template.spacer)
+
+        # Customer details
+        data = [
+            ["Details of Receiver (Billed to)", "Details of Consignee (Shipped to)"],
+            [f"Name: {self.customer_details['name']}", f"Name: {self.customer_details['ship_name']}"],
+            [f"Address: {self.customer_details['address']}", f"Address: {self.customer_details['ship_address']}"],
+            [f"State: {self.customer_details['state']}", f"State: {self.customer_details['ship_state']}"],
+            [f"State Code: {self.customer_details['state_code']}",
+             f"State Code: {self.customer_details['ship_state_code']}"],
+            [f"GSTIN/Unique ID: {self.customer_details['gstin']}",
+             f"GSTIN/Unique ID: {self.customer_details['ship_gstin']}"]
+        ]
+        elements.append(Table(data, colWidths=template.half_widths, style=template.customer_style))
+        elements.append(template.spacer)
+
+        # Items, split across pages with carry-forward subtotals
+        elements.append(PaginatedItemsTable(self.items, col_widths=template.item_col_widths,
+                                            table_style=template.item_table_style))
+        elements.append(template.spacer)
+
+        # Totals
+        elements.append(
+            Paragraph(f"Total Invoice Value (In figure): ₹{self.totals['total_value']:.2f}", styles['RightAlign']))
+        elements.append(
+            Paragraph(f"Total Invoice Value (In Words): {self.totals['total_in_words']}", styles['RightAlign']))
+        elements.append(Paragraph(f"Amount of Tax subject to Reverse Charges: ₹{self.totals['reverse_charge']:.2f}",
+                                  styles['RightAlign']))
+
+        # Declaration and Signature
+        elements.extend(template.fresh(template.footer))
+
+        doc.build(elements)
+
+
+def sample_invoice(lines):
+    company_details = {"name": "Sample Traders", "gstin": "27AAAAA0000A1Z5", "address": "Mumbai",
+                       "invoice_no": "BENCH-1", "invoice_date": "2024-04-01"}
+    customer_details = {"name": "Wholesale Buyer", "address": "Pune", "state": "Maharashtra", "state_code": "27",
+                        "gstin": "27BBBBB1111B1Z5", "ship_name": "Wholesale Buyer", "ship_address": "Pune",
+                        "ship_state": "Maharashtra", "ship_state_code": "27", "ship_gstin": "27BBBBB1111B1Z5"}
+    transportation_details = {"vehicle_no": "MH12AB1234", "supply_date": "2024-04-01", "supply_place": "Pune"}
+    items = sample_lines(lines)
+    totals = {"total_value": float(items.column("total").sum()), "total_in_words": "", "reverse_charge": 0}
+    return DetailedGSTInvoice(company_details, customer_details, transportation_details, items, totals)
+
+
+def benchmark(lines=50000, filename=None):
+    filename = filename or os.path.join(tempfile.gettempdir(), "benchmark_invoice.pdf")
+    invoice = sample_invoice(lines)
+    start = time.perf_counter()
+    invoice.generate_pdf(filename, cache=False)
+    elapsed = time.perf_counter() - start
+    print(f"{lines:,} lines rendered in {elapsed:.1f}s ({lines / elapsed:,.0f} lines/s), "
+          f"peak RSS {peak_rss_mb():.0f} MB")
+
+
+if __name__ == "__main__":
+    benchmark()
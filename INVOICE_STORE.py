@@ -0,0 +1,312 @@
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from FIXED_POINT import to_paise
+from INVOICE_LINES import InvoiceLines, as_invoice_lines
+from INVOICE_PDF import DetailedGSTInvoice, sample_invoice
+from PLACE_OF_SUPPLY import invoice_place_of_supply
+
+# Where invoices are kept unless GST_INVOICE_STORE points elsewhere
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "invoices.sqlite3")
+
+# Line-item fields by how they are stored: text as is, amounts as integer paise, rates as REAL
+LINE_TEXT_COLUMNS = ("description", "hsn", "unit")
+LINE_PAISE_COLUMNS = ("rate", "total", "discount", "taxable_value", "cgst_amount", "sgst_amount", "igst_amount")
+LINE_RATE_COLUMNS = ("cgst_rate", "sgst_rate", "igst_rate")
+LINE_COLUMNS = ("invoice_id", "line_no", *LINE_TEXT_COLUMNS, "qty", *LINE_PAISE_COLUMNS, *LINE_RATE_COLUMNS)
+
+# Columns yielded by iter_line_chunks, named as GST_RETURNS expects them
+RETURN_LINE_COLUMNS = ("supplier_gstin", "customer_gstin", "place_of_supply", "hsn", "unit", "qty", "gst_rate",
+                       "taxable_value", "igst_amount", "cgst_amount", "sgst_amount")
+
+INVOICE_COLUMNS = ("id", "supplier_gstin", "invoice_no", "invoice_date", "customer_name", "customer_gstin",
+                   "place_of_supply", "total_paise")
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS invoices (
+    id INTEGER PRIMARY KEY,
+    supplier_gstin TEXT NOT NULL,
+    invoice_no TEXT NOT NULL,
+    invoice_date TEXT NOT NULL,
+    customer_name TEXT NOT NULL,
+    customer_gstin TEXT NOT NULL,
+    place_of_supply INTEGER NOT NULL,
+    total_paise INTEGER NOT NULL,
+    details TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS invoices_number ON invoices (invoice_no, supplier_gstin);
+CREATE INDEX IF NOT EXISTS invoices_date ON invoices (invoice_date);
+CREATE INDEX IF NOT EXISTS invoices_supplier ON invoices (supplier_gstin, invoice_date);
+CREATE INDEX IF NOT EXISTS invoices_customer_gstin ON invoices (customer_gstin, invoice_date);
+CREATE INDEX IF NOT EXISTS invoices_customer_name ON invoices (customer_name COLLATE NOCASE, invoice_date);
+CREATE TABLE IF NOT EXISTS lines (
+    invoice_id INTEGER NOT NULL,
+    line_no INTEGER NOT NULL,
+    {', '.join(f'{column} TEXT NOT NULL' for column in LINE_TEXT_COLUMNS)},
+    qty NUMERIC NOT NULL,
+    {', '.join(f'{column} INTEGER NOT NULL' for column in LINE_PAISE_COLUMNS)},
+    {', '.join(f'{column} REAL NOT NULL' for column in LINE_RATE_COLUMNS)},
+    PRIMARY KEY (invoice_id, line_no)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS lines_hsn ON lines (hsn);
+"""
+
+
+def _gstin(value):
+    # GSTINs are stored and queried in this one form, so lookups can use the indexes as they are
+    return value.strip().upper()
+
+
+def _line_rows(invoice_id, items):
+    """Rows for the lines table, with every amount column converted to paise in one pass."""
+    lines = as_invoice_lines(items)
+    paise = [to_paise(lines.column(column)).tolist() for column in LINE_PAISE_COLUMNS]
+    text = [[str(value) for value in lines.column(column)] for column in LINE_TEXT_COLUMNS]
+    rates = [lines.column(column).tolist() for column in LINE_RATE_COLUMNS]
+    return zip([invoice_id] * len(lines), range(1, len(lines) + 1), *text, lines.column("qty").tolist(),
+               *paise, *rates)
+
+
+class InvoiceStore:
+    """Issued invoices kept in a local SQLite file for reprinting, audit and returns.
+
+    Each invoice is a header row (the indexed fields plus the full detail
+    dicts as JSON) and one row per line, with amounts in integer paise.
+    Lines are clustered by invoice, so reprinting reads one contiguous
+    range; headers are indexed by invoice number, date, supplier and
+    customer (GSTIN and name) and lines by HSN. The file runs in WAL mode,
+    so readers never block the writer and a batch is one fsync.
+    Saving an invoice number the supplier already used replaces it.
+    GSTINs are stored stripped and upper-cased and every GSTIN filter is
+    normalised the same way, so they match however they were typed.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.environ.get("GST_INVOICE_STORE") or DEFAULT_PATH
+        self.conn = sqlite3.connect(self.path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        # In WAL mode NORMAL only risks the last commits on power loss, never corruption
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def save(self, invoice):
+        """Store one DetailedGSTInvoice. Returns its id."""
+        return self.save_many([invoice])[0]
+
+    def save_many(self, invoices):
+        """Store DetailedGSTInvoices in a single transaction. Returns their ids.
+
+        An invoice number repeated within the batch ends up as its last occurrence.
+        """
+        ids = []
+        with self.conn:
+            for invoice in invoices:
+                company, customer = invoice.company_details, invoice.customer_details
+                self._delete(company["invoice_no"], _gstin(company["gstin"]))
+                details = json.dumps({"company": company, "customer": customer,
+                                      "transportation": invoice.transportation_details, "totals": invoice.totals})
+                cursor = self.conn.execute(
+                    f"INSERT INTO invoices ({', '.join(INVOICE_COLUMNS[1:])}, details) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (_gstin(company["gstin"]), company["invoice_no"], company["invoice_date"], customer["name"],
+                     _gstin(customer["gstin"]), invoice_place_of_supply(customer, invoice.transportation_details),
+                     int(to_paise(invoice.totals["total_value"])), details))
+                ids.append(cursor.lastrowid)
+                # Lines go in with their header, so a number repeated later in the batch deletes them too
+                self.conn.executemany(f"INSERT INTO lines ({', '.join(LINE_COLUMNS)}) "
+                                      f"VALUES ({', '.join('?' * len(LINE_COLUMNS))})",
+                                      _line_rows(cursor.lastrowid, invoice.items))
+        return ids
+
+    def _delete(self, invoice_no, supplier_gstin):
+        row = self.conn.execute("SELECT id FROM invoices WHERE invoice_no = ? AND supplier_gstin = ?",
+                                (invoice_no, supplier_gstin)).fetchone()
+        if row is not None:
+            self.conn.execute("DELETE FROM lines WHERE invoice_id = ?", (row["id"],))
+            self.conn.execute("DELETE FROM invoices WHERE id = ?", (row["id"],))
+
+    def load(self, invoice_no, supplier_gstin=None):
+        """The stored DetailedGSTInvoice with this number, or None.
+
+        Without a supplier GSTIN the most recently stored invoice with the
+        number is returned.
+        """
+        sql = "SELECT id, details FROM invoices WHERE invoice_no = ?"
+        params = [invoice_no]
+        if supplier_gstin is not None:
+            sql += " AND supplier_gstin = ?"
+            params.append(_gstin(supplier_gstin))
+        row = self.conn.execute(sql + " ORDER BY id DESC LIMIT 1", params).fetchone()
+        if row is None:
+            return None
+        details = json.loads(row["details"])
+        cursor = self.conn.cursor()
+        cursor.row_factory = None
+        rows = cursor.execute(f"SELECT {', '.join(LINE_COLUMNS[2:])} FROM lines WHERE invoice_id = ? "
+                              f"ORDER BY line_no", (row["id"],)).fetchall()
+        # Read straight into columns; no per-line dicts
+        columns = dict(zip(LINE_COLUMNS[2:], zip(*rows))) if rows else dict.fromkeys(LINE_COLUMNS[2:], ())
+        for column in LINE_PAISE_COLUMNS:
+            columns[column] = np.array(columns[column], dtype=np.int64) / 100
+        return DetailedGSTInvoice(details["company"], details["customer"], details["transportation"],
+                                  InvoiceLines(columns), details["totals"])
+
+    def reprint(self, invoice_no, filename, supplier_gstin=None):
+        """Render a stored invoice to `filename`. Returns False if there is no such invoice."""
+        invoice = self.load(invoice_no, supplier_gstin)
+        if invoice is None:
+            return False
+        invoice.generate_pdf(filename)
+        return True
+
+    def find(self, customer=None, start=None, end=None, supplier_gstin=None, limit=None):
+        """Invoice headers, oldest first, filtered by customer and/or an inclusive date range.
+
+        `customer` matches a GSTIN exactly or a customer name
+        case-insensitively; dates are "YYYY-MM-DD". Headers are dicts keyed
+        by INVOICE_COLUMNS.
+        """
+        where, params = [], []
+        if customer:
+            # Either index serves the lookup; SQLite unions the two
+            where.append("(customer_gstin = ? OR customer_name = ? COLLATE NOCASE)")
+            params += [_gstin(customer), customer.strip()]
+        if start:
+            where.append("invoice_date >= ?")
+            params.append(str(start))
+        if end:
+            where.append("invoice_date <= ?")
+            params.append(str(end))
+        if supplier_gstin:
+            where.append("supplier_gstin = ?")
+            params.append(_gstin(supplier_gstin))
+        sql = f"SELECT {', '.join(INVOICE_COLUMNS)} FROM invoices"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY invoice_date, invoice_no"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def iter_line_chunks(self, start=None, end=None, supplier_gstin=None, chunk_rows=200_000):
+        """Stored lines with their invoice's parties, as dicts of columns of up to `chunk_rows` lines.
+
+        Columns are RETURN_LINE_COLUMNS: the supplier and customer GSTINs and
+        place of supply from the header, the line's HSN, unit, quantity and
+        total GST rate, and its amounts in paise.
+        """
+        where, params = [], []
+        if start:
+            where.append("i.invoice_date >= ?")
+            params.append(str(start))
+        if end:
+            where.append("i.invoice_date <= ?")
+            params.append(str(end))
+        if supplier_gstin:
+            where.append("i.supplier_gstin = ?")
+            params.append(_gstin(supplier_gstin))
+        sql = ("SELECT i.supplier_gstin, i.customer_gstin, i.place_of_supply, l.hsn, l.unit, l.qty, "
+               "l.cgst_rate + l.sgst_rate + l.igst_rate, l.taxable_value, l.igst_amount, l.cgst_amount, "
+               "l.sgst_amount FROM invoices i JOIN lines l ON l.invoice_id = i.id")
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        cursor = self.conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(chunk_rows)
+            if not rows:
+                break
+            yield {name: np.array(column) for name, column in zip(RETURN_LINE_COLUMNS, zip(*rows))}
+
+    def line_count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM lines").fetchone()[0]
+
+
+_default_store = None
+
+
+def default_invoice_store():
+    """Process-wide InvoiceStore, opened on first use."""
+    global _default_store
+    if _default_store is None:
+        _default_store = InvoiceStore()
+    return _default_store
+
+
+def benchmark(invoices=10_000, lines_per_invoice=20, path=None):
+    directory = tempfile.mkdtemp()
+    store = InvoiceStore(path or os.path.join(directory, "invoices.sqlite3"))
+    template = sample_invoice(lines_per_invoice)
+    rng = np.random.default_rng(9)
+    dates = (np.datetime64("2024-04-01") + rng.integers(0, 365, invoices)).astype(str).tolist()
+    customers = [f"Customer {i}" for i in rng.integers(0, 500, invoices).tolist()]
+    batch = []
+    for number, (invoice_date, customer) in enumerate(zip(dates, customers)):
+        company = dict(template.company_details, invoice_no=f"INV-{number:07d}", invoice_date=invoice_date)
+        batch.append(DetailedGSTInvoice(company, dict(template.customer_details, name=customer),
+                                        template.transportation_details, template.items, template.totals))
+
+    start = time.perf_counter()
+    for offset in range(0, invoices, 1000):
+        store.save_many(batch[offset:offset + 1000])
+    elapsed = time.perf_counter() - start
+    lines = invoices * lines_per_invoice
+    print(f"{lines:,} lines in {invoices:,} invoices stored in {elapsed:.2f}s ({lines / elapsed:,.0f} lines/s)")
+
+    start = time.perf_counter()
+    for number in rng.integers(0, invoices, 200).tolist():
+        store.load(f"INV-{number:07d}")
+    print(f"Load for reprint: {(time.perf_counter() - start) / 200 * 1000:.2f} ms")
+    start = time.perf_counter()
+    found = store.find(customer="Customer 7", start="2024-07-01", end="2024-09-30")
+    print(f"Customer + quarter query: {(time.perf_counter() - start) * 1000:.2f} ms, {len(found)} invoices")
+    store.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query and reprint invoices kept in the invoice store.")
+    parser.add_argument("--store", help="store file (default: invoices.sqlite3, or $GST_INVOICE_STORE)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    listing = commands.add_parser("list", help="list invoices by customer and/or period")
+    listing.add_argument("--customer", help="customer GSTIN or name")
+    listing.add_argument("--from", dest="start", help="first invoice date, YYYY-MM-DD")
+    listing.add_argument("--to", dest="end", help="last invoice date, YYYY-MM-DD")
+    listing.add_argument("--supplier", help="supplier GSTIN")
+    reprint = commands.add_parser("reprint", help="render a stored invoice to PDF")
+    reprint.add_argument("invoice_no")
+    reprint.add_argument("output", help="PDF file to write")
+    reprint.add_argument("--supplier", help="supplier GSTIN, when several suppliers used the number")
+    args = parser.parse_args(argv)
+
+    try:
+        store = InvoiceStore(args.store)
+        if args.command == "reprint":
+            if not store.reprint(args.invoice_no, args.output, args.supplier):
+                raise ValueError(f"No stored invoice numbered {args.invoice_no}")
+            print(f"Invoice {args.invoice_no} written to {args.output}")
+            return 0
+        headers = store.find(args.customer, args.start, args.end, args.supplier)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    for header in headers:
+        print(f"{header['invoice_date']}  {header['invoice_no']:<16} {header['customer_name']:<30} "
+              f"{header['customer_gstin']:<15} {header['total_paise'] / 100:>14,.2f}")
+    print(f"{len(headers):,} invoices")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
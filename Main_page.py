@@ -1,6 +1,17 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 
+from CATALOG_SEARCH import CatalogIndex
+from FUZZY_MATCH import FuzzyIndex
+from RATE_MASTER import default_rate_master
+
+# Wait this long after the last keystroke before searching
+SEARCH_DEBOUNCE_MS = 120
+
+# Fuzzy suggestions shown when nothing contains the search term
+FUZZY_SUGGESTIONS = 5
+FUZZY_MIN_SCORE = 0.35
+
 class MainApplication:
     def __init__(self, root):
         self.root = root
@@ -8,35 +19,13 @@ class MainApplication:
         self.root.geometry("800x600")
         self.root.configure(bg="#003366")
 
-        self.gst_data = {
-            "0%": [
-                "Fresh fruits and vegetables", "Unprocessed grains", "Books and newspapers",
-                "Healthcare services", "Education services", "Public transportation services",
-                "Hotels and lodges with tariffs below a specified threshold", "Non-AC restaurants"
-            ],
-            "5%": [
-                "Household necessities", "Railways and air travel tickets below certain classes",
-                "Ayurvedic, Unani, Siddha, and Homeopathic medicines", "Apparel below certain price",
-                "Footwear below certain price", "Cream, skimmed milk powder", "Branded paneer",
-                "Frozen vegetables", "Coffee (not instant)", "Tea", "Packed curd", "Insulin",
-                "Agro-based products"
-            ],
-            "12%": [
-                "Computers and processed food items", "Mobile phones", "Spectacles and lenses",
-                "Umbrellas, sewing machines, and household appliances", "Butter, ghee, cheese",
-                "Fruit juices", "Packed coconut water", "Tooth powder", "Ayurvedic medicines"
-            ],
-            "18%": [
-                "Refrigerators and washing machines", "Telecom services", "Mineral water and beverages",
-                "Hotels with tariffs above a certain threshold", "AC restaurants", "IT services",
-                "Biscuits", "Instant coffee", "Toothpaste", "Hair oil", "Soap", "Industrial intermediaries"
-            ],
-            "28%": [
-                "Automobiles and motorcycles", "High-end motorcycles", "Consumer durables like ACs and refrigerators",
-                "Aerated drinks, tobacco products, and luxury items", "Cigarettes and cigars", "Private jets",
-                "Perfume", "Makeup", "Deodorants", "Washing machines", "Paints", "Varnishes"
-            ]
-        }
+        self.gst_data = default_rate_master().gst_categories()
+
+        # Built once; every search and rate lookup goes through it
+        catalog = [(category, gst_rate) for gst_rate, categories in self.gst_data.items() for category in categories]
+        self.search_index = CatalogIndex(catalog)
+        self.fuzzy_index = FuzzyIndex(catalog)
+        self._pending_search = None
 
         self.setup_main_ui()
 
@@ -48,7 +37,7 @@ class MainApplication:
         search_frame = tk.Frame(self.root, bg="#003366")
         search_frame.pack(pady=20)
         self.search_var = tk.StringVar()
-        self.search_var.trace("w", self.search_gst)
+        self.search_var.trace("w", self.schedule_search)
         search_entry = tk.Entry(search_frame, textvariable=self.search_var, font=("Helvetica", 14), width=40)
         search_entry.pack(side="left", padx=10)
 
@@ -85,18 +74,26 @@ class MainApplication:
     def placeholder(self):
         messagebox.showinfo("Info", "This feature is not implemented yet.")
 
+    def schedule_search(self, *args):
+        if self._pending_search is not None:
+            self.root.after_cancel(self._pending_search)
+        self._pending_search = self.root.after(SEARCH_DEBOUNCE_MS, self.search_gst)
+
     def search_gst(self, *args):
-        search_term = self.search_var.get().lower()
+        self._pending_search = None
+        search_term = self.search_var.get()
         self.suggestions_listbox.delete(0, tk.END)
         if search_term.strip() == "":
             return
 
-        for gst_rate, categories in self.gst_data.items():
-            for category in categories:
-                if search_term in category.lower():
-                    self.suggestions_listbox.insert(tk.END, category)
-
-        if self.suggestions_listbox.size() == 0:
+        matches = self.search_index.search(search_term)
+        if not matches:
+            # Probably a misspelling; offer the closest categories instead
+            matches = [category for category, _, _ in
+                       self.fuzzy_index.top_k(search_term, FUZZY_SUGGESTIONS, FUZZY_MIN_SCORE)]
+        if matches:
+            self.suggestions_listbox.insert(tk.END, *matches)
+        else:
             self.suggestions_listbox.insert(tk.END, "No matching category found.")
 
     def fill_search_entry(self, event):
@@ -105,10 +102,7 @@ class MainApplication:
             messagebox.showinfo("Search Result", f"{selection} falls under {self.get_gst_rate(selection)} GST")
 
     def get_gst_rate(self, category):
-        for gst_rate, categories in self.gst_data.items():
-            if category in categories:
-                return gst_rate
-        return "Unknown"
+        return self.search_index.payload(category, "Unknown")
 
 class GSTCalculator:
     def _init_(self, root):
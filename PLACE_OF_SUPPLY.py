@@ -0,0 +1,154 @@
+import time
+
+import numpy as np
+
+from INVOICE_LINES import as_invoice_lines
+
+# GST state and union territory codes, as used in GSTINs and on invoices
+STATE_CODES = {
+    1: "Jammu and Kashmir", 2: "Himachal Pradesh", 3: "Punjab", 4: "Chandigarh", 5: "Uttarakhand",
+    6: "Haryana", 7: "Delhi", 8: "Rajasthan", 9: "Uttar Pradesh", 10: "Bihar", 11: "Sikkim",
+    12: "Arunachal Pradesh", 13: "Nagaland", 14: "Manipur", 15: "Mizoram", 16: "Tripura", 17: "Meghalaya",
+    18: "Assam", 19: "West Bengal", 20: "Jharkhand", 21: "Odisha", 22: "Chhattisgarh", 23: "Madhya Pradesh",
+    24: "Gujarat", 25: "Daman and Diu", 26: "Dadra and Nagar Haveli and Daman and Diu", 27: "Maharashtra",
+    28: "Andhra Pradesh (Old)", 29: "Karnataka", 30: "Goa", 31: "Lakshadweep", 32: "Kerala", 33: "Tamil Nadu",
+    34: "Puducherry", 35: "Andaman and Nicobar Islands", 36: "Telangana", 37: "Andhra Pradesh", 38: "Ladakh",
+    96: "Foreign Country", 97: "Other Territory",
+}
+
+# Place of supply outside India: always inter-state (zero-rated or IGST)
+FOREIGN_COUNTRY = 96
+
+# Code -> valid flag for every two-digit code, plus a spare last slot that -1 (unknown) indexes
+VALID_STATE = np.zeros(101, dtype=bool)
+VALID_STATE[list(STATE_CODES)] = True
+
+_CODE_BY_NAME = {name.lower(): code for code, name in STATE_CODES.items()}
+
+
+def state_number(value):
+    """State code (int) from a code ("27", 27), a GSTIN or a state name; -1 if unknown."""
+    if value is None:
+        return -1
+    text = str(value).strip()
+    if text[:2].isdigit():
+        code = int(text[:2])
+    else:
+        code = _CODE_BY_NAME.get(text.lower(), -1)
+    return code if 0 <= code < 100 and VALID_STATE[code] else -1
+
+
+def state_numbers(values):
+    """state_number for a whole column, looked up once per distinct value."""
+    values = np.atleast_1d(np.asarray(values))
+    if values.dtype.kind in "iu":
+        codes = np.where((values >= 0) & (values < 100), values, -1)
+        return np.where(VALID_STATE[codes], codes, -1)
+    if values.dtype.kind != "U":
+        values = values.astype(str)
+    shape, values = values.shape, values.ravel()
+    # Codes and GSTINs: read the two leading digits straight off the code points
+    prefix = np.char.ljust(np.char.lstrip(values), 2).astype("U2")
+    chars = prefix.view(np.uint32).reshape(len(prefix), 2).astype(np.int64) - 48
+    digits = ((chars >= 0) & (chars <= 9)).all(axis=1)
+    codes = np.where(digits, chars[:, 0] * 10 + chars[:, 1], -1)
+    codes = np.where(VALID_STATE[codes], codes, -1)
+    # State names: looked up once per distinct name
+    named = np.flatnonzero(~digits)
+    if len(named):
+        distinct, inverse = np.unique(values[named], return_inverse=True)
+        table = np.fromiter((state_number(value) for value in distinct.tolist()), dtype=np.int64, count=len(distinct))
+        codes[named] = table[inverse]
+    return codes.reshape(shape)
+
+
+def state_name(value):
+    return STATE_CODES.get(state_number(value), "")
+
+
+def place_of_supply(bill_to, ship_to=None):
+    """Place-of-supply state codes for goods: the bill-to state, else the ship-to state.
+
+    When goods are delivered to a third party on the recipient's
+    instructions, the place of supply is the recipient's (bill-to) state,
+    so ship-to only decides when the bill-to state is unknown.
+    """
+    codes = state_numbers(bill_to)
+    if ship_to is None:
+        return codes
+    codes, ship_codes = np.broadcast_arrays(codes, state_numbers(ship_to))
+    return np.where(codes >= 0, codes, ship_codes)
+
+
+def invoice_place_of_supply(customer_details, transportation_details=None):
+    """Place-of-supply state code for one invoice's detail dicts, -1 if nothing identifies a state.
+
+    Tries the bill-to state code, GSTIN and state name, then the same for
+    ship-to, then whatever was typed as the place of supply.
+    """
+    candidates = [customer_details.get(key) for key in ("state_code", "gstin", "state", "ship_state_code",
+                                                        "ship_gstin", "ship_state")]
+    if transportation_details:
+        candidates.append(transportation_details.get("supply_place"))
+    return next((code for code in map(state_number, candidates) if code >= 0), -1)
+
+
+def is_interstate(supplier, place):
+    """Inter-state supply flags from supplier and place-of-supply states (codes, GSTINs or names).
+
+    A supply is inter-state when the two states differ or the place of
+    supply is outside India. When either state is unknown the supply is
+    treated as intra-state, matching an invoice with no state details.
+    """
+    supplier, place = np.broadcast_arrays(state_numbers(supplier), state_numbers(place))
+    known = (supplier >= 0) & (place >= 0)
+    return known & ((supplier != place) | (place == FOREIGN_COUNTRY))
+
+
+def split_tax(gst_amount, gst_rate, interstate):
+    """IGST or CGST + SGST columns from total GST amounts and rates.
+
+    Inter-state rows put everything in IGST; intra-state rows split it in
+    half, SGST taking any odd paisa when amounts are int64 paise. Returns a
+    dict of arrays keyed by the invoice item fields.
+    """
+    amount = np.atleast_1d(np.asarray(gst_amount))
+    rate = np.atleast_1d(np.asarray(gst_rate, dtype=np.float64))
+    amount, rate, interstate = np.broadcast_arrays(amount, rate, np.atleast_1d(np.asarray(interstate, dtype=bool)))
+    half = amount // 2 if amount.dtype.kind in "iu" else amount / 2
+    zero = np.zeros_like(amount)
+    return {
+        "igst_rate": np.where(interstate, rate, 0.0),
+        "igst_amount": np.where(interstate, amount, zero),
+        "cgst_rate": np.where(interstate, 0.0, rate / 2),
+        "cgst_amount": np.where(interstate, zero, half),
+        "sgst_rate": np.where(interstate, 0.0, rate / 2),
+        "sgst_amount": np.where(interstate, zero, amount - half),
+    }
+
+
+def apply_place_of_supply(items, supplier, place):
+    """Re-split invoice lines (InvoiceLines or line dicts) for the supply's place. Returns new InvoiceLines."""
+    lines = as_invoice_lines(items)
+    if not len(lines):
+        return lines
+    amount = lines.column("cgst_amount") + lines.column("sgst_amount") + lines.column("igst_amount")
+    rate = lines.column("cgst_rate") + lines.column("sgst_rate") + lines.column("igst_rate")
+    return lines.with_columns(**split_tax(amount, rate, is_interstate(supplier, place)))
+
+
+def benchmark(rows=5_000_000):
+    rng = np.random.default_rng(2)
+    codes = np.array([f"{code:02d}" for code in STATE_CODES])
+    supplier = rng.choice(codes, rows)
+    recipient = rng.choice(codes, rows)
+    amount = rng.integers(0, 10_000_000, rows)
+    start = time.perf_counter()
+    interstate = is_interstate(supplier, recipient)
+    split_tax(amount, 18.0, interstate)
+    elapsed = time.perf_counter() - start
+    print(f"{rows:,} lines: {elapsed:.2f}s ({rows / elapsed:,.0f} lines/s), {interstate.mean():.1%} inter-state")
+
+
+if __name__ == "__main__":
+    benchmark()
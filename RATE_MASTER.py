@@ -0,0 +1,232 @@
+import os
+import pathlib
+import sqlite3
+import tempfile
+from datetime import date
+
+# Where the shared rate master lives unless GST_RATE_MASTER points elsewhere
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rate_master.sqlite3")
+
+# Map up to this much of the file; untouched pages are never read
+MMAP_SIZE = 256 * 1024 * 1024
+
+GST_START_DATE = "2017-07-01"
+
+KIND_GST = "gst"
+KIND_CUSTOMS = "customs"
+
+# Seed data used to create the master when no file exists yet
+SEED_GST_CATEGORIES = {
+    "0%": [
+        "Fresh fruits and vegetables", "Unprocessed grains", "Books and newspapers",
+        "Healthcare services", "Education services", "Public transportation services",
+        "Hotels and lodges with tariffs below a specified threshold", "Non-AC restaurants"
+    ],
+    "5%": [
+        "Household necessities", "Railways and air travel tickets below certain classes",
+        "Ayurvedic, Unani, Siddha, and Homeopathic medicines", "Apparel below certain price",
+        "Footwear below certain price", "Cream, skimmed milk powder", "Branded paneer",
+        "Frozen vegetables", "Coffee (not instant)", "Tea", "Packed curd", "Insulin",
+        "Agro-based products"
+    ],
+    "12%": [
+        "Computers and processed food items", "Mobile phones", "Spectacles and lenses",
+        "Umbrellas, sewing machines, and household appliances", "Butter, ghee, cheese",
+        "Fruit juices", "Packed coconut water", "Tooth powder", "Ayurvedic medicines"
+    ],
+    "18%": [
+        "Refrigerators and washing machines", "Telecom services", "Mineral water and beverages",
+        "Hotels with tariffs above a certain threshold", "AC restaurants", "IT services",
+        "Biscuits", "Instant coffee", "Toothpaste", "Hair oil", "Soap", "Industrial intermediaries"
+    ],
+    "28%": [
+        "Automobiles and motorcycles", "High-end motorcycles", "Consumer durables like ACs and refrigerators",
+        "Aerated drinks, tobacco products, and luxury items", "Cigarettes and cigars", "Private jets",
+        "Perfume", "Makeup", "Deodorants", "Washing machines", "Paints", "Varnishes"
+    ]
+}
+
+# Indicative customs tariff: (code, description, BCD %, IGST %, cess %). Chapter
+# (2-digit) rows cover any code in the chapter without a more specific entry.
+SEED_CUSTOMS_TARIFF = [
+    ("8703", "Vehicles", 70.0, 28.0, 3.0),
+    ("3006", "Pharmaceutical Goods", 10.0, 12.0, 3.0),
+    ("8471", "Laptop, Mobile Phones, Desktop and Personal Computers", 0.0, 18.0, 3.0),
+    ("8528", "Printers, Keyboards, USB Devices", 20.0, 18.0, 3.0),
+    ("7113", "Precious Metals", 15.0, 3.0, 3.0),
+    ("9503", "Toy Items", 70.0, 12.0, 3.0),
+    ("30", "Pharmaceutical products", 10.0, 12.0, 3.0),
+    ("71", "Precious stones, metals and jewellery", 15.0, 3.0, 3.0),
+    ("84", "Machinery and mechanical appliances", 7.5, 18.0, 3.0),
+    ("85", "Electrical machinery and equipment", 10.0, 18.0, 3.0),
+    ("87", "Vehicles other than railway", 15.0, 28.0, 3.0),
+    ("95", "Toys, games and sports requisites", 20.0, 12.0, 3.0),
+]
+
+# Bumped when the seed data changes, so masters built from an older seed are rebuilt
+SEED_VERSION = 2
+
+# (code, description) of the customs rows in the first seed, which had no duty rates and
+# was written with user_version 0. A master holding exactly that seed was created
+# automatically, not by hand, so it is rebuilt like any other outdated seed.
+_UNVERSIONED_SEED_CUSTOMS = {
+    ("8703", "Vehicles"), ("3006", "Pharmaceutical Goods"),
+    ("8471", "Laptop, Mobile Phones, Desktop and Personal Computers"),
+    ("8528", "Printers, Keyboards, USB Devices"), ("7113", "Precious Metals"), ("9503", "Toy Items"),
+}
+
+RATE_COLUMNS = ("code", "description", "kind", "gst_rate", "bcd_rate", "cess_rate", "effective_from", "effective_to")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rates (
+    code TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    gst_rate REAL,
+    bcd_rate REAL,
+    cess_rate REAL,
+    effective_from TEXT NOT NULL,
+    effective_to TEXT
+);
+CREATE INDEX IF NOT EXISTS rates_code ON rates (code, effective_from);
+CREATE INDEX IF NOT EXISTS rates_description ON rates (description COLLATE NOCASE, effective_from);
+"""
+
+
+def seed_records():
+    """Rate records for the built-in GST categories and customs HS codes."""
+    records = []
+    for gst_rate, categories in SEED_GST_CATEGORIES.items():
+        for category in categories:
+            records.append({"code": "", "description": category, "kind": KIND_GST,
+                            "gst_rate": float(gst_rate.rstrip("%")), "effective_from": GST_START_DATE})
+    for hs_code, description, bcd_rate, igst_rate, cess_rate in SEED_CUSTOMS_TARIFF:
+        records.append({"code": hs_code, "description": description, "kind": KIND_CUSTOMS,
+                        "gst_rate": igst_rate, "bcd_rate": bcd_rate, "cess_rate": cess_rate,
+                        "effective_from": GST_START_DATE})
+    return records
+
+
+def build_rate_master(path, records, version=0):
+    """Write `records` (dicts keyed by RATE_COLUMNS) to a new rate master file.
+
+    The file is built beside `path` and renamed into place, so processes
+    that already have the old file open keep a consistent view. `version`
+    is stored as the file's user_version; 0 marks a hand-built master.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(suffix=".sqlite3", dir=directory)
+    os.close(fd)
+    try:
+        conn = sqlite3.connect(tmp_path)
+        with conn:
+            conn.executescript(SCHEMA)
+            conn.executemany(
+                f"INSERT INTO rates ({', '.join(RATE_COLUMNS)}) VALUES ({', '.join('?' * len(RATE_COLUMNS))})",
+                (tuple(record.get(column) for column in RATE_COLUMNS) for record in records))
+            conn.execute("ANALYZE")
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+        conn.execute("VACUUM")
+        conn.close()
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def _is_unversioned_seed(conn):
+    """Whether a version-0 master is the first auto-created seed rather than a hand-built master."""
+    customs = conn.execute("SELECT code, description, gst_rate, bcd_rate, cess_rate FROM rates WHERE kind = ?",
+                           (KIND_CUSTOMS,)).fetchall()
+    gst_rows = conn.execute("SELECT COUNT(*) FROM rates WHERE kind = ?", (KIND_GST,)).fetchone()[0]
+    return (len(customs) == len(_UNVERSIONED_SEED_CUSTOMS)
+            and {(code, description) for code, description, *_ in customs} == _UNVERSIONED_SEED_CUSTOMS
+            and all(row[2:] == (None, None, None) for row in customs)
+            and gst_rows == sum(len(categories) for categories in SEED_GST_CATEGORIES.values()))
+
+
+def _open_read_only(path):
+    # as_uri quotes "?", "#", "%" and spaces, which would otherwise be read as URI syntax
+    return sqlite3.connect(pathlib.Path(path).resolve().as_uri() + "?mode=ro", uri=True)
+
+
+def _as_of(on_date):
+    if on_date is None:
+        return date.today().isoformat()
+    return on_date.isoformat() if isinstance(on_date, date) else str(on_date)
+
+
+class RateMaster:
+    """Read-only view of the HSN/SAC rate master.
+
+    The SQLite file is opened read-only and memory-mapped, so opening is
+    instant, only the index and table pages a lookup touches are read, and
+    every process on the host shares the same page cache. All lookups take
+    an optional effective date (date or "YYYY-MM-DD", default today).
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.environ.get("GST_RATE_MASTER") or DEFAULT_PATH
+        if not os.path.exists(self.path):
+            build_rate_master(self.path, seed_records(), SEED_VERSION)
+        self.conn = _open_read_only(self.path)
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if 0 < version < SEED_VERSION or (version == 0 and _is_unversioned_seed(self.conn)):
+            # Built from an older seed; masters built by hand (version 0, other rows) are left alone
+            self.conn.close()
+            build_rate_master(self.path, seed_records(), SEED_VERSION)
+            self.conn = _open_read_only(self.path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+
+    def close(self):
+        self.conn.close()
+
+    def _query(self, where, params, on_date, limit=None, order="effective_from DESC, rowid"):
+        sql = (f"SELECT {', '.join(RATE_COLUMNS)} FROM rates WHERE {where} "
+               f"AND effective_from <= ? AND (effective_to IS NULL OR effective_to > ?) ORDER BY {order}")
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        as_of = _as_of(on_date)
+        return [dict(row) for row in self.conn.execute(sql, (*params, as_of, as_of))]
+
+    def lookup_code(self, code, on_date=None):
+        """The rate record in force for an exact HSN/SAC/tariff code, or None."""
+        rows = self._query("code = ?", (str(code),), on_date, limit=1)
+        return rows[0] if rows else None
+
+    def lookup_description(self, description, on_date=None):
+        """The rate record in force for a description (case-insensitive), or None."""
+        rows = self._query("description = ? COLLATE NOCASE", (description,), on_date, limit=1)
+        return rows[0] if rows else None
+
+    def search_descriptions(self, term, on_date=None, limit=50):
+        return self._query("description LIKE ?", (f"%{term}%",), on_date, limit=limit)
+
+    def records(self, kind=None, on_date=None):
+        """Every record in force on the date, in catalog order."""
+        if kind is None:
+            return self._query("1 = 1", (), on_date, order="rowid")
+        return self._query("kind = ?", (kind,), on_date, order="rowid")
+
+    def gst_categories(self, on_date=None):
+        """{"18%": [category, ...]} for the domestic GST catalog, lowest rate first."""
+        categories = {}
+        for record in sorted(self.records(KIND_GST, on_date), key=lambda r: r["gst_rate"]):
+            categories.setdefault(f"{record['gst_rate']:g}%", []).append(record["description"])
+        return categories
+
+    def hs_codes(self, on_date=None):
+        """{description: code} for the customs tariff entries."""
+        return {record["description"]: record["code"] for record in self.records(KIND_CUSTOMS, on_date)}
+
+
+_default_master = None
+
+
+def default_rate_master():
+    """Process-wide RateMaster, opened on first use."""
+    global _default_master
+    if _default_master is None:
+        _default_master = RateMaster()
+    return _default_master
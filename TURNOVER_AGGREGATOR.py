@@ -0,0 +1,306 @@
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+from datetime import date
+
+import numpy as np
+
+from FIXED_POINT import to_paise, from_paise
+
+# Invoice columns: supplier GSTIN, invoice date (YYYY-MM-DD or DD-MM-YYYY) and taxable value in rupees
+GSTIN_COLUMN = "gstin"
+DATE_COLUMN = "invoice_date"
+VALUE_COLUMN = "taxable_value"
+
+# Where running totals are kept unless a path is given or GST_TURNOVER_STATE points elsewhere
+DEFAULT_STATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "turnover_state.json")
+
+DEFAULT_CHUNK_BYTES = 2 * 1024 * 1024
+# Save the running totals after roughly this much input, and at the end
+SAVE_EVERY_BYTES = 64 * 1024 * 1024
+
+
+def financial_year(on_date):
+    """Starting year of the Indian financial year (April-March) containing a date."""
+    if isinstance(on_date, str):
+        on_date = date.fromisoformat(on_date)
+    return on_date.year if on_date.month >= 4 else on_date.year - 1
+
+
+def _digits(chars, start, stop):
+    """Integer value of character columns [start, stop) of a (n, width) uint32 code-point array."""
+    value = np.zeros(len(chars), dtype=np.int64)
+    for column in range(start, stop):
+        value = value * 10 + (chars[:, column].astype(np.int64) - 48)
+    return value
+
+
+def pans_and_years(gstins, dates):
+    """PAN (GSTIN characters 3-12) and financial year per invoice, vectorized.
+
+    Returns (pans, years, valid); rows with a malformed GSTIN or date are
+    marked invalid.
+    """
+    gstins = np.char.upper(np.char.strip(np.asarray(gstins, dtype=str)))
+    # Measured before narrowing to 15 characters, which would silently cut a longer value down to a valid one
+    gstin_ok = np.char.str_len(gstins) == 15
+    gstins = gstins.astype("U15")
+    dates = np.char.strip(np.asarray(dates, dtype="U10"))
+    # Fixed-width unicode arrays viewed as code points, so slicing is a plain array slice
+    gstin_chars = gstins.view(np.uint32).reshape(len(gstins), 15)
+    date_chars = dates.view(np.uint32).reshape(len(dates), 10)
+    pans = np.ascontiguousarray(gstin_chars[:, 2:12]).view("U10").ravel()
+
+    iso = date_chars[:, 4] == ord("-")
+    year = np.where(iso, _digits(date_chars, 0, 4), _digits(date_chars, 6, 10))
+    month = np.where(iso, _digits(date_chars, 5, 7), _digits(date_chars, 3, 5))
+    years = np.where(month >= 4, year, year - 1)
+
+    digits = (date_chars >= ord("0")) & (date_chars <= ord("9"))
+    date_ok = np.where(iso, digits[:, [0, 1, 2, 3, 5, 6, 8, 9]].all(axis=1),
+                       digits[:, [0, 1, 3, 4, 6, 7, 8, 9]].all(axis=1) & np.isin(date_chars[:, 2], (45, 47)))
+    valid = gstin_ok & date_ok & (month >= 1) & (month <= 12)
+    return pans, years, valid
+
+
+def _unfinished_record(lines):
+    """Index of the first line of a trailing record that is not finished yet, or len(lines).
+
+    A record is unfinished when a quoted field is still open at the end or
+    its last line has no newline, as happens while the file is written.
+    """
+    start = 0
+    quotes = 0
+    for index, line in enumerate(lines):
+        if quotes % 2 == 0:
+            start = index
+        quotes += line.count(b'"')
+    if lines and (quotes % 2 or not lines[-1].endswith(b"\n")):
+        return start
+    return len(lines)
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except ValueError:
+        return np.nan
+
+
+class TurnoverAggregator:
+    """Running aggregate turnover per PAN and financial year.
+
+    Invoices are folded in a chunk at a time: PANs and financial years are
+    extracted with array slicing, and each chunk is reduced to one sum per
+    (PAN, year) before touching the running totals, so memory depends on
+    the number of PANs, not the number of invoices. For each input file the
+    aggregator remembers the byte offset it has consumed, so calling
+    update_from_file again on a growing file reads only the new invoices.
+    Totals and offsets are saved together to a JSON state file.
+    """
+
+    def __init__(self, state_path=None):
+        self.state_path = state_path or os.environ.get("GST_TURNOVER_STATE") or DEFAULT_STATE_PATH
+        # pan -> {financial year (str): paise}
+        self.totals = {}
+        # absolute input path -> {"offset": bytes consumed, "columns": [...], "delimiter": ...}
+        self.files = {}
+        self.rows = 0
+        self.rejected = 0
+        if os.path.exists(self.state_path):
+            with open(self.state_path, "r") as f:
+                state = json.load(f)
+            self.totals = state["totals"]
+            self.files = state["files"]
+            self.rows = state.get("rows", 0)
+            self.rejected = state.get("rejected", 0)
+
+    def save(self):
+        # Write-then-rename so a crash never leaves a half-written state file behind
+        state = {"totals": self.totals, "files": self.files, "rows": self.rows, "rejected": self.rejected}
+        with open(self.state_path + ".tmp", "w") as f:
+            json.dump(state, f)
+        os.replace(self.state_path + ".tmp", self.state_path)
+
+    def add(self, gstins, dates, taxable_values):
+        """Fold a batch of invoices into the running totals. Returns the number rejected."""
+        pans, years, valid = pans_and_years(gstins, dates)
+        values = np.asarray(taxable_values, dtype=np.float64)
+        valid &= np.isfinite(values)
+        paise = to_paise(np.where(valid, values, 0))
+        pans, years, paise = pans[valid], years[valid], paise[valid]
+
+        distinct_pans, pan_index = np.unique(pans, return_inverse=True)
+        keys = pan_index.astype(np.int64) * 10_000 + years
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.empty(0, dtype=np.int64)
+        sums = np.add.reduceat(paise[order], starts) if len(keys) else paise[:0]
+
+        group_keys = keys[starts]
+        group_pans = distinct_pans[group_keys // 10_000].tolist()
+        group_years = (group_keys % 10_000).astype(str).tolist()
+        totals = self.totals
+        for pan, year, total in zip(group_pans, group_years, sums.tolist()):
+            per_year = totals.get(pan)
+            if per_year is None:
+                per_year = totals[pan] = {}
+            per_year[year] = per_year.get(year, 0) + total
+
+        rejected = int(len(valid) - np.count_nonzero(valid))
+        self.rows += int(np.count_nonzero(valid))
+        self.rejected += rejected
+        return rejected
+
+    def _parse_chunk(self, data, delimiter, indexes):
+        # Parsed as one stream, so a quoted field spanning lines stays one row; blank lines are not rows
+        rows = [row for row in csv.reader(io.StringIO(data.decode("utf-8")), delimiter=delimiter)
+                if row and (len(row) > 1 or row[0].strip())]
+        width = max(indexes) + 1
+        parsed = len(rows)
+        rows = [row for row in rows if len(row) >= width]
+        gstin_idx, date_idx, value_idx = indexes
+        values = [row[value_idx] for row in rows]
+        try:
+            values = np.array(values, dtype=np.float64)
+        except ValueError:
+            # Some value doesn't parse; mark just those rows for rejection
+            values = np.array([_to_float(value) for value in values], dtype=np.float64)
+        skipped = parsed - len(rows)
+        return [row[gstin_idx] for row in rows], [row[date_idx] for row in rows], values, skipped
+
+    def update_from_file(self, path, delimiter=None, chunk_bytes=DEFAULT_CHUNK_BYTES, save=True, complete=True):
+        """Fold the invoices appended to `path` since the last call into the totals.
+
+        Chunks are only cut between records, so quoted fields may span
+        lines. With `complete` the file is taken as finished and a last
+        line without a newline is read too. For a file that is still being
+        written, pass complete=False: an unfinished last record is left
+        for the next call. Returns the number of rows read.
+        """
+        key = os.path.abspath(path)
+        entry = self.files.get(key)
+        rows_before = self.rows + self.rejected
+        with open(path, "rb") as src:
+            if entry is None:
+                header_line = src.readline()
+                delimiter = delimiter or ("\t" if path.lower().endswith((".tsv", ".tab")) else ",")
+                header = next(csv.reader([header_line.decode("utf-8-sig").rstrip("\r\n")], delimiter=delimiter))
+                entry = {"offset": src.tell(), "columns": [name.strip().lower() for name in header],
+                         "delimiter": delimiter}
+            names = entry["columns"]
+            try:
+                indexes = (names.index(GSTIN_COLUMN), names.index(DATE_COLUMN), names.index(VALUE_COLUMN))
+            except ValueError:
+                raise ValueError(f"Input must have '{GSTIN_COLUMN}', '{DATE_COLUMN}' and '{VALUE_COLUMN}' "
+                                 f"columns, got {names}")
+            self.files[key] = entry
+
+            src.seek(entry["offset"])
+            unsaved = 0
+            while True:
+                lines = src.readlines(chunk_bytes)
+                # Never cut inside a quoted field that spans lines: read on until the quotes balance
+                quotes = sum(line.count(b'"') for line in lines)
+                while quotes % 2:
+                    line = src.readline()
+                    if not line:
+                        break
+                    lines.append(line)
+                    quotes += line.count(b'"')
+                if not complete:
+                    # The file is still being written; leave its unfinished last record for next time
+                    del lines[_unfinished_record(lines):]
+                if not lines:
+                    break
+                data = b"".join(lines)
+                gstins, dates, values, skipped = self._parse_chunk(data, entry["delimiter"], indexes)
+                self.rejected += skipped
+                self.add(gstins, dates, values)
+                entry["offset"] += len(data)
+                unsaved += len(data)
+                if save and unsaved >= SAVE_EVERY_BYTES:
+                    self.save()
+                    unsaved = 0
+        if save:
+            self.save()
+        return self.rows + self.rejected - rows_before
+
+    def turnover(self, pan, year):
+        """Aggregate turnover in paise for a PAN (or a GSTIN) in the financial year starting `year`."""
+        pan = pan[2:12] if len(pan) == 15 else pan
+        return self.totals.get(pan.upper(), {}).get(str(year), 0)
+
+    def turnover_column(self, gstins, years):
+        """Aggregate turnover in rupees per GSTIN or PAN, for a column of financial years."""
+        years = np.broadcast_to(np.asarray(years), (len(gstins),)).tolist()
+        return from_paise(np.array([self.turnover(str(g), y) for g, y in zip(gstins, years)], dtype=np.int64))
+
+    def preceding_year_turnover(self, gstins, on_date=None):
+        """Turnover of the financial year before `on_date` (default today), as used for eligibility."""
+        return self.turnover_column(gstins, financial_year(on_date or date.today()) - 1)
+
+
+def benchmark(rows=2_000_000, pans=50_000, path=None):
+    import tempfile
+
+    directory = tempfile.mkdtemp()
+    path = path or os.path.join(directory, "invoices.csv")
+    rng = np.random.default_rng(6)
+    # Ten-character PANs for up to 260,000 distinct ids: a letter for each 10,000, then four digits
+    pan_ids = [f"AAAP{65 + i // 10_000:c}{i % 10_000:04d}A" for i in range(pans)]
+    with open(path, "w") as f:
+        f.write("gstin,invoice_date,taxable_value\n")
+        for start in range(0, rows, 100_000):
+            n = min(100_000, rows - start)
+            states = rng.integers(1, 38, n)
+            picks = rng.integers(0, pans, n)
+            days = rng.integers(0, 3 * 365, n)
+            values = np.round(rng.uniform(100, 100_000, n), 2)
+            f.writelines(f"{s:02d}{pan_ids[p]}1Z5,{np.datetime64('2021-04-01') + d},{v}\n"
+                         for s, p, d, v in zip(states.tolist(), picks.tolist(), days.tolist(), values.tolist()))
+
+    aggregator = TurnoverAggregator(os.path.join(directory, "state.json"))
+    start = time.perf_counter()
+    aggregator.update_from_file(path)
+    elapsed = time.perf_counter() - start
+    print(f"{rows:,} invoices ({os.path.getsize(path) / 1e6:.0f} MB) aggregated in {elapsed:.1f}s "
+          f"({rows / elapsed:,.0f} rows/s) into {len(aggregator.totals):,} PANs")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fold invoice files into running per-PAN, per-financial-year "
+                                                 "aggregate turnover.")
+    parser.add_argument("inputs", nargs="+", help="CSV/TSV files with gstin, invoice_date and taxable_value columns; "
+                                                  "files seen before are read from where the last run stopped")
+    parser.add_argument("--state", help="state file with the running totals "
+                                          "(default: $GST_TURNOVER_STATE or turnover_state.json)")
+    parser.add_argument("--delimiter", help="field delimiter (default: tab for .tsv, comma otherwise)")
+    parser.add_argument("--still-writing", action="store_true",
+                        help="the inputs are still being written: leave an unfinished last line for the next run")
+    parser.add_argument("--show", metavar="PAN", action="append", default=[], help="print the totals for a PAN or GSTIN")
+    args = parser.parse_args(argv)
+
+    aggregator = TurnoverAggregator(args.state)
+    try:
+        for path in args.inputs:
+            started = time.perf_counter()
+            count = aggregator.update_from_file(path, args.delimiter, complete=not args.still_writing)
+            print(f"{path}: {count:,} new rows in {time.perf_counter() - started:.1f}s")
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(f"{len(aggregator.totals):,} PANs, {aggregator.rows:,} invoices, {aggregator.rejected:,} rejected")
+    for pan in args.show:
+        pan = pan[2:12] if len(pan) == 15 else pan
+        for year, paise in sorted(aggregator.totals.get(pan.upper(), {}).items()):
+            print(f"  {pan.upper()} FY {year}-{(int(year) + 1) % 100:02d}: {paise / 100:,.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+# The modules are flat scripts at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def isolated_files(tmp_path, monkeypatch):
+    """Keep the rate master, invoice store, render cache and turnover state of every test in its own directory."""
+    monkeypatch.setenv("GST_RATE_MASTER", str(tmp_path / "rate_master.sqlite3"))
+    monkeypatch.setenv("GST_INVOICE_STORE", str(tmp_path / "invoices.sqlite3"))
+    monkeypatch.setenv("GST_RENDER_CACHE", str(tmp_path / "render_cache"))
+    monkeypatch.setenv("GST_TURNOVER_STATE", str(tmp_path / "turnover_state.json"))
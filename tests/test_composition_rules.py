@@ -0,0 +1,13 @@
+from COMPOSITION_RULES import CompiledRules
+
+VERSION = {"effective_from": "2019-04-01", "turnover_limits": {"normal": 15_000_000, "special": 7_500_000},
+           "special_category_states": ["11", "14"], "eligible_business_types": ["Manufacturer"],
+           "eligible_registrations": ["Regular"], "already_composition": ["No"]}
+
+
+def test_state_codes_gstins_and_names_read_alike():
+    rules = CompiledRules([VERSION])
+    states = ["11", 11, "11AAAPA0001A1Z5", "Sikkim", "27", "99", "", "Nowhere"]
+    limits = rules.turnover_limit([0] * len(states), states)
+    assert limits.tolist() == [7_500_000] * 4 + [15_000_000] * 4
+    assert rules.turnover_limit([0, 0]).tolist() == [15_000_000, 15_000_000]
@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from CUSTOMS_ENGINE import amount_column, calculate_bill_of_entry, read_columns
+
+
+def test_read_columns_rejects_ragged_rows(tmp_path):
+    source = tmp_path / "lines.csv"
+    source.write_text('bill_no,value,hs_code\n1,100,8471\n\n2,"2,000"\n3,300,8471\n', encoding="utf-8")
+    with pytest.raises(ValueError, match="line 4 has 2 fields, expected 3"):
+        read_columns(str(source))
+
+
+def test_read_columns_keeps_quoted_fields(tmp_path):
+    source = tmp_path / "lines.csv"
+    source.write_text('bill_no,description,value\n1,"Laptop, 14""",100\n2,"two\nlines",200\n', encoding="utf-8")
+    columns = read_columns(str(source))
+    assert columns["description"].tolist() == ['Laptop, 14"', "two\nlines"]
+    assert columns["value"].tolist() == ["100", "200"]
+
+
+def test_blank_optional_amount_is_zero_and_blank_value_raises():
+    np.testing.assert_array_equal(amount_column(np.array(["10", " ", ""]), 3), [10.0, 0.0, 0.0])
+    with pytest.raises(ValueError, match="no value"):
+        calculate_bill_of_entry({"value": np.array(["100", ""]), "bcd_rate": np.array(["10", "10"]),
+                                 "igst_rate": np.array(["18", "18"]), "cess_rate": np.array(["0", "0"])})
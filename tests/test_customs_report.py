@@ -0,0 +1,56 @@
+import io
+import re
+
+import numpy as np
+import pytest
+from pypdf import PdfReader
+
+import CUSTOMS_REPORT
+from CUSTOMS_ENGINE import bill_rollups, calculate_customs_batch
+from CUSTOMS_REPORT import write_customs_report
+
+
+def computed(lines=600):
+    columns = {"bill_no": np.array([f"BE{i // 50:03d}" for i in range(lines)]),
+               "hs_code": np.full(lines, "84713010")}
+    duties = calculate_customs_batch(np.full(lines, 1000.0), 0.0, 0.0, 7.5, 18.0, 3.0)
+    return columns, duties, bill_rollups(columns["bill_no"], duties)
+
+
+def test_report_to_a_path_reads_back(tmp_path):
+    output = tmp_path / "report.pdf"
+    stats = write_customs_report(str(output), *computed())
+    reader = PdfReader(str(output))
+    assert len(reader.pages) == stats["pages"] > 1
+    assert "Bill Summary" in reader.pages[-1].extract_text()
+    assert not (tmp_path / "report.pdf.tmp").exists()
+
+
+def test_xref_offsets_are_absolute_in_a_file_that_does_not_start_at_zero():
+    buffer = io.BytesIO()
+    buffer.write(b"preamble written by someone else\n")
+    start = buffer.tell()
+    write_customs_report(buffer, *computed(50))
+    data = buffer.getvalue()
+    assert data[start:start + 5] == b"%PDF-"
+    xref = int(re.search(rb"startxref\n(\d+)\n", data).group(1))
+    assert data[xref:xref + 4] == b"xref"
+    offsets = [int(entry[:10]) for entry in re.findall(rb"\d{10} 00000 n", data)]
+    assert all(data[offset:].startswith(b"%d 0 obj" % obj_id) for obj_id, offset in enumerate(offsets, start=1))
+
+
+def test_a_failure_part_way_leaves_the_existing_file_alone(tmp_path, monkeypatch):
+    output = tmp_path / "report.pdf"
+    output.write_bytes(b"previous report")
+
+    def failing_rows(columns, duties):
+        # Enough rows for several pages to reach the file before the failure
+        for _ in range(500):
+            yield ("BE001", "84713010", "1000.00", "75.00", "193.50", "32.25", "300.75")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(CUSTOMS_REPORT, "line_rows", failing_rows)
+    with pytest.raises(OSError, match="disk full"):
+        write_customs_report(str(output), *computed())
+    assert output.read_bytes() == b"previous report"
+    assert not (tmp_path / "report.pdf.tmp").exists()
@@ -0,0 +1,68 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from CUSTOMS_SCENARIOS import main, scenario_grid, sweep_scenarios
+from FIXED_POINT import (ROUND_DOWN, ROUND_HALF_EVEN, ROUND_HALF_UP, calculate_customs_duty_paise, to_basis_points,
+                         to_paise)
+
+
+def portfolio(shipments, seed=5):
+    rng = np.random.default_rng(seed)
+    values = np.round(rng.uniform(-5_000, 2_000_000, shipments), 2)
+    base = [rng.choice([0, 7.5, 10], shipments), rng.choice([12, 18], shipments), rng.choice([0, 3], shipments)]
+    return values, np.round(values * 0.02, 2), np.round(values * 0.005, 2), base
+
+
+@pytest.mark.parametrize("rounding", [ROUND_DOWN, ROUND_HALF_EVEN, ROUND_HALF_UP])
+@pytest.mark.parametrize("relative", [False, True])
+def test_sweep_matches_the_duty_formula(rounding, relative):
+    values, shipping, insurance, base = portfolio(2_000)
+    grid = scenario_grid([0, 5, 7.5, 12.345], [5, 18, 28.01], [0, 1.5])
+    matrices = []
+    stats = sweep_scenarios(values, shipping, insurance, *grid, base_rates=base if relative else None,
+                            memory_budget_mb=0.3, rounding=rounding,
+                            on_chunk=lambda start, duty: matrices.append(duty.copy()))
+
+    scenario_bp = np.stack([to_basis_points(rates) for rates in grid])
+    if relative:
+        bcd, igst, cess = np.maximum(np.stack([to_basis_points(r) for r in base])[:, :, None]
+                                     + scenario_bp[:, None, :], 0)
+    else:
+        bcd, igst, cess = scenario_bp[:, None, :]
+    expected = calculate_customs_duty_paise(to_paise(values)[:, None], to_paise(shipping)[:, None],
+                                            to_paise(insurance)[:, None], bcd, igst, cess, rounding)["total_duty"]
+    expected = np.broadcast_to(expected, (len(values), len(grid[0])))
+    assert len(matrices) > 1
+    np.testing.assert_array_equal(np.vstack(matrices), expected)
+    np.testing.assert_array_equal(stats["total_duty"], expected.sum(axis=0))
+    np.testing.assert_array_equal(stats["min_duty"], expected.min(axis=0))
+
+
+@pytest.mark.parametrize("relative", [False, True])
+def test_sweep_stays_within_memory_budget(relative):
+    values, shipping, insurance, base = portfolio(200_000)
+    grid = scenario_grid([0, 5, 7.5, 10, 15, 20], [5, 12, 18, 28], [0, 1, 3])
+    tracemalloc.start()
+    try:
+        sweep_scenarios(values, shipping, insurance, *grid, base_rates=base if relative else None,
+                        memory_budget_mb=64)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak <= 64 * 1024 * 1024
+
+
+def test_budget_too_small_raises():
+    values, shipping, insurance, _ = portfolio(10_000)
+    with pytest.raises(ValueError, match="too small"):
+        sweep_scenarios(values, shipping, insurance, *scenario_grid([0, 5], [18], [0]), memory_budget_mb=0.1)
+
+
+def test_relative_sweep_rejects_unresolved_codes(tmp_path, capsys):
+    source = tmp_path / "portfolio.csv"
+    source.write_text("value,hs_code\n1000,8471\n2000,0000\n", encoding="utf-8")
+    assert main([str(source), str(tmp_path / "out.csv"), "--relative", "--bcd", "0,5"]) == 1
+    assert "no tariff rate" in capsys.readouterr().err
+    assert not (tmp_path / "out.csv").exists()
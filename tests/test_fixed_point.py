@@ -0,0 +1,40 @@
+from decimal import Decimal, ROUND_DOWN as DECIMAL_DOWN, ROUND_HALF_EVEN as DECIMAL_HALF_EVEN, \
+    ROUND_HALF_UP as DECIMAL_HALF_UP
+
+import numpy as np
+import pytest
+
+from FIXED_POINT import (ROUND_DOWN, ROUND_HALF_EVEN, ROUND_HALF_UP, apply_rate, calculate_gst_paise,
+                         divide_rounded, format_paise, round_to_rupee)
+
+DECIMAL_RULES = {ROUND_HALF_UP: DECIMAL_HALF_UP, ROUND_HALF_EVEN: DECIMAL_HALF_EVEN, ROUND_DOWN: DECIMAL_DOWN}
+
+
+@pytest.mark.parametrize("rounding", list(DECIMAL_RULES))
+@pytest.mark.parametrize("denominator", [2, 10, 100, 10_000])
+def test_divide_rounded_matches_decimal_for_negative_and_positive_values(rounding, denominator):
+    numerators = np.arange(-3 * denominator, 3 * denominator + 1, max(1, denominator // 40))
+    expected = [int((Decimal(int(n)) / denominator).quantize(Decimal(1), rounding=DECIMAL_RULES[rounding]))
+                for n in numerators]
+    assert divide_rounded(numerators, denominator, rounding).tolist() == expected
+
+
+def test_negative_ties_round_away_from_zero_half_up_and_to_even_half_even():
+    ties = [-35, -25, -15, -5, 5, 15, 25, 35]
+    assert divide_rounded(ties, 10, ROUND_HALF_UP).tolist() == [-4, -3, -2, -1, 1, 2, 3, 4]
+    assert divide_rounded(ties, 10, ROUND_HALF_EVEN).tolist() == [-4, -2, -2, 0, 0, 2, 2, 4]
+    assert divide_rounded(ties, 10, ROUND_DOWN).tolist() == [-3, -2, -1, 0, 0, 1, 2, 3]
+
+
+def test_reversals_mirror_their_postings():
+    amounts = np.array([1, 50, 12_345, 99_999])
+    for rounding in DECIMAL_RULES:
+        assert (apply_rate(-amounts, 1800, rounding) == -apply_rate(amounts, 1800, rounding)).all()
+        assert (round_to_rupee(-amounts, rounding) == -round_to_rupee(amounts, rounding)).all()
+    credit_note = calculate_gst_paise(-10_050, 1800)
+    assert credit_note["gst_amount"].tolist() == [-1809]
+    assert credit_note["cgst_amount"] + credit_note["sgst_amount"] == credit_note["gst_amount"]
+
+
+def test_format_paise_keeps_the_sign_of_amounts_under_a_rupee():
+    assert [format_paise(p) for p in (-5, -100, -12_345, 0, 7)] == ["-0.05", "-1.00", "-123.45", "0.00", "0.07"]
@@ -0,0 +1,44 @@
+import pytest
+
+from GST_LEDGER import GSTLedger, KIND_CREDIT, KIND_LIABILITY
+
+
+def test_reopening_replays_the_log_and_keeps_references(tmp_path):
+    path = str(tmp_path / "ledger.jsonl")
+    ledger = GSTLedger(path, snapshot_every=2)
+    ledger.post("27AAPFU0939F1ZV", KIND_CREDIT, "IGST", 500, "purchase")
+    ledger.post("27AAPFU0939F1ZV", KIND_LIABILITY, "IGST", 800, "GSTR-3B 2024-04")
+    ledger.post("27AAPFU0939F1ZV", KIND_LIABILITY, "CGST", 100, "GSTR-3B 2024-04")
+    ledger._file.close()  # no closing snapshot: the last posting is only in the log
+
+    reopened = GSTLedger(path)
+    assert reopened.balance("27AAPFU0939F1ZV")["liability"] == [800, 100, 0]
+    assert reopened.has_reference("27AAPFU0939F1ZV", "GSTR-3B 2024-04")
+    assert reopened.position("27AAPFU0939F1ZV")["cash_payable"].tolist() == [[300, 100, 0]]
+    reopened.close()
+
+
+def test_a_corrupt_complete_line_raises_value_error_naming_its_offset(tmp_path):
+    path = tmp_path / "ledger.jsonl"
+    ledger = GSTLedger(str(path))
+    ledger.post("27AAPFU0939F1ZV", KIND_CREDIT, "IGST", 500)
+    ledger._file.close()
+    offset = path.stat().st_size
+    with open(path, "ab") as f:
+        f.write(b'{"seq": 2, "gstin": \n')
+    with pytest.raises(ValueError, match=f"byte offset {offset} is corrupt"):
+        GSTLedger(str(path))
+    # Nothing was truncated: the damage is left for someone to look at
+    assert path.stat().st_size == offset + 21
+
+
+def test_an_interrupted_last_write_is_dropped(tmp_path):
+    path = tmp_path / "ledger.jsonl"
+    ledger = GSTLedger(str(path))
+    ledger.post("27AAPFU0939F1ZV", KIND_CREDIT, "IGST", 500)
+    ledger._file.close()
+    with open(path, "ab") as f:
+        f.write(b'{"seq": 2, "gst')
+    reopened = GSTLedger(str(path))
+    assert reopened.balance("27AAPFU0939F1ZV")["credit"] == [500, 0, 0]
+    reopened.close()
@@ -0,0 +1,34 @@
+import csv
+
+from GST_PIPELINE import stream_gst_file
+
+
+def test_quoted_fields_spanning_lines_survive_chunking(tmp_path):
+    source = tmp_path / "items.csv"
+    rows = [["description", "price", "gst_rate"]]
+    for i in range(200):
+        description = f"Item {i}\nsecond line, with comma" if i % 7 == 0 else f'Item "{i}"'
+        rows.append([description, f"{100 + i}", "18"])
+    with open(source, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerows(rows)
+
+    output = tmp_path / "priced.csv"
+    stats = stream_gst_file(str(source), str(output), chunk_bytes=64, log=None)
+    assert stats["rows"] == 200 and stats["rejected"] == 0
+
+    with open(output, newline="", encoding="utf-8") as f:
+        priced = list(csv.reader(f))
+    assert [row[0] for row in priced[1:]] == [row[0] for row in rows[1:]]
+    assert all(len(row) == len(priced[0]) for row in priced)
+    assert not (tmp_path / "priced.csv.checkpoint").exists()
+
+
+def test_unquoted_input_prices_every_row(tmp_path):
+    source = tmp_path / "items.tsv"
+    source.write_text("price\tgst_rate\tgst_type\n100\t18%\texclusive\n118\t18\tinclusive\n", encoding="utf-8")
+    output = tmp_path / "priced.tsv"
+    stream_gst_file(str(source), str(output), log=None)
+    header, exclusive, inclusive = [line.split("\t") for line in output.read_text(encoding="utf-8").splitlines()]
+    gst = header.index("gst_amount")
+    assert len(exclusive) == len(header) == len(inclusive)
+    assert exclusive[gst] == "18.00" and inclusive[gst] == "18.00"
@@ -0,0 +1,129 @@
+import csv
+
+import pytest
+
+from GST_LEDGER import GSTLedger
+from GST_RETURNS import ReturnAggregator, describe_3b, main
+
+SUPPLIER = "27AAPFU0939F1ZV"
+CUSTOMER = "29AAGCB7383J1Z4"
+HEADER = ["supplier_gstin", "customer_gstin", "place_of_supply", "hsn", "unit", "qty", "gst_rate",
+          "taxable_value", "igst_amount", "cgst_amount", "sgst_amount", "description"]
+
+
+def _write_lines(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        writer.writerows(rows)
+
+
+def test_totals_match_hand_computed_figures():
+    aggregator = ReturnAggregator()
+    aggregator.add({
+        "supplier_gstin": [SUPPLIER, SUPPLIER, SUPPLIER, SUPPLIER],
+        "customer_gstin": [CUSTOMER, "", "", CUSTOMER],
+        "place_of_supply": ["", "27", "07", ""],
+        "hsn": ["8471", "8471", "8471", "0401"],
+        "gst_rate": [18, 18, 18, 0],
+        "taxable_value": [1000.00, 250.50, 100.00, 40.00],
+        "igst_amount": [180.00, 0, 18.00, 0],
+        "cgst_amount": [0, 22.55, 0, 0],
+        "sgst_amount": [0, 22.55, 0, 0],
+    })
+    table = aggregator.gstr3b(SUPPLIER)
+    # 1000.00 + 250.50 + 100.00 is taxable at 18%; the 0% line is nil rated
+    assert table["3.1(a)"] == {"taxable_value": 135050, "igst": 19800, "cgst": 2255, "sgst": 2255, "cess": 0}
+    assert table["3.1(b)"] == {"taxable_value": 0, "igst": 0, "cess": 0}
+    assert table["3.1(c)"] == {"taxable_value": 4000}
+    # Only the unregistered sale delivered to Delhi is inter-state B2C
+    assert table["3.2"] == [{"place_of_supply": "07", "taxable_value": 10000, "igst": 1800}]
+    assert table["liability"].tolist() == [19800, 2255, 2255]
+
+    hsn = aggregator.hsn_summary()
+    b2b_8471 = [i for i, (kind, code) in enumerate(zip(hsn["supply_type"], hsn["hsn"]))
+                if kind == "B2B" and code == "8471"]
+    assert len(b2b_8471) == 1 and hsn["taxable_value"][b2b_8471[0]] == 100000
+
+
+def test_exports_are_zero_rated_not_domestic_supplies():
+    aggregator = ReturnAggregator()
+    aggregator.add({
+        "supplier_gstin": [SUPPLIER] * 4,
+        "customer_gstin": ["", "", "", ""],
+        "place_of_supply": ["96", "96", "29", "27"],
+        "hsn": ["8471", "8471", "8471", "0401"],
+        "gst_rate": [18, 0, 18, 0],
+        "taxable_value": [500.00, 200.00, 100.00, 40.00],
+        "igst_amount": [90.00, 0, 18.00, 0],
+        "cgst_amount": [0, 0, 0, 0],
+        "sgst_amount": [0, 0, 0, 0],
+    })
+    table = aggregator.gstr3b(SUPPLIER)
+    # Exports with IGST paid and under bond both go to 3.1(b), never 3.1(a), 3.1(c) or 3.2
+    assert table["3.1(b)"] == {"taxable_value": 70000, "igst": 9000, "cess": 0}
+    assert table["3.1(a)"] == {"taxable_value": 10000, "igst": 1800, "cgst": 0, "sgst": 0, "cess": 0}
+    assert table["3.1(c)"] == {"taxable_value": 4000}
+    assert table["3.2"] == [{"place_of_supply": "29", "taxable_value": 10000, "igst": 1800}]
+    assert table["liability"].tolist() == [10800, 0, 0]
+    assert "3.1(b) zero rated ₹ 700.00: IGST ₹ 90.00" in describe_3b(table)
+
+
+def test_quoted_fields_spanning_lines_survive_chunking(tmp_path):
+    source = tmp_path / "lines.csv"
+    rows = [[SUPPLIER, CUSTOMER, "", "8471", "NOS", "1", "18", "100.00", "18.00", "0", "0",
+             f"Laptop {i}\nsecond line, with comma" if i % 3 == 0 else f'Laptop "{i}"']
+            for i in range(60)]
+    _write_lines(source, rows)
+    aggregator = ReturnAggregator()
+    assert aggregator.update_from_file(str(source), chunk_bytes=64) == 60
+    assert aggregator.gstr3b(SUPPLIER)["liability"].tolist() == [108000, 0, 0]
+
+
+def test_lowercase_gstin_matches_its_supplier():
+    aggregator = ReturnAggregator()
+    aggregator.add({"supplier_gstin": [SUPPLIER.lower()], "customer_gstin": [CUSTOMER], "hsn": ["8471"],
+                    "gst_rate": [18], "taxable_value": [100.0], "igst_amount": [18.0],
+                    "cgst_amount": [0.0], "sgst_amount": [0.0]})
+    assert aggregator.gstr3b(f" {SUPPLIER.lower()} ")["liability"].tolist() == [1800, 0, 0]
+    assert aggregator.hsn_summary(SUPPLIER.lower())["supplier_gstin"] == [SUPPLIER]
+
+
+def test_reposting_a_period_does_not_double_the_liability(tmp_path, capsys):
+    source = tmp_path / "lines.csv"
+    _write_lines(source, [[SUPPLIER, CUSTOMER, "", "8471", "NOS", "1", "18", "100.00", "18.00", "0", "0", ""]])
+    ledger_path = tmp_path / "ledger.jsonl"
+    argv = [str(source), "--gstin", SUPPLIER.lower(), "--from", "2024-04-01", "--to", "2024-04-30",
+            "--ledger", str(ledger_path)]
+    assert main(argv) == 0
+    assert main(argv) == 0
+    assert "already in the ledger" in capsys.readouterr().out
+
+    ledger = GSTLedger(str(ledger_path))
+    assert ledger.balance(SUPPLIER)["liability"] == [1800, 0, 0]
+    ledger.close()
+
+
+@pytest.mark.parametrize("quoted", [False, True])
+def test_a_long_row_and_a_short_row_raise_instead_of_shifting_columns(tmp_path, quoted):
+    source = tmp_path / "lines.csv"
+    line = f"{SUPPLIER},{CUSTOMER},8471,18,100.00,18.00,0,0\n"
+    text = ("supplier_gstin,customer_gstin,hsn,gst_rate,taxable_value,igst_amount,cgst_amount,sgst_amount\n"
+            + line + line.rstrip("\n") + ",EXTRA\n" + line + line.replace(",8471", "", 1) + line)
+    if quoted:
+        text = text.replace(",8471,", ',"8471",')
+    source.write_text(text, encoding="utf-8")
+    with pytest.raises(ValueError, match="line 3 has 9 fields, expected 8"):
+        ReturnAggregator().update_from_file(str(source))
+
+
+@pytest.mark.parametrize("quoted", [False, True])
+def test_blank_lines_are_skipped(tmp_path, quoted):
+    source = tmp_path / "lines.csv"
+    hsn = '"8471"' if quoted else "8471"
+    line = f"{SUPPLIER},{CUSTOMER},{hsn},18,100.00,18.00,0,0\r\n"
+    source.write_text("supplier_gstin,customer_gstin,hsn,gst_rate,taxable_value,igst_amount,cgst_amount,"
+                      "sgst_amount\r\n" + line + "\r\n  \r\n" + line + "\r\n", encoding="utf-8", newline="")
+    aggregator = ReturnAggregator()
+    assert aggregator.update_from_file(str(source)) == 2
+    assert aggregator.gstr3b(SUPPLIER)["liability"].tolist() == [3600, 0, 0]
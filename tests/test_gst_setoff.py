@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from GST_SETOFF import CGST, IGST, SGST, UTILISATION_ORDER, set_off
+
+
+def one(credit, liability):
+    result = set_off(credit, liability)
+    return (result["utilised"][0].tolist(), result["cash_payable"][0].tolist(),
+            result["closing_credit"][0].tolist())
+
+
+def test_igst_credit_is_used_first_and_across_all_heads():
+    utilised, cash, closing = one([100, 50, 50], [30, 60, 40])
+    # IGST credit: 30 against IGST, 60 against CGST, its last 10 against SGST
+    assert utilised[IGST] == [30, 60, 10]
+    # CGST has nothing left to cover; SGST credit covers the remaining 30 of SGST
+    assert utilised[CGST] == [0, 0, 0] and utilised[SGST] == [0, 0, 30]
+    assert cash == [0, 0, 0] and closing == [0, 50, 20]
+
+
+def test_cgst_and_sgst_credit_go_to_their_own_head_before_igst():
+    utilised, cash, closing = one([0, 100, 40], [70, 30, 20])
+    assert utilised[CGST] == [70, 30, 0]
+    assert utilised[SGST] == [0, 0, 20]
+    assert cash == [0, 0, 0] and closing == [0, 0, 20]
+
+
+def test_cgst_and_sgst_credit_never_cross():
+    utilised, cash, closing = one([0, 100, 0], [0, 0, 100])
+    assert utilised == [[0, 0, 0]] * 3
+    assert cash == [0, 0, 100] and closing == [0, 100, 0]
+
+
+def test_batch_matches_the_order_applied_one_gstin_at_a_time():
+    rng = np.random.default_rng(3)
+    credit = rng.integers(0, 1_000, (200, 3))
+    liability = rng.integers(0, 1_000, (200, 3))
+    result = set_off(credit, liability)
+    for row in range(len(credit)):
+        left, due = credit[row].tolist(), liability[row].tolist()
+        for credit_head, liability_head in UTILISATION_ORDER:
+            used = min(left[credit_head], due[liability_head])
+            left[credit_head] -= used
+            due[liability_head] -= used
+            assert result["utilised"][row, credit_head, liability_head] == used
+        assert result["cash_payable"][row].tolist() == due and result["closing_credit"][row].tolist() == left
+    # Every paisa of credit is either used or carried forward
+    assert (result["utilised"].sum(axis=2) + result["closing_credit"] == credit).all()
+
+
+def test_negative_amounts_are_rejected():
+    with pytest.raises(ValueError, match="negative"):
+        set_off([0, -1, 0], [0, 0, 0])
@@ -0,0 +1,48 @@
+import numpy as np
+
+from GSTIN import (ALPHABET, ERROR_CHARACTERS, ERROR_CHECK_DIGIT, ERROR_LENGTH, ERROR_STATE, check_digit,
+                   describe, gstin_errors, random_gstins, validate_gstins)
+
+# Published examples with correct check digits
+KNOWN_VALID = ["27AAPFU0939F1ZV", "29AAGCB7383J1Z4"]
+
+
+def reference_check_digit(first_14):
+    """The GSTN checksum written out longhand: weights 1, 2, 1, ... and base-36 digit sums."""
+    total = 0
+    for position, char in enumerate(first_14):
+        product = ALPHABET.index(char) * (1 if position % 2 == 0 else 2)
+        total += product // 36 + product % 36
+    return ALPHABET[(36 - total % 36) % 36]
+
+
+def test_known_gstins_are_valid():
+    for gstin in KNOWN_VALID:
+        assert check_digit(gstin[:14]) == reference_check_digit(gstin[:14]) == gstin[14]
+        assert gstin_errors(gstin) == 0
+    valid, errors, states, pans = validate_gstins([gstin.lower() for gstin in KNOWN_VALID])
+    assert valid.all() and errors.tolist() == [0, 0]
+    assert states.tolist() == [27, 29] and pans.tolist() == ["AAPFU0939F", "AAGCB7383J"]
+
+
+def test_check_digit_matches_the_reference_for_random_gstins():
+    gstins = random_gstins(500, seed=11)
+    assert all(check_digit(g[:14]) == reference_check_digit(g[:14]) == g[14] for g in gstins.tolist())
+    assert validate_gstins(gstins)[0].all()
+
+
+def test_every_wrong_check_digit_is_caught_by_both_paths():
+    first_14 = KNOWN_VALID[0][:14]
+    wrong = [first_14 + c for c in ALPHABET if c != KNOWN_VALID[0][14]]
+    valid, errors, _, _ = validate_gstins(wrong)
+    assert not valid.any() and (errors == ERROR_CHECK_DIGIT).all()
+    assert {gstin_errors(g) for g in wrong} == {ERROR_CHECK_DIGIT}
+    assert describe(wrong[0]) == f"Check digit should be {KNOWN_VALID[0][14]}"
+
+
+def test_batch_and_single_paths_agree_on_malformed_input():
+    samples = ["27AAPFU0939F1Z", "27AAPFU0939F1ZV9", "27AAPFU0939F1Z*", "99AAPFU0939F1ZV", "", "  27aapfu0939f1zv "]
+    _, errors, _, _ = validate_gstins(np.array(samples))
+    assert errors.tolist() == [gstin_errors(g) for g in samples]
+    assert errors[:3].tolist() == [ERROR_LENGTH, ERROR_LENGTH, ERROR_CHARACTERS]
+    assert errors[3] & ERROR_STATE and errors[5] == 0
@@ -0,0 +1,29 @@
+import json
+import os
+
+from INVOICE_BULK import _chunks
+
+
+def entries(records, output_dir="out"):
+    return [entry for chunk in _chunks(records, output_dir, chunksize=2) for entry in chunk]
+
+
+def test_bad_records_fail_alone():
+    good = {"company_details": {"invoice_no": "A"}}
+    result = entries([json.dumps(good), "{not json", "[1, 2]", good])
+    assert [error is None for _, _, _, error in result] == [True, False, False, True]
+    assert result[1][0] == "record 2" and result[1][3].startswith("Invalid JSON")
+    assert "JSON object" in result[2][3]
+
+
+def test_repeated_invoice_numbers_get_distinct_files():
+    record = {"company_details": {"invoice_no": "INV/1"}}
+    names = [filename for _, filename, _, _ in entries([record, record, record])]
+    assert names == [os.path.join("out", "INV_1.pdf"), os.path.join("out", "INV_1_2.pdf"),
+                     os.path.join("out", "INV_1_3.pdf")]
+
+
+def test_explicit_filename_clash_is_reported():
+    result = entries([{"filename": "x.pdf"}, {"filename": "x.pdf"}])
+    assert result[0][3] is None
+    assert "already the output" in result[1][3]
@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+
+from INVOICE_LINES import sample_lines
+
+
+def test_with_columns_replaces_numbers_and_shares_the_rest():
+    lines = sample_lines(5)
+    igst = np.arange(5, dtype=np.float64)
+    replaced = lines.with_columns(igst_amount=igst)
+    assert replaced.column("igst_amount").tolist() == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert np.shares_memory(replaced.column("cgst_amount"), lines.column("cgst_amount"))
+    assert replaced.column("description") == lines.column("description")
+
+
+def test_with_columns_rejects_text_and_unknown_fields():
+    lines = sample_lines(2)
+    with pytest.raises(ValueError, match="hsn"):
+        lines.with_columns(hsn=["1", "2"])
+    with pytest.raises(ValueError, match="gst_total"):
+        lines.with_columns(gst_total=[1.0, 2.0])
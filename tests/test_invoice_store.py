@@ -0,0 +1,72 @@
+import numpy as np
+
+from INVOICE_LINES import LINE_FIELDS, TEXT_FIELDS
+from INVOICE_PDF import DetailedGSTInvoice, sample_invoice
+from INVOICE_STORE import InvoiceStore
+
+
+def numbered(invoice_no, lines, supplier_gstin="27AAAAA0000A1Z5", customer="Wholesale Buyer"):
+    template = sample_invoice(lines)
+    company = dict(template.company_details, invoice_no=invoice_no, gstin=supplier_gstin)
+    return DetailedGSTInvoice(company, dict(template.customer_details, name=customer),
+                              template.transportation_details, template.items, template.totals)
+
+
+def test_save_and_load_round_trip(tmp_path):
+    store = InvoiceStore(str(tmp_path / "invoices.sqlite3"))
+    invoice = numbered("INV-1", 7)
+    store.save(invoice)
+    loaded = store.load("INV-1")
+    assert loaded.company_details == invoice.company_details
+    assert loaded.customer_details == invoice.customer_details
+    assert loaded.transportation_details == invoice.transportation_details
+    assert loaded.totals == invoice.totals
+    for field in LINE_FIELDS:
+        if field in TEXT_FIELDS:
+            assert list(loaded.items.column(field)) == list(invoice.items.column(field))
+        else:
+            # Amounts are kept in whole paise
+            assert np.array_equal(loaded.items.column(field), np.round(invoice.items.column(field), 2))
+    assert store.load("INV-2") is None
+    store.close()
+
+
+def test_a_number_repeated_in_one_batch_keeps_the_last_copy_and_no_stray_lines(tmp_path):
+    store = InvoiceStore(str(tmp_path / "invoices.sqlite3"))
+    ids = store.save_many([numbered("INV-1", 3, customer="First"), numbered("INV-2", 4),
+                           numbered("INV-1", 5, customer="Second")])
+    assert len(ids) == 3
+    assert [row["invoice_no"] for row in store.find()] == ["INV-1", "INV-2"]
+    loaded = store.load("INV-1")
+    assert loaded.customer_details["name"] == "Second" and len(loaded.items) == 5
+    assert store.line_count() == 5 + 4
+    store.close()
+
+
+def test_saving_again_replaces_and_suppliers_keep_their_own_numbers(tmp_path):
+    store = InvoiceStore(str(tmp_path / "invoices.sqlite3"))
+    store.save(numbered("INV-1", 3))
+    store.save(numbered("INV-1", 2, supplier_gstin="29AAGCB7383J1Z4"))
+    store.save(numbered("INV-1", 6))
+    assert len(store.load("INV-1", "27AAAAA0000A1Z5").items) == 6
+    assert len(store.load("INV-1", "29AAGCB7383J1Z4").items) == 2
+    assert store.line_count() == 6 + 2
+    chunks = list(store.iter_line_chunks(supplier_gstin="29aagcb7383j1z4"))
+    assert sum(len(chunk["hsn"]) for chunk in chunks) == 2
+    store.close()
+
+
+def test_gstins_typed_in_lowercase_are_found_in_either_case(tmp_path):
+    store = InvoiceStore(str(tmp_path / "invoices.sqlite3"))
+    invoice = numbered("INV-1", 2, supplier_gstin=" 27aapfu0939f1zv ")
+    invoice.customer_details["gstin"] = "29aagcb7383j1z4"
+    store.save(invoice)
+    for gstin in ("27aapfu0939f1zv", "27AAPFU0939F1ZV"):
+        assert len(store.find(supplier_gstin=gstin)) == 1
+        assert store.load("INV-1", gstin) is not None
+        assert sum(len(chunk["hsn"]) for chunk in store.iter_line_chunks(supplier_gstin=gstin)) == 2
+    assert [row["customer_gstin"] for row in store.find(customer="29aagcb7383j1z4")] == ["29AAGCB7383J1Z4"]
+    # Saving it again under another spelling replaces the invoice rather than adding a second one
+    store.save(numbered("INV-1", 3, supplier_gstin="27AAPFU0939F1ZV"))
+    assert store.line_count() == 3
+    store.close()
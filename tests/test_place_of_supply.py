@@ -0,0 +1,46 @@
+import numpy as np
+
+from INVOICE_LINES import sample_lines
+from PLACE_OF_SUPPLY import (apply_place_of_supply, invoice_place_of_supply, is_interstate, place_of_supply,
+                             split_tax, state_numbers)
+
+
+def test_state_codes_gstins_and_names_resolve_alike():
+    values = ["27", "27AAPFU0939F1ZV", "Maharashtra", " maharashtra ", "99", "", "Atlantis"]
+    assert state_numbers(values).tolist() == [27, 27, 27, 27, -1, -1, -1]
+    assert state_numbers(np.array([7, 0, 120])).tolist() == [7, -1, -1]
+
+
+def test_interstate_needs_two_known_different_states_or_a_foreign_place():
+    supplier = ["27", "27", "27", "27", ""]
+    place = ["27AAPFU0939F1ZV", "29", "96", "", "29"]
+    assert is_interstate(supplier, place).tolist() == [False, True, True, False, False]
+
+
+def test_bill_to_decides_before_ship_to():
+    assert place_of_supply(["29", "", "Goa"], ["27", "27", "33"]).tolist() == [29, 27, 30]
+    assert invoice_place_of_supply({"gstin": "", "state": "Kerala", "ship_state_code": "29"}) == 32
+    assert invoice_place_of_supply({}, {"supply_place": "Delhi"}) == 7
+    assert invoice_place_of_supply({}) == -1
+
+
+def test_split_gives_sgst_the_odd_paisa_and_keeps_the_total():
+    split = split_tax(np.array([1801, 1801]), [18.0, 18.0], [False, True])
+    assert split["cgst_amount"].tolist() == [900, 0] and split["sgst_amount"].tolist() == [901, 0]
+    assert split["igst_amount"].tolist() == [0, 1801]
+    assert split["cgst_rate"].tolist() == [9.0, 0.0] and split["igst_rate"].tolist() == [0.0, 18.0]
+    rupees = split_tax(18.05, 18.0, False)
+    assert rupees["cgst_amount"][0] + rupees["sgst_amount"][0] == 18.05
+
+
+def test_resplitting_lines_moves_tax_between_heads_without_changing_it():
+    lines = sample_lines(10)
+    total = lines.column("cgst_amount") + lines.column("sgst_amount")
+    inter = apply_place_of_supply(lines, "27", "29")
+    assert np.allclose(inter.column("igst_amount"), total)
+    assert not inter.column("cgst_amount").any() and not inter.column("sgst_amount").any()
+    assert (inter.column("igst_rate") == 18.0).all()
+    intra = apply_place_of_supply(inter, "27", "27")
+    assert np.allclose(intra.column("cgst_amount"), lines.column("cgst_amount"))
+    assert np.allclose(intra.column("sgst_amount"), lines.column("sgst_amount"))
+    assert intra.column("description") == lines.column("description")
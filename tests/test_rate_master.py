@@ -0,0 +1,12 @@
+from RATE_MASTER import KIND_CUSTOMS, RateMaster
+
+
+def test_opens_a_path_with_uri_characters(tmp_path):
+    directory = tmp_path / "rates #1 ?100%"
+    directory.mkdir()
+    master = RateMaster(str(directory / "master.sqlite3"))
+    try:
+        assert master.lookup_code("8703")["kind"] == KIND_CUSTOMS
+        assert master.gst_categories()["18%"]
+    finally:
+        master.close()
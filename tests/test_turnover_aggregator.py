@@ -0,0 +1,50 @@
+from TURNOVER_AGGREGATOR import TurnoverAggregator, main, pans_and_years
+
+
+def test_overlong_gstin_is_rejected_not_truncated():
+    pans, years, valid = pans_and_years(["27AAAPA0001A1Z5", "27AAAPA0001A1Z5XYZ", " 27aaapa0001a1z5 "],
+                                        ["2024-05-01", "2024-05-01", "01-05-2024"])
+    assert valid.tolist() == [True, False, True]
+    assert pans[valid].tolist() == ["AAAPA0001A", "AAAPA0001A"]
+    assert years[valid].tolist() == [2024, 2024]
+
+
+def test_command_line_and_default_aggregator_share_the_state_file(tmp_path):
+    source = tmp_path / "invoices.csv"
+    source.write_text("gstin,invoice_date,taxable_value\n27AAAPA0001A1Z5,2024-05-01,1000.50\n"
+                      "29AAAPA0001A1Z7,2025-01-15,99.50\n27AAAPA0001A1Z5XYZ,2024-05-01,5\n", encoding="utf-8")
+    assert main([str(source)]) == 0
+    aggregator = TurnoverAggregator()
+    assert aggregator.turnover("AAAPA0001A", 2024) == 110000
+    assert aggregator.rejected == 1
+
+
+def test_last_invoice_without_a_newline_is_counted(tmp_path):
+    source = tmp_path / "invoices.csv"
+    source.write_text("gstin,invoice_date,taxable_value\n27AAAPA0001A1Z5,2024-05-01,1000.00\n"
+                      "27AAAPA0001A1Z5,2024-06-01,500.00", encoding="utf-8")
+    aggregator = TurnoverAggregator()
+    assert aggregator.update_from_file(str(source)) == 2
+    assert aggregator.turnover("AAAPA0001A", 2024) == 150000 and aggregator.rejected == 0
+
+
+def test_a_file_still_being_written_keeps_its_unfinished_record_for_later(tmp_path):
+    source = tmp_path / "invoices.csv"
+    source.write_bytes(b'gstin,invoice_date,taxable_value,note\n27AAAPA0001A1Z5,2024-05-01,1000.00,\n'
+                       b'27AAAPA0001A1Z5,2024-06-01,500.00,"two\n')
+    aggregator = TurnoverAggregator()
+    assert aggregator.update_from_file(str(source), complete=False) == 1
+    with open(source, "ab") as f:
+        f.write(b'lines"\n27AAAPA0001A1Z5,2024-07-01,250.00,')
+    assert aggregator.update_from_file(str(source), complete=False) == 1
+    assert aggregator.update_from_file(str(source)) == 1
+    assert aggregator.turnover("AAAPA0001A", 2024) == 175000 and aggregator.rejected == 0
+
+
+def test_quoted_lines_and_blank_lines_are_not_rejected(tmp_path):
+    source = tmp_path / "invoices.csv"
+    rows = ['27AAAPA0001A1Z5,2024-05-01,100.00,"Note {i}\nspanning, lines"\n'.format(i=i) for i in range(40)]
+    source.write_text("gstin,invoice_date,taxable_value,note\n" + "\n".join(rows) + "\n", encoding="utf-8")
+    aggregator = TurnoverAggregator()
+    assert aggregator.update_from_file(str(source), chunk_bytes=64) == 40
+    assert aggregator.turnover("AAAPA0001A", 2024) == 400000 and aggregator.rejected == 0